@@ -8,17 +8,30 @@ import os
 import sys
 from pathlib import Path
 import json
+import time
 from datetime import datetime
 
 # Import BodhiRAG components
-from src.graph_rag.graph_connector import KnowledgeGraphConnector
-from src.graph_rag.vector_connector import VectorStoreConnector
-from src.graph_rag.agent_router import HybridRAGAgent
-from src.data_ingestion import extract_knowledge_from_chunk
+from src.services.rag_service import (
+    agent,
+    answer_cache,
+    answer_query,
+    ensure_kg_connected,
+    ensure_vector_store,
+    kg_pool,
+    start_warm_up,
+    store_stats,
+    vector_store_health,
+)
+from src.services.ingestion_service import (
+    jobs,
+    submit_ingestion,
+    submit_retry,
+)
+from src.services.job_runner import JobQueueFullError
 from langchain_core.documents import Document
 
 # Import both loaders
-from src.data_ingestion.simple_loader import load_and_chunk_documents_simple
 from src.data_ingestion.document_loader import extract_publication_data
 
 # Check if Docling is available by checking the module
@@ -30,29 +43,17 @@ except:
 if not DOCLING_AVAILABLE:
     print("⚠️ Using simple document loader (langchain_docling not available)")
 
-# Initialize connectors
-kg_connector = KnowledgeGraphConnector(
-    uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
-    username=os.getenv("NEO4J_USERNAME", "neo4j"),
-    password=os.getenv("NEO4J_PASSWORD", "password")
-)
-
-vs_connector = VectorStoreConnector()
-
-# Initialize agent
-agent = HybridRAGAgent(kg_connector, vs_connector)
-
 def query_bodhirag(query: str, use_kg: bool = True, use_vector: bool = True):
     """Query the BodhiRAG system"""
     try:
-        # Connect to databases
+        # Borrow the shared, long-lived connections
         if use_kg:
-            kg_connector.connect()
+            ensure_kg_connected()
         if use_vector:
-            vs_connector.initialize_store()
+            ensure_vector_store()
         
-        # Route query
-        result = agent.route_query(query, use_kg, use_vector)
+        # Route query (cached; KG and vector retrieval run concurrently)
+        result = answer_query(query, use_kg, use_vector)
         
         # Format results
         answer = result["final_answer"]
@@ -68,6 +69,16 @@ def query_bodhirag(query: str, use_kg: bool = True, use_vector: bool = True):
         else:
             kg_text = "No knowledge graph relationships found."
         
+        # Multi-hop paths between the entities in the question
+        if result.get("kg_paths"):
+            kg_text += "\n**Mechanism Paths:**\n\n"
+            for i, path in enumerate(result["kg_paths"][:3], 1):
+                kg_text += f"{i}. {path['explanation']} (evidence: {path['evidence_count']})\n"
+                for step in path["steps"]:
+                    if step["evidence"]:
+                        kg_text += f"   *{step['subject']} → {step['object']}: {step['evidence'][0][:150]}...*\n"
+                kg_text += "\n"
+        
         # Format VS results
         vs_text = ""
         if result["vs_results"]:
@@ -85,165 +96,146 @@ def query_bodhirag(query: str, use_kg: bool = True, use_vector: bool = True):
 - KG Relationships: {result['retrieval_stats']['kg_relationships']}
 - VS Documents: {result['retrieval_stats']['vs_documents']}
 """
+        retrieval_stats = result['retrieval_stats']
+        for backend, label in (("kg", "KG"), ("vs", "VS")):
+            if f"{backend}_time_ms" in retrieval_stats:
+                stats += f"- {label} Time: {retrieval_stats[f'{backend}_time_ms']:.0f} ms ({retrieval_stats[f'{backend}_status']})\n"
+        if "route" in retrieval_stats:
+            fallback = ", fell back" if retrieval_stats["route_fallback"] else ""
+            stats += f"- Route: {retrieval_stats['route']} (confidence {retrieval_stats['intent_confidence']:.2f}{fallback})\n"
+        if "kg_source" in retrieval_stats:
+            stats += f"- KG Source: {retrieval_stats['kg_source']}\n"
+        if "lexical_hits" in retrieval_stats:
+            stats += f"- Lexical Hits: {retrieval_stats['lexical_hits']} (fused with {retrieval_stats['fusion'].upper()})\n"
+        if "vs_rerank_ms" in retrieval_stats:
+            stats += f"- Re-rank: {retrieval_stats['vs_rerank_ms']:.0f} ms ({retrieval_stats['vs_rerank_status']})\n"
         
         return answer, kg_text, vs_text, stats
         
     except Exception as e:
         error_msg = f"Error: {str(e)}"
         return error_msg, "", "", ""
-    finally:
-        if use_kg:
-            kg_connector.close()
 
-def run_pipeline(max_docs: int, csv_file):
+def format_job(job: dict) -> str:
+    """Render a background job's state and latest progress"""
+    header = f"🆔 Job {job['job_id']} ({job['label']}): {job['status'].upper()}"
+    if job['status'] == "queued" and job['queue_position'] is not None:
+        header += f" - position {job['queue_position'] + 1} in queue"
+    text = header + "\n\n" + (job['progress'] or "")
+    if job['error']:
+        text += f"\n❌ Job failed: {job['error']}\n"
+    if job['status'] == "cancelled" and not job['progress']:
+        text += "⏹️ Cancelled before it started\n"
+    return text
+
+def follow_job(job_id: str):
+    """
+    Stream a background job's progress
+    
+    Closing the page only stops following; the job keeps running and can
+    be followed again by its ID.
+    
+    Args:
+        job_id: Job to follow
+    
+    Returns:
+        (status text, job ID) on every update
+    """
+    job_id = (job_id or "").strip()
+    if jobs.get(job_id) is None:
+        yield f"❌ Unknown job: {job_id}\n", job_id
+        return
+    for job in jobs.follow(job_id):
+        yield format_job(job), job_id
+
+def run_pipeline(max_docs: int, csv_file, sync: bool = False):
     """
-    Run the data ingestion pipeline
+    Queue a data ingestion job and follow its progress
     
     Args:
         max_docs: Maximum number of documents to process
         csv_file: Uploaded CSV file with publication data
+        sync: Remove ingested documents that are not in the CSV
     
     Returns:
-        Status message with progress
+        (status text, job ID) with progress
     """
+    # Check if CSV file is provided
+    if csv_file is None:
+        yield "❌ Error: Please upload a CSV file with publication data\n", ""
+        return
+    
+    # The CSV is parsed now; the upload may be gone by the time the job runs
+    publication_data = extract_publication_data(getattr(csv_file, "name", csv_file))
+    if not publication_data:
+        yield "❌ Failed to extract publication data from CSV\n", ""
+        return
+    
     try:
-        status = "🚀 Starting pipeline...\n\n"
-        yield status
-        
-        # Check if CSV file is provided
-        if csv_file is None:
-            status += "❌ Error: Please upload a CSV file with publication data\n"
-            yield status
-            return
-        
-        csv_path = csv_file.name
-        
-        # Phase 1: Data Ingestion
-        status += "=" * 60 + "\n"
-        status += "PHASE 1: DATA INGESTION & CHUNKING\n"
-        status += "=" * 60 + "\n"
-        yield status
-        
-        # Always use simple loader for HF Spaces (Docling not available)
-        status += "Using simple HTML loader (Docling not available in HF Spaces)...\n"
-        yield status
-        
-        # Extract publication data from CSV
-        publication_data = extract_publication_data(csv_path)
-        if not publication_data:
-            status += "❌ Failed to extract publication data from CSV\n"
-            yield status
-            return
-        
-        status += f"Found {len(publication_data)} publications in CSV\n"
-        yield status
-        
-        # Progress callback for loader
-        def update_progress(msg):
-            nonlocal status
-            status += msg
-        
-        # Load with simple loader
-        documents = load_and_chunk_documents_simple(
-            publication_data=publication_data,
-            max_docs=max_docs,
-            chunk_size=1000,
-            progress_callback=update_progress
-        )
-        
-        yield status
-        
-        status += f"✅ Loaded and chunked {len(documents)} documents\n\n"
-        yield status
-        
-        if not documents:
-            status += "❌ No documents processed. Exiting.\n"
-            yield status
-            return
-        
-        # Phase 2: Knowledge Extraction
-        status += "=" * 60 + "\n"
-        status += "PHASE 2: KNOWLEDGE EXTRACTION\n"
-        status += "=" * 60 + "\n"
-        yield status
-        
-        all_triples = []
-        for i, doc in enumerate(documents[:10]):  # Limit for demo
-            triples = extract_knowledge_from_chunk(doc)
-            all_triples.extend(triples)
-            
-            if (i + 1) % 5 == 0:
-                status += f"📊 Progress: {i+1}/{min(10, len(documents))} chunks, {len(all_triples)} triples\n"
-                yield status
-        
-        status += f"✅ Extracted {len(all_triples)} knowledge triples\n\n"
-        yield status
-        
-        # Phase 3: Knowledge Graph Population
-        status += "=" * 60 + "\n"
-        status += "PHASE 3: KNOWLEDGE GRAPH POPULATION\n"
-        status += "=" * 60 + "\n"
-        yield status
-        
-        # Try to connect to Neo4j
-        kg_results = None
-        if kg_connector.connect():
-            kg_results = kg_connector.populate_graph(all_triples)
-            kg_connector.close()
-            
-            status += f"✅ Knowledge Graph populated:\n"
-            status += f"   - Entities: {kg_results.get('entities_created', 0)}\n"
-            status += f"   - Relationships: {kg_results.get('relationships_created', 0)}\n\n"
-        else:
-            status += "⚠️ Neo4j not configured - skipping Knowledge Graph\n"
-            status += "   To enable: Add NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD to Space settings\n\n"
-        
-        yield status
-        
-        # Phase 4: Vector Store Population
-        status += "=" * 60 + "\n"
-        status += "PHASE 4: VECTOR STORE POPULATION\n"
-        status += "=" * 60 + "\n"
-        yield status
-        
-        vs_connector.initialize_store()
-        vs_results = vs_connector.populate_store(documents)
-        
-        status += f"✅ Vector Store populated: {vs_results.get('documents_added', 0)} documents\n\n"
-        yield status
-        
-        # Summary
-        status += "=" * 60 + "\n"
-        status += "✅ PIPELINE COMPLETE!\n"
-        status += "=" * 60 + "\n"
-        status += f"Total documents: {len(documents)}\n"
-        status += f"Total triples: {len(all_triples)}\n"
-        
-        if kg_results:
-            status += f"Entities: {kg_results.get('entities_created', 0)}\n"
-            status += f"Relationships: {kg_results.get('relationships_created', 0)}\n"
-        else:
-            status += "Entities: 0 (Neo4j not configured)\n"
-            status += "Relationships: 0 (Neo4j not configured)\n"
-        
-        status += f"Vector Store Documents: {vs_results.get('documents_added', 0)}\n"
-        status += "\n🎉 Your knowledge base is ready for querying!\n"
-        yield status
-        
-    except Exception as e:
-        status += f"\n❌ Pipeline failed: {str(e)}\n"
-        yield status
+        job_id = submit_ingestion(publication_data, int(max_docs), sync=bool(sync))
+    except JobQueueFullError as e:
+        yield f"❌ {e}. Try again once a queued job has finished.\n", ""
+        return
+    
+    yield from follow_job(job_id)
+
+def retry_failed_pipeline():
+    """Queue a job that retries dead-lettered documents and follow it"""
+    try:
+        job_id = submit_retry()
+    except JobQueueFullError as e:
+        yield f"❌ {e}. Try again once a queued job has finished.\n", ""
+        return
+    
+    yield from follow_job(job_id)
+
+def cancel_job(job_id: str) -> str:
+    """Cancel a queued or running job"""
+    job_id = (job_id or "").strip()
+    if jobs.cancel(job_id):
+        return f"⏹️ Cancellation requested for job {job_id}"
+    return f"⚠️ Job {job_id} is unknown or already finished"
+
+def list_jobs() -> str:
+    """Summarize recent background jobs"""
+    recent = jobs.list_jobs()
+    if not recent:
+        return "No pipeline jobs yet."
+    
+    runner = jobs.stats()
+    text = f"**Running:** {runner['running']}/{runner['max_workers']} | **Queued:** {runner['queued']}/{runner['max_queued']}\n\n"
+    text += "| Job | Task | Status | Submitted |\n|---|---|---|---|\n"
+    for job in recent[:20]:
+        submitted = datetime.fromtimestamp(job['submitted_at']).strftime("%H:%M:%S")
+        text += f"| `{job['job_id']}` | {job['label']} | {job['status']} | {submitted} |\n"
+    return text
+
+def format_age(seconds) -> str:
+    """Human-readable age for statistics timestamps"""
+    if seconds is None:
+        return "never"
+    if seconds < 60:
+        return f"{int(seconds)}s ago"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    return f"{seconds / 3600:.1f} h ago"
 
 def get_database_stats():
     """Get statistics about the knowledge base"""
     try:
         stats_text = ""
         
+        # Counters are maintained by the write paths; reading them is O(1)
+        store = store_stats.snapshot()
+        stats_text += (
+            f"_Figures updated {format_age(store['age_seconds'])}; "
+            f"last full recount {format_age(store['recomputed_age_seconds'])}_\n\n"
+        )
+        
         # Try to get KG stats
         try:
-            if kg_connector.connect():
-                kg_stats = kg_connector.export_graph_stats()
-                kg_connector.close()
+            if ensure_kg_connected():
+                kg_stats = store
                 
                 # Format KG stats
                 stats_text += "## Knowledge Graph Statistics\n\n"
@@ -251,12 +243,8 @@ def get_database_stats():
                 total_entities = kg_stats.get('total_entities', 0)
                 stats_text += f"- **Total Entities**: {total_entities}\n"
                 
-                # Handle relationship types (could be list or int)
                 rel_types = kg_stats.get('relationship_types', [])
-                if isinstance(rel_types, list):
-                    total_rels = sum(r.get('count', 0) for r in rel_types if isinstance(r, dict))
-                else:
-                    total_rels = 0
+                total_rels = kg_stats.get('total_relationships', 0)
                 stats_text += f"- **Total Relationships**: {total_rels}\n\n"
                 
                 # Entity types
@@ -280,6 +268,13 @@ def get_database_stats():
                     stats_text += "\n### Relationship Types:\n"
                     stats_text += "- No relationships yet\n"
                 
+                # Connection pool
+                pool = kg_pool.metrics()
+                stats_text += "\n### Connection Pool:\n"
+                stats_text += f"- In use / idle: {pool['in_use']} / {pool['idle']} (max {pool['max_size']})\n"
+                stats_text += f"- Avg / max wait: {pool['avg_wait_ms']:.1f} / {pool['max_wait_ms']:.1f} ms\n"
+                stats_text += f"- Acquire timeouts: {pool['timeouts']}\n"
+                
                 stats_text += "\n"
             else:
                 stats_text += "## Knowledge Graph Statistics\n\n"
@@ -294,11 +289,16 @@ def get_database_stats():
         
         # Try to get VS stats
         try:
-            vs_connector.initialize_store()
-            vs_stats = vs_connector.get_collection_stats()
+            vs_stats = store
             
             stats_text += "## Vector Store Statistics\n\n"
             
+            health = vector_store_health()
+            if health['warm']:
+                stats_text += f"- **Status**: Warm (initialized {health['initialized_at']})\n"
+            else:
+                stats_text += "- **Status**: Warming up\n"
+            
             total_docs = vs_stats.get('total_documents', 0)
             stats_text += f"- **Total Documents**: {total_docs}\n"
             
@@ -306,7 +306,7 @@ def get_database_stats():
                 avg_length = vs_stats.get('average_content_length', 0)
                 stats_text += f"- **Average Content Length**: {int(avg_length)} characters\n"
                 
-                fields = vs_stats.get('sample_metadata_fields', [])
+                fields = vs_stats.get('metadata_fields', [])
                 if fields:
                     stats_text += f"- **Metadata Fields**: {', '.join(fields)}\n"
             else:
@@ -316,6 +316,14 @@ def get_database_stats():
             stats_text += f"## Vector Store Statistics\n\n"
             stats_text += f"⚠️ Error: {str(e)}\n"
         
+        # Answer cache stats
+        cache_stats = answer_cache.stats()
+        stats_text += "\n## Query Cache Statistics\n\n"
+        stats_text += f"- **Hit Rate**: {cache_stats['hit_rate']:.1%} "
+        stats_text += f"({cache_stats['hits_exact']} exact, {cache_stats['hits_semantic']} semantic)\n"
+        stats_text += f"- **Miss Rate**: {cache_stats['miss_rate']:.1%} ({cache_stats['misses']} misses)\n"
+        stats_text += f"- **Entries**: {cache_stats['entries']} ({cache_stats['size_mb']:.2f} MB)\n"
+        
         if not stats_text:
             stats_text = "No statistics available. Please run the pipeline first."
         
@@ -324,6 +332,9 @@ def get_database_stats():
     except Exception as e:
         return f"## Error\n\n❌ Failed to get statistics: {str(e)}\n\nPlease try again or check the logs."
 
+# Load the embedding model and open the stores before the first query
+start_warm_up()
+
 # Example queries
 examples = [
     ["What causes bone loss in space?", True, True],
@@ -410,8 +421,8 @@ with gr.Blocks(title="BodhiRAG - Space Biology Knowledge Engine", theme=gr.theme
             **Steps:**
             1. Upload CSV file with publication data
             2. Set maximum documents to process
-            3. Click "Run Pipeline"
-            4. Wait for completion (may take several minutes)
+            3. Click "Run Pipeline" to queue a background job
+            4. Follow its progress (you can close the page and follow the job ID later)
             """)
             
             with gr.Row():
@@ -430,7 +441,13 @@ with gr.Blocks(title="BodhiRAG - Space Biology Knowledge Engine", theme=gr.theme
                         label="Maximum Documents to Process"
                     )
                     
+                    sync_input = gr.Checkbox(
+                        label="Remove documents not in this CSV",
+                        value=False
+                    )
+                    
                     pipeline_btn = gr.Button("🚀 Run Pipeline", variant="primary")
+                    retry_btn = gr.Button("🔁 Retry Failed Documents", variant="secondary")
                 
                 with gr.Column():
                     gr.Markdown("""
@@ -440,19 +457,56 @@ with gr.Blocks(title="BodhiRAG - Space Biology Knowledge Engine", theme=gr.theme
                     - Start with small numbers (10-20 docs)
                     - Requires Neo4j connection
                     - CSV format: Title, Link columns
+                    - Interrupted runs resume where they stopped
+                    - Jobs run in the background, one at a time, in submission order
                     """)
             
+            with gr.Row():
+                job_id_input = gr.Textbox(label="Job ID", placeholder="Job ID to follow or cancel", scale=3)
+                follow_btn = gr.Button("👀 Follow Job", scale=1)
+                cancel_btn = gr.Button("⏹️ Cancel Job", variant="stop", scale=1)
+            
             pipeline_output = gr.Textbox(
                 label="Pipeline Status",
                 lines=20,
                 max_lines=30
             )
             
-            # Event handler
+            jobs_output = gr.Markdown(label="Jobs")
+            jobs_btn = gr.Button("🔄 Refresh Jobs")
+            
+            # Event handlers: jobs run in the background; these only submit and follow them
             pipeline_btn.click(
                 fn=run_pipeline,
-                inputs=[max_docs_input, csv_upload],
-                outputs=pipeline_output
+                inputs=[max_docs_input, csv_upload, sync_input],
+                outputs=[pipeline_output, job_id_input],
+                concurrency_limit=None
+            )
+            
+            retry_btn.click(
+                fn=retry_failed_pipeline,
+                inputs=[],
+                outputs=[pipeline_output, job_id_input],
+                concurrency_limit=None
+            )
+            
+            follow_btn.click(
+                fn=follow_job,
+                inputs=job_id_input,
+                outputs=[pipeline_output, job_id_input],
+                concurrency_limit=None
+            )
+            
+            cancel_btn.click(
+                fn=cancel_job,
+                inputs=job_id_input,
+                outputs=jobs_output
+            )
+            
+            jobs_btn.click(
+                fn=list_jobs,
+                inputs=[],
+                outputs=jobs_output
             )
         
         # Tab 3: Statistics
@@ -140,6 +140,1422 @@ def test_mock_query():
         print(f"  ✗ Mock query failed: {e}")
         return False
 
+def test_concurrent_fetcher():
+    """Test the concurrent fetcher offline against a local HTTP stand-in"""
+    print("\nTesting concurrent fetcher...")
+    
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    fixture_html = """<html><body><nav>Skip</nav><article>
+    <h1>Microgravity and Bone</h1><p>Microgravity induces pelvic bone loss.</p>
+    </article></body></html>"""
+    flaky_hits = {"count": 0}
+    
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        
+        def do_GET(self):
+            if self.path.startswith("/flaky") and flaky_hits["count"] == 0:
+                flaky_hits["count"] += 1
+                self.send_response(503)
+                self.end_headers()
+                return
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = fixture_html.encode("utf-8")
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    try:
+        from src.data_ingestion.fetcher import ConcurrentFetcher
+        from src.data_ingestion.concurrent_loader import load_and_chunk_documents_concurrent
+        
+        fetcher = ConcurrentFetcher(max_workers=4, per_host_limit=2, backoff_base=0.01)
+        items = [(f"Paper {i}", f"{base}/pmc/articles/PMC{1000 + i}/") for i in range(6)]
+        items.append(("Flaky paper", f"{base}/flaky/PMC999/"))
+        
+        results = dict(fetcher.fetch_all(items))
+        if not all(r["status"] == 200 and r["html"] for r in results.values()):
+            print(f"  ✗ Fetch failed: {[r['error'] for r in results.values() if r['error']]}")
+            return False
+        print(f"  ✓ Fetched {len(results)} pages concurrently")
+        print(f"  ✓ Retried flaky page ({results['Flaky paper']['attempts']} attempts)")
+        
+        again = fetcher.fetch(items[0][1])
+        if not again["not_modified"]:
+            print("  ✗ Conditional GET did not return 304")
+            return False
+        print("  ✓ Conditional GET reused cached page (304)")
+        
+        docs = load_and_chunk_documents_concurrent(items[:2], fetcher=fetcher)
+        if not docs or docs[0].metadata["doc_id"] not in ("PMC_PMC1000", "PMC_PMC1001"):
+            print("  ✗ Loader produced no chunks")
+            return False
+        print(f"  ✓ Loader chunked {len(docs)} documents")
+        
+        fetcher.close()
+        return True
+    except Exception as e:
+        print(f"  ✗ Concurrent fetcher test failed: {e}")
+        return False
+    finally:
+        server.shutdown()
+
+def test_bulk_graph_writer():
+    """Test batched UNWIND writes against a recorded fake driver"""
+    print("\nTesting bulk graph writer...")
+    
+    from contextlib import contextmanager
+    from types import SimpleNamespace
+    
+    class FakeResult:
+        def __init__(self, counters, records=()):
+            self.counters = counters
+            self.records = list(records)
+        
+        def consume(self):
+            return SimpleNamespace(counters=self.counters)
+        
+        def __iter__(self):
+            return iter(self.records)
+    
+    class FakeTx:
+        def __init__(self, log, names):
+            self.log = log
+            self.names = names
+        
+        def run(self, query, **params):
+            self.log.append((query, params))
+            rows = params.get("rows", [])
+            existing = [{"name": name} for name in params.get("names", []) if name in self.names]
+            for row in rows:
+                self.names.update((row["subject"], row["object"]))
+            return FakeResult(SimpleNamespace(nodes_created=2 * len(rows), relationships_created=len(rows)), existing)
+    
+    class FakeDriver:
+        def __init__(self):
+            self.log = []
+            self.names = set()
+            self.fail_next_write = True
+        
+        def verify_connectivity(self):
+            pass
+        
+        def close(self):
+            pass
+        
+        @contextmanager
+        def session(self, **kwargs):
+            driver = self
+            
+            class FakeSession:
+                def run(self, query, **params):
+                    return FakeTx(driver.log, driver.names).run(query, **params)
+                
+                def execute_write(self, fn, *args):
+                    if driver.fail_next_write:
+                        driver.fail_next_write = False
+                        raise RuntimeError("transient failure")
+                    return fn(FakeTx(driver.log, driver.names), *args)
+            
+            yield FakeSession()
+    
+    try:
+        from src.graph_rag.connection_pool import Neo4jSessionPool
+        from src.graph_rag.bulk_writer import BulkGraphWriter
+        
+        driver = FakeDriver()
+        pool = Neo4jSessionPool("bolt://fake", "neo4j", "test", driver_factory=lambda uri, auth: driver)
+        writer = BulkGraphWriter(pool, batch_size=100, retry_backoff=0)
+        
+        triples = [
+            {"subject": f"Entity {i}", "relationship": "affects", "object": "Bone Loss",
+             "evidence": "...", "metadata": {"doc_id": "PMC_PMC1"}}
+            for i in range(250)
+        ]
+        stats = writer.write_triples(triples)
+        
+        unwind_calls = [params for query, params in driver.log if "UNWIND" in query]
+        constraint_calls = [query for query, _ in driver.log if "CONSTRAINT" in query]
+        if len(unwind_calls) != 3 or stats["triples_written"] != 250 or stats["failed_batches"]:
+            print(f"  ✗ Unexpected write stats: {stats}")
+            return False
+        if not constraint_calls:
+            print("  ✗ Uniqueness constraint not created")
+            return False
+        if stats["entity_types"] != {"Unknown": 251} or stats["relationship_types"] != {"affects": 250}:
+            print(f"  ✗ Unexpected created-by-type counts: {stats['entity_types']}, {stats['relationship_types']}")
+            return False
+        
+        print(f"  ✓ Wrote 250 triples in {len(unwind_calls)} UNWIND batches (1 retried)")
+        print(f"  ✓ Throughput: {stats['triples_per_s']:.0f} triples/s")
+        
+        driver.fail_next_write = True
+        stats = BulkGraphWriter(pool, batch_size=100, max_retries=0).write_triples(triples[:150])
+        if stats["failed_batches"] != 1 or stats["failed_triples"] != triples[:100] or stats["triples_written"] != 50:
+            print(f"  ✗ Failed batch not reported: {stats['failed_batches']} batches, {len(stats['failed_triples'])} triples")
+            return False
+        print("  ✓ Triples of a failed batch returned to the caller")
+        return True
+    except Exception as e:
+        print(f"  ✗ Bulk graph writer test failed: {e}")
+        return False
+
+def test_ann_recall():
+    """Test recall@10 of the quantized ANN index against brute-force search"""
+    print("\nTesting quantized ANN index...")
+    
+    import tempfile
+    import numpy as np
+    
+    try:
+        from src.graph_rag.ann_index import QuantizedANNIndex
+        
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(32, 64))
+        vectors = centers[rng.integers(0, 32, 5000)] + 0.5 * rng.normal(size=(5000, 64))
+        vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+        queries = vectors[rng.integers(0, 5000, 100)] + 0.1 * rng.normal(size=(100, 64))
+        queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index = QuantizedANNIndex(tmp, dim=64, nlist=32, nprobe=8, train_size=2000)
+            index.add(
+                [f"chunk-{i}" for i in range(5000)], vectors,
+                [f"text {i}" for i in range(5000)],
+                [{"doc_id": f"PMC_PMC{i % 50}", "chunk_index": i} for i in range(5000)],
+            )
+            if not index.stats()["trained"]:
+                print("  ✗ IVF quantizer was not trained")
+                return False
+            
+            hits = 0
+            for query in queries:
+                exact = set(np.argsort(-(vectors @ query))[:10].tolist())
+                hits += len(exact & {row for row, _ in index.nearest(query, 10)})
+            recall = hits / (10 * len(queries))
+            print(f"  ✓ Recall@10 vs brute force: {recall:.3f} (nprobe 8 of 32 lists)")
+            if recall < 0.9:
+                print("  ✗ Recall below 0.9")
+                return False
+            
+            index.delete_documents(["PMC_PMC0"])
+            results = index.search(vectors[0], 5)
+            if any(r["metadata"]["doc_id"] == "PMC_PMC0" for r in results):
+                print("  ✗ Deleted document still returned")
+                return False
+            index.close()
+            
+            reopened = QuantizedANNIndex(tmp, dim=64, nlist=32, nprobe=8)
+            if reopened.count() != 4900 or not reopened.stats()["trained"]:
+                print(f"  ✗ Index did not reload: {reopened.stats()}")
+                return False
+            reopened.close()
+            print("  ✓ Deletes and reload from memory-mapped files work")
+        return True
+    except Exception as e:
+        print(f"  ✗ ANN index test failed: {e}")
+        return False
+
+def test_metadata_filters():
+    """Test pre-filtered ANN search against filtered brute force"""
+    print("\nTesting metadata-filtered search...")
+    
+    import tempfile
+    import numpy as np
+    
+    try:
+        from src.graph_rag.ann_index import QuantizedANNIndex
+        
+        rng = np.random.default_rng(1)
+        centers = rng.normal(size=(32, 64))
+        vectors = centers[rng.integers(0, 32, 5000)] + 0.5 * rng.normal(size=(5000, 64))
+        vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+        metadatas = [
+            {"doc_id": f"PMC_PMC{i % 100}", "chunk_index": i, "year": 2000 + i % 25,
+             "keywords": "Microgravity; Bone loss" if i % 5 == 0 else "Radiation"}
+            for i in range(5000)
+        ]
+        cases = [
+            ({"doc_id": "PMC_PMC7"}, lambda m: m["doc_id"] == "PMC_PMC7"),
+            ({"year": {"$gte": 2010, "$lte": 2019}}, lambda m: 2010 <= m["year"] <= 2019),
+            ({"keywords": "microgravity", "year": {"$lt": 2005}}, lambda m: m["year"] < 2005 and m["i"] % 5 == 0),
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index = QuantizedANNIndex(tmp, dim=64, nlist=32, nprobe=8, train_size=2000, brute_force_limit=500)
+            index.add([f"chunk-{i}" for i in range(5000)], vectors, [f"text {i}" for i in range(5000)], metadatas)
+            
+            for filters, predicate in cases:
+                allowed = np.array([predicate({**m, "i": i}) for i, m in enumerate(metadatas)])
+                rows = index.select(filters)
+                if set(rows.tolist()) != set(np.flatnonzero(allowed).tolist()):
+                    print(f"  ✗ Wrong rows selected for {filters}")
+                    return False
+                hits = 0
+                for query in vectors[:20]:
+                    scores = np.where(allowed, vectors @ query, -np.inf)
+                    exact = set(np.argsort(-scores)[:10].tolist())
+                    found = [row for row, _ in index.nearest(query, 10, rows)]
+                    if not all(allowed[row] for row in found):
+                        print(f"  ✗ Result outside the filter {filters}")
+                        return False
+                    hits += len(exact & set(found))
+                if hits / 200 < 0.9:
+                    print(f"  ✗ Filtered recall@10 {hits / 200:.3f} below 0.9 for {filters}")
+                    return False
+                print(f"  ✓ {filters}: {len(rows)} rows, recall@10 {hits / 200:.3f}")
+            
+            try:
+                index.select({"source_url": "x"})
+                print("  ✗ Unindexed field accepted")
+                return False
+            except ValueError:
+                print("  ✓ Unindexed filter field rejected")
+            index.close()
+        return True
+    except Exception as e:
+        print(f"  ✗ Metadata filter test failed: {e}")
+        return False
+
+def test_reranker():
+    """Test cross-encoder re-ranking, score caching and the time budget"""
+    print("\nTesting cross-encoder re-ranker...")
+    
+    import time
+    
+    class FakeCrossEncoder:
+        def __init__(self):
+            self.calls = []
+            self.delay = 0.0
+        
+        def predict(self, pairs, batch_size=64):
+            self.calls.append(len(pairs))
+            time.sleep(self.delay)
+            return [len(set(query.split()) & set(text.split())) for query, text in pairs]
+    
+    try:
+        from src.graph_rag.reranker import CrossEncoderReranker
+        
+        model = FakeCrossEncoder()
+        reranker = CrossEncoderReranker(lambda: model, candidates=50, time_budget_ms=100)
+        results = [{"content": f"chunk {i}", "metadata": {}} for i in range(60)]
+        results[42]["content"] = "microgravity induces pelvic bone loss"
+        
+        reranked, stats = reranker.rerank("pelvic bone loss", results)
+        if reranked[0]["content"] != results[42]["content"] or stats["rerank_status"] != "ok" or model.calls != [50]:
+            print(f"  ✗ Unexpected re-rank: {stats}, calls {model.calls}")
+            return False
+        print(f"  ✓ Re-ranked 50 candidates in one forward pass ({stats['rerank_ms']:.1f} ms)")
+        
+        _, stats = reranker.rerank("pelvic bone loss", results)
+        if stats["rerank_status"] != "cached" or len(model.calls) != 1:
+            print(f"  ✗ Cached scores not reused: {stats}")
+            return False
+        print("  ✓ Repeated query served from the score cache")
+        
+        model.delay = 0.3
+        reranked, stats = reranker.rerank("bone density", results)
+        if stats["rerank_status"] != "timeout" or reranked != results:
+            print(f"  ✗ Budget not enforced: {stats}")
+            return False
+        print(f"  ✓ Over-budget re-rank fell back to first-stage order ({stats['rerank_ms']:.0f} ms)")
+        reranker.shutdown()
+        return True
+    except Exception as e:
+        print(f"  ✗ Re-ranker test failed: {e}")
+        return False
+
+def test_intent_routing():
+    """Test the compiled intent rules, confidence routing and the fallback"""
+    print("\nTesting intent routing...")
+    
+    import tempfile
+    
+    class FakeAgent:
+        def route_query(self, query, use_kg, use_vector):
+            kg_results = [] if "unknown" in query else [{"subject": "Microgravity", "relationship": "causes", "object": "Bone Loss"}]
+            return {
+                "query": query, "query_type": "hybrid", "final_answer": "kg" if use_kg else "vs",
+                "kg_results": kg_results if use_kg else [],
+                "vs_results": [] if use_kg else [{"content": "Bone loss in mice", "metadata": {}}],
+                "retrieval_stats": {},
+            }
+    
+    try:
+        from pathlib import Path
+        from src.graph_rag.intent_classifier import QueryIntentClassifier
+        from src.graph_rag.concurrent_retrieval import ConcurrentRetriever
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            classifier = QueryIntentClassifier(log_path=str(Path(tmp) / "routing_log.jsonl"))
+            expected = {
+                "What mechanisms and pathways cause bone loss?": ("kg_primary", "kg"),
+                "Describe and explain the Bion-M 1 mission": ("vs_primary", "vs"),
+                "What is the mechanism of bone loss?": ("hybrid", "both"),
+                "Bone loss in mice": ("hybrid", "both"),
+                "Is the effective dose of the countermeasure known?": ("hybrid", "both"),
+            }
+            for query, (intent, route) in expected.items():
+                decision = classifier.classify(query)
+                if (decision["intent"], decision["route"]) != (intent, route):
+                    print(f"  ✗ '{query}' classified as {decision}")
+                    return False
+            print(f"  ✓ Keyword rules classified and routed {len(expected)} queries")
+            
+            retriever = ConcurrentRetriever(FakeAgent(), intent_classifier=classifier)
+            routed = retriever.route_query("What mechanisms and pathways cause bone loss?")
+            fallback = retriever.route_query("What mechanisms and pathways cause unknown effects?")
+            fanout = retriever.route_query("Bone loss in mice")
+            retriever.shutdown()
+            if "vs_time_ms" in routed["retrieval_stats"] or routed["retrieval_stats"]["route_fallback"]:
+                print(f"  ✗ Confident query was not sent to the KG only: {routed['retrieval_stats']}")
+                return False
+            if not fallback["retrieval_stats"]["route_fallback"] or not fallback["vs_results"]:
+                print("  ✗ Empty KG result did not fall back to the vector store")
+                return False
+            if "kg_time_ms" not in fanout["retrieval_stats"] or "vs_time_ms" not in fanout["retrieval_stats"]:
+                print("  ✗ Low-confidence query did not fan out")
+                return False
+            print("  ✓ Confident queries use one backend, empty results fall back, others fan out")
+            
+            if classifier.log_path.exists():
+                print("  ✗ Routing log written on the request path")
+                return False
+            report = classifier.routing_report()
+            if report["decisions"] != 3 or report["accuracy"] != 0.5:
+                print(f"  ✗ Unexpected routing report: {report}")
+                return False
+            print(f"  ✓ Routing log buffered off the request path: {report}")
+            
+            labels = dict(classifier.logged_examples())
+            if labels != {"What mechanisms and pathways cause unknown effects?": "vs_primary"}:
+                print(f"  ✗ Confident routes fed back as labels: {labels}")
+                return False
+            print("  ✓ Only fallback and fan-out outcomes become training labels")
+            
+            classifier.max_log_bytes = 1
+            classifier.record("Bone loss in mice", classifier.classify("Bone loss in mice"), None)
+            classifier.flush()
+            rotated = classifier.log_path.with_name(classifier.log_path.name + ".1")
+            if classifier.log_path.exists() or not rotated.exists() or classifier.routing_report()["decisions"] != 4:
+                print("  ✗ Oversized routing log not rotated")
+                return False
+            print("  ✓ Routing log rotated past its size cap")
+        return True
+    except Exception as e:
+        print(f"  ✗ Intent routing test failed: {e}")
+        return False
+
+def test_section_chunker():
+    """Test heading-aware chunking sized in tokens"""
+    print("\nTesting section chunker...")
+    
+    paragraph = " ".join(f"Sentence {i} reports pelvic bone loss in flight mice." for i in range(60))
+    html = f"""<html><body><article><h1>Microgravity and Bone</h1>
+    <section><h2>Abstract</h2><p>Microgravity induces <i>pelvic</i> bone loss.</p></section>
+    <section><h2>Methods</h2><h3>Animals</h3><p>{paragraph}</p>
+    <table><tr><th>Group</th><th>BMD</th></tr><tr><td>Flight</td><td>0.8</td></tr></table></section>
+    <section><h2>Results</h2><p>Bone density fell.</p></section></article></body></html>"""
+    
+    try:
+        from src.data_ingestion.concurrent_loader import html_sections
+        from src.data_ingestion.section_chunker import TokenCounter, chunk_sections
+        
+        sections = html_sections(html)
+        paths = [path for path, _ in sections]
+        if paths != ["Abstract", "Methods > Animals", "Results"]:
+            print(f"  ✗ Unexpected section paths: {paths}")
+            return False
+        print(f"  ✓ Split on headings: {paths}")
+        
+        counter = TokenCounter()
+        chunks = chunk_sections(sections, counter, chunk_tokens=64, chunk_overlap=16)
+        sizes = counter.count([chunk for _, chunk in chunks])
+        if max(sizes) > 64 - counter.special_tokens:
+            print(f"  ✗ Chunk exceeds the token window: {max(sizes)}")
+            return False
+        if not any("Group | BMD\nFlight | 0.8" in chunk for _, chunk in chunks):
+            print("  ✗ Table was split")
+            return False
+        methods = [chunk for path, chunk in chunks if path == "Methods > Animals"]
+        last_sentence = methods[0].split(". ")[-1]
+        if len(methods) < 2 or last_sentence not in methods[1]:
+            print("  ✗ Consecutive chunks do not overlap")
+            return False
+        print(f"  ✓ {len(chunks)} chunks within the token window, tables intact, overlap carried")
+        return True
+    except Exception as e:
+        print(f"  ✗ Section chunker test failed: {e}")
+        return False
+
+def test_session_pool():
+    """Test that the pooled driver view follows a recreated driver"""
+    print("\nTesting Neo4j session pool...")
+    
+    from contextlib import contextmanager
+    
+    class FakeDriver:
+        def __init__(self, name):
+            self.name = name
+            self.alive = True
+            self.closed = False
+        
+        def verify_connectivity(self):
+            if not self.alive:
+                raise ConnectionError("connection reset")
+        
+        @contextmanager
+        def session(self, **kwargs):
+            yield self.name
+        
+        def close(self):
+            self.closed = True
+    
+    try:
+        import time
+        from src.graph_rag.connection_pool import Neo4jSessionPool, PooledDriver
+        
+        created = []
+        def factory(uri, auth):
+            created.append(FakeDriver(f"driver-{len(created)}"))
+            return created[-1]
+        
+        pool = Neo4jSessionPool("bolt://fake", "neo4j", "test", idle_check_after=0, driver_factory=factory)
+        driver = PooledDriver(pool)
+        with driver.session() as session:
+            first = session
+        created[0].alive = False
+        with driver.session() as session:
+            second = session
+        if (first, second) != ("driver-0", "driver-1") or not created[0].closed:
+            print(f"  ✗ Connector did not follow the recreated driver: {first}, {second}")
+            return False
+        print("  ✓ Connector sessions moved to the recreated driver")
+        
+        def failing_factory(uri, auth):
+            raise ConnectionError("refused")
+        pool._driver_factory = failing_factory
+        created[1].alive = False
+        try:
+            with driver.session():
+                pass
+        except ConnectionError:
+            pass
+        if pool.driver is not None or not created[1].closed:
+            print("  ✗ Closed driver left on the pool after a failed reconnect")
+            return False
+        print("  ✓ Failed reconnect leaves no closed driver behind")
+        
+        pool.close()
+        pool.connect = lambda: True
+        try:
+            with pool.session():
+                pass
+            print("  ✗ Session handed out without a driver")
+            return False
+        except ConnectionError as e:
+            if "unavailable" not in str(e):
+                print(f"  ✗ Unclear error without a driver: {e}")
+                return False
+        del pool.connect
+        print("  ✓ Missing driver raises a clear ConnectionError")
+        
+        probes = []
+        class SlowDriver(FakeDriver):
+            def verify_connectivity(self):
+                free = pool._lock.acquire(timeout=1)
+                if free:
+                    pool._lock.release()
+                probes.append(free)
+        
+        pool._driver_factory = factory
+        pool.idle_check_after = 60
+        pool.driver = SlowDriver("driver-slow")
+        pool._last_used = time.monotonic() - 120
+        with driver.session():
+            pass
+        with pool._lock:
+            idle_since = pool._last_used
+        with driver.session():
+            pass
+        if probes != [True] or time.monotonic() - idle_since > 60:
+            print(f"  ✗ Liveness probe held the lock or was not refreshed: {probes}")
+            return False
+        print("  ✓ Liveness probe runs outside the lock and refreshes last use")
+        
+        metrics = pool.metrics()
+        if metrics["acquired"] != 6 or metrics["in_use"] != 0:
+            print(f"  ✗ Connector sessions not counted by the pool: {metrics}")
+            return False
+        print(f"  ✓ Pool metrics cover connector sessions ({metrics['acquired']} acquired)")
+        return True
+    except Exception as e:
+        print(f"  ✗ Session pool test failed: {e}")
+        return False
+
+def test_hybrid_answer():
+    """Test that hybrid answers pair KG facts with supporting passages"""
+    print("\nTesting hybrid answer synthesis...")
+    
+    class FakeAgent:
+        def classify_query_intent(self, query):
+            return "hybrid"
+        
+        def route_query(self, query, use_kg, use_vector):
+            return {
+                "query": query, "query_type": "hybrid",
+                "final_answer": "KG answer" if use_kg else "VS answer",
+                "kg_results": [{"subject": "Microgravity", "relationship": "causes", "object": "Bone Loss"}] if use_kg else [],
+                "vs_results": [] if use_kg else [
+                    {"content": "Rodent hardware overview", "metadata": {"source_title": "Hardware"}},
+                    {"content": "Microgravity drives bone loss in mice", "metadata": {"source_title": "Bone"}},
+                ],
+                "retrieval_stats": {},
+            }
+    
+    try:
+        from src.graph_rag.concurrent_retrieval import ConcurrentRetriever
+        
+        retriever = ConcurrentRetriever(FakeAgent(), max_workers=1)
+        result = retriever.route_query("Does microgravity cause bone loss?")
+        retriever.shutdown()
+        answer = result["final_answer"]
+        if "KG answer" in answer or "VS answer" in answer:
+            print("  ✗ Hybrid answer is a concatenation of single-backend answers")
+            return False
+        lines = answer.splitlines()
+        fact = lines.index("- Microgravity causes Bone Loss")
+        if not lines[fact + 1].startswith("  Source: Bone:") or "Hardware" not in answer:
+            print(f"  ✗ Fact not paired with its supporting passage:\n{answer}")
+            return False
+        print("  ✓ KG fact paired with the passage that mentions it; other passages listed")
+        return True
+    except Exception as e:
+        print(f"  ✗ Hybrid answer test failed: {e}")
+        return False
+
+def test_answer_ordering():
+    """Test that answers are built from fused and re-ranked results"""
+    print("\nTesting answer ordering after fusion and re-ranking...")
+    
+    class FakeAgent:
+        def classify_query_intent(self, query):
+            return "hybrid"
+        
+        def route_query(self, query, use_kg, use_vector):
+            return {
+                "query": query, "query_type": "hybrid", "final_answer": "agent answer",
+                "kg_results": [
+                    {"subject": "Spaceflight", "relationship": "affects", "object": "Sleep"},
+                    {"subject": "Microgravity", "relationship": "causes", "object": "Bone Loss"},
+                ] if use_kg else [],
+                "vs_results": [] if use_kg else [
+                    {"content": "Plant growth on the ISS", "metadata": {"doc_id": "A", "chunk_index": 0, "source_title": "Plants"}},
+                    {"content": "Pelvic bone loss in mice", "metadata": {"doc_id": "B", "chunk_index": 0, "source_title": "Bone"}},
+                ],
+                "retrieval_stats": {},
+            }
+    
+    class FakeLexicalIndex:
+        def search(self, query, k):
+            return [{"content": "Pelvic bone loss in mice", "metadata": {"doc_id": "B", "chunk_index": 0, "source_title": "Bone"}}]
+    
+    class FakeCrossEncoder:
+        def predict(self, pairs, batch_size=32):
+            return [float("bone" in text.lower()) for _, text in pairs]
+    
+    try:
+        from src.graph_rag.concurrent_retrieval import ConcurrentRetriever
+        from src.graph_rag.reranker import CrossEncoderReranker
+        
+        retriever = ConcurrentRetriever(FakeAgent(), lexical_index=FakeLexicalIndex())
+        fused = retriever.route_query("pelvic bone loss", use_kg=False)
+        retriever.shutdown()
+        if fused["vs_results"][0]["metadata"]["doc_id"] != "B" or not fused["final_answer"].startswith("Relevant passages:\n- Bone:"):
+            print(f"  ✗ Answer does not follow the fused order: {fused['final_answer']!r}")
+            return False
+        print("  ✓ Passage answer follows the RRF-fused order")
+        
+        reranker = CrossEncoderReranker(lambda: FakeCrossEncoder(), time_budget_ms=5000)
+        retriever = ConcurrentRetriever(FakeAgent(), reranker=reranker)
+        reranked = retriever.route_query("bone loss", use_vector=False)
+        retriever.shutdown()
+        reranker.shutdown()
+        first = reranked["final_answer"].splitlines()[1]
+        if first != "- Microgravity causes Bone Loss":
+            print(f"  ✗ KG answer does not follow the re-ranked order: {reranked['final_answer']!r}")
+            return False
+        print("  ✓ Relationship answer follows the cross-encoder order")
+        return True
+    except Exception as e:
+        print(f"  ✗ Answer ordering test failed: {e}")
+        return False
+
+def test_semantic_cache_generation():
+    """Test that answers computed before a store update are never cached"""
+    print("\nTesting answer cache generations...")
+    
+    try:
+        from src.graph_rag.semantic_cache import SemanticAnswerCache
+        
+        cache = SemanticAnswerCache()
+        generation = cache.generation
+        cache.bump_generation()
+        cache.store("bone loss", True, True, {"final_answer": "stale"}, generation=generation)
+        if cache.lookup("bone loss", True, True)[0] is not None:
+            print("  ✗ Answer from an older generation was cached")
+            return False
+        print("  ✓ Answer from an older generation rejected")
+        
+        class BumpWhileSerializing:
+            def __str__(self):
+                cache.bump_generation()
+                return "ingestion finished mid-store"
+        
+        generation = cache.generation
+        cache.store("bone loss", True, True, {"final_answer": "stale", "note": BumpWhileSerializing()}, generation=generation)
+        if cache.lookup("bone loss", True, True)[0] is not None:
+            print("  ✗ Answer cached under the new generation after a concurrent bump")
+            return False
+        print("  ✓ Generation bump during store does not cache the stale answer")
+        
+        cache.store("bone loss", True, True, {"final_answer": "fresh"}, generation=cache.generation)
+        cached, _ = cache.lookup("bone loss", True, True)
+        if cached is None or cached["final_answer"] != "fresh":
+            print("  ✗ Current-generation answer not cached")
+            return False
+        print("  ✓ Current-generation answer served from cache")
+        
+        degraded = {"final_answer": "vector only", "retrieval_stats": {"kg_status": "timeout", "vs_status": "ok"}}
+        complete = {"final_answer": "hybrid", "retrieval_stats": {"kg_status": "ok", "vs_status": "ok"}}
+        cache.get_or_compute("muscle atrophy", True, True, lambda: degraded)
+        if cache.lookup("muscle atrophy", True, True)[0] is not None:
+            print("  ✗ Answer with a timed-out backend was cached")
+            return False
+        cache.get_or_compute("muscle atrophy", True, True, lambda: complete)
+        cached, _ = cache.lookup("muscle atrophy", True, True)
+        if cached is None or cached["final_answer"] != "hybrid":
+            print("  ✗ Answer with every backend ok not cached")
+            return False
+        print("  ✓ Only answers where every queried backend succeeded are cached")
+        return True
+    except Exception as e:
+        print(f"  ✗ Answer cache test failed: {e}")
+        return False
+
+def test_pipeline_dead_letters():
+    """Test that failed documents are dead-lettered instead of committed"""
+    print("\nTesting pipeline dead letters...")
+    
+    import tempfile
+    from langchain_core.documents import Document
+    
+    def chunk(doc_id, index, text):
+        return Document(page_content=text, metadata={"doc_id": doc_id, "chunk_index": index, "source_title": doc_id})
+    
+    def extract(doc):
+        if "unparseable" in doc.page_content:
+            raise ValueError("extractor crashed")
+        return [("Microgravity", "causes", "Bone Loss")]
+    
+    try:
+        from pathlib import Path
+        from src.data_ingestion.checkpoint_journal import PipelineJournal
+        from src.data_ingestion.streaming_pipeline import StreamingIngestionPipeline
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = PipelineJournal(str(Path(tmp) / "journal.sqlite"))
+            job_id, _ = journal.open_job("test")
+            done = []
+            pipeline = StreamingIngestionPipeline(
+                extract, vector_sink=lambda chunks: {}, graph_sink=lambda triples: {"failed_batches": 0},
+                on_document_done=lambda doc_id, chunks: done.append(doc_id),
+                extract_workers=1, journal=journal, job_id=job_id,
+            )
+            chunks = [chunk("PMC_OK", 0, "Microgravity causes bone loss"),
+                      chunk("PMC_BAD", 0, "Fine text"), chunk("PMC_BAD", 1, "unparseable text")]
+            snapshot = list(pipeline.run(chunks, report_interval=0.05))[-1]
+            dead = {entry["doc_id"]: entry for entry in journal.dead_letters()}
+            journal.close()
+        
+        if done != ["PMC_OK"] or snapshot["documents_failed"] != 1:
+            print(f"  ✗ Unexpected outcome: done={done}, failed={snapshot['documents_failed']}")
+            return False
+        if dead.get("PMC_BAD", {}).get("stage") != "extract" or "extractor crashed" not in dead["PMC_BAD"]["error"]:
+            print(f"  ✗ Extraction failure not dead-lettered: {dead}")
+            return False
+        print("  ✓ Chunk extraction failure dead-lettered the document instead of committing it")
+        
+        from src.data_ingestion.concurrent_loader import iter_publication_documents
+        from src.data_ingestion.fetcher import ConcurrentFetcher
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = PipelineJournal(str(Path(tmp) / "journal.sqlite"))
+            job_id, _ = journal.open_job("test")
+            done = []
+            pipeline = StreamingIngestionPipeline(
+                extract, vector_sink=lambda chunks: {},
+                graph_sink=lambda triples: {"failed_batches": 1, "failed_triples": triples, "errors": ["deadlock"]},
+                on_document_done=lambda doc_id, chunks: done.append(doc_id),
+                extract_workers=1, journal=journal, job_id=job_id,
+            )
+            list(pipeline.run([chunk("PMC_GRAPH", 0, "Microgravity causes bone loss")], report_interval=0.05))
+            
+            fetcher = ConcurrentFetcher(max_retries=0, timeout=2)
+            pipeline = StreamingIngestionPipeline(
+                extract, vector_sink=lambda chunks: {}, extract_workers=1, journal=journal, job_id=job_id,
+            )
+            chunks = iter_publication_documents([("Gone", "http://127.0.0.1:9/pmc/articles/PMC404/")],
+                                                fetcher=fetcher, failure_callback=pipeline.fail_source)
+            snapshot = list(pipeline.run(chunks, report_interval=0.05))[-1]
+            fetcher.close()
+            dead = {entry["doc_id"]: entry for entry in journal.dead_letters()}
+            journal.close()
+        
+        if done or dead.get("PMC_GRAPH", {}).get("stage") != "graph" or "deadlock" not in dead["PMC_GRAPH"]["error"]:
+            print(f"  ✗ Failed graph batch not dead-lettered: done={done}, dead={dead}")
+            return False
+        print("  ✓ Failed graph write batch dead-lettered its documents")
+        
+        gone = dead.get("PMC_PMC404", {})
+        if gone.get("stage") != "fetch" or gone.get("url") != "http://127.0.0.1:9/pmc/articles/PMC404/" or snapshot["documents_failed"] != 1:
+            print(f"  ✗ Fetch failure not dead-lettered: {dead}")
+            return False
+        print("  ✓ Fetch failure dead-lettered with its URL for retry")
+        return True
+    except Exception as e:
+        print(f"  ✗ Pipeline dead letter test failed: {e}")
+        return False
+
+def test_publication_cache_revalidation():
+    """Test that stale cache entries are revalidated and blobs are written atomically"""
+    print("\nTesting publication cache revalidation...")
+    
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    fixture_html = "<html><body><article><h1>Bone</h1><p>Microgravity induces bone loss.</p></article></body></html>"
+    hits = {"200": 0, "304": 0, "down": False}
+    
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        
+        def do_GET(self):
+            if hits["down"]:
+                self.send_response(500)
+                self.end_headers()
+                return
+            if self.headers.get("If-None-Match") == '"v1"':
+                hits["304"] += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            hits["200"] += 1
+            body = fixture_html.encode("utf-8")
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    items = [("Paper", f"http://127.0.0.1:{server.server_address[1]}/pmc/articles/PMC2000/")]
+    
+    try:
+        from src.data_ingestion.fetcher import ConcurrentFetcher
+        from src.data_ingestion.publication_cache import PublicationCache
+        from src.data_ingestion.concurrent_loader import load_and_chunk_documents_concurrent
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            fresh = PublicationCache(tmp, max_age_hours=24)
+            writes = []
+            write_blob = fresh._write_blob
+            fresh._write_blob = lambda digest, body: writes.append(digest) or write_blob(digest, body)
+            fetcher = ConcurrentFetcher(validator_store=fresh, max_retries=0, backoff_base=0.01)
+            load_and_chunk_documents_concurrent(items, fetcher=fetcher, cache=fresh)
+            if len(writes) != 1:
+                print(f"  ✗ Fetched page written {len(writes)} times")
+                return False
+            print("  ✓ Fetched page compressed and written once")
+            load_and_chunk_documents_concurrent(items, fetcher=fetcher, cache=fresh)
+            if hits["200"] != 1 or hits["304"] != 0:
+                print(f"  ✗ Fresh entry was refetched ({hits})")
+                return False
+            print("  ✓ Fresh entry served without a request")
+            
+            stale = PublicationCache(tmp, max_age_hours=0)
+            fetcher = ConcurrentFetcher(validator_store=stale, max_retries=0, backoff_base=0.01)
+            docs = load_and_chunk_documents_concurrent(items, fetcher=fetcher, cache=stale)
+            if hits["304"] != 1 or not docs:
+                print(f"  ✗ Stale entry not revalidated ({hits})")
+                return False
+            print("  ✓ Stale entry revalidated with a conditional GET (304)")
+            
+            hits["down"] = True
+            docs = load_and_chunk_documents_concurrent(items, fetcher=fetcher, cache=stale)
+            if not docs:
+                print("  ✗ Stale copy not served when revalidation failed")
+                return False
+            print("  ✓ Stale copy served when revalidation failed")
+            
+            errors = []
+            def write(i):
+                try:
+                    stale.put(items[0][1], fixture_html, text=f"text {i}")
+                except Exception as e:
+                    errors.append(e)
+            writers = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+            for thread in writers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            if errors or stale.get(items[0][1])["html"] != fixture_html:
+                print(f"  ✗ Concurrent blob writes failed: {errors}")
+                return False
+            print("  ✓ Concurrent writes of one blob stay intact")
+            fetcher.close()
+        return True
+    except Exception as e:
+        print(f"  ✗ Publication cache test failed: {e}")
+        return False
+    finally:
+        server.shutdown()
+
+def test_publication_cache_bounds():
+    """Test that replaced and orphaned blobs are deleted and count toward max_mb"""
+    print("\nTesting publication cache size bound...")
+    
+    import tempfile
+    import threading
+    
+    try:
+        from src.data_ingestion.publication_cache import PublicationCache
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PublicationCache(tmp)
+            url = "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC3000/"
+            old = cache.put(url, "<p>version one</p>")
+            new = cache.put(url, "<p>version two</p>")
+            if cache._blob_path(old).exists() or not cache._blob_path(new).exists():
+                print("  ✗ Replaced blob left on disk")
+                return False
+            print("  ✓ Replaced blob deleted")
+            
+            def add_chunks(i):
+                cache.put_chunks(url, f"chunker-{i}", [["Body", f"chunk {i}"]])
+            writers = [threading.Thread(target=add_chunks, args=(i,)) for i in range(8)]
+            for thread in writers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            if len(cache.get(url)["chunks"]) != 8:
+                print(f"  ✗ Concurrent chunk writes lost updates: {sorted(cache.get(url)['chunks'])}")
+                return False
+            print("  ✓ Concurrent chunk writes all kept")
+            cache.close()
+            
+            orphan = cache._blob_path("ab" * 32)
+            orphan.parent.mkdir(parents=True, exist_ok=True)
+            orphan.write_bytes(b"x" * 4096)
+            cache = PublicationCache(tmp)
+            if orphan.exists():
+                print("  ✗ Unreferenced blob survived a reopen")
+                return False
+            print("  ✓ Unreferenced blobs swept on open")
+            cache.close()
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            import os
+            cache = PublicationCache(tmp, max_mb=0.01)
+            pages = [os.urandom(3000).hex() for _ in range(4)]
+            for i, page in enumerate(pages):
+                cache.put(f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC40{i}/", page)
+            on_disk = sum(path.stat().st_size for path in cache.blob_dir.glob("*/*"))
+            if on_disk > cache.max_bytes or cache.stats()["entries"] >= len(pages):
+                print(f"  ✗ Blobs exceed max_mb: {on_disk} > {cache.max_bytes}")
+                return False
+            print(f"  ✓ Blobs on disk stay under max_mb ({on_disk} bytes)")
+            cache.close()
+        return True
+    except Exception as e:
+        print(f"  ✗ Publication cache bound test failed: {e}")
+        return False
+
+def test_ingestion_manifest():
+    """Test manifest diffs, opt-in removals and batched saves"""
+    print("\nTesting ingestion manifest...")
+    
+    import json
+    import tempfile
+    from pathlib import Path
+    from langchain_core.documents import Document
+    
+    try:
+        from src.data_ingestion.ingestion_manifest import IngestionManifest
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "manifest.json"
+            manifest = IngestionManifest(str(path), save_every=2)
+            bone = [Document(page_content="Microgravity induces bone loss.")]
+            muscle = [Document(page_content="Spaceflight causes muscle atrophy.")]
+            manifest.record("PMC_1", bone, "c1", "1")
+            manifest.record("PMC_2", muscle, "c1", "1")
+            
+            diff = manifest.diff({"PMC_1": bone, "PMC_2": bone, "PMC_3": muscle}, "c1", "1")
+            if diff["unchanged"] != ["PMC_1"] or diff["updated"] != ["PMC_2"] or diff["added"] != ["PMC_3"]:
+                print(f"  ✗ Wrong diff: {diff}")
+                return False
+            if manifest.diff({"PMC_1": bone}, "c2", "1")["updated"] != ["PMC_1"]:
+                print("  ✗ Chunker change not detected")
+                return False
+            print("  ✓ Added, updated and unchanged documents detected")
+            
+            if manifest.diff({}, "c1", "1")["removed"]:
+                print("  ✗ Documents reported removed without a corpus")
+                return False
+            if manifest.diff({}, "c1", "1", ["PMC_1"])["removed"] != ["PMC_2"]:
+                print("  ✗ Document missing from the corpus not reported removed")
+                return False
+            print("  ✓ Removals only reported against a full corpus")
+            
+            manifest = IngestionManifest(str(path), save_every=2)
+            manifest.record("PMC_1", bone, "c1", "1")
+            if manifest.checkpoint() or path.exists():
+                print("  ✗ Manifest saved before save_every changes")
+                return False
+            manifest.record("PMC_2", muscle, "c1", "1")
+            if not manifest.checkpoint() or len(json.loads(path.read_text())["documents"]) != 2:
+                print("  ✗ Manifest not saved after save_every changes")
+                return False
+            manifest.forget("PMC_2")
+            manifest.save()
+            if list(IngestionManifest(str(path)).entries) != ["PMC_1"]:
+                print("  ✗ Final save did not persist the manifest")
+                return False
+            print("  ✓ Manifest saved in batches and at the end")
+        return True
+    except Exception as e:
+        print(f"  ✗ Manifest test failed: {e}")
+        return False
+
+def test_embedding_cache_recovery():
+    """Test that a torn embedding cache write is cut back on load"""
+    print("\nTesting embedding cache recovery...")
+    
+    import tempfile
+    import numpy as np
+    
+    try:
+        from src.graph_rag.embedding_engine import EmbeddingCache
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = EmbeddingCache(tmp, dim=4, dtype="float32")
+            keys = [bytes([i]) * 20 for i in range(3)]
+            cache.put_many(keys, np.arange(12, dtype=np.float32).reshape(3, 4))
+            
+            # Crash mid-append: a full vector row without its key, then a partial row
+            with open(cache.vectors_path, "ab") as f:
+                f.write(np.ones(4, dtype=np.float32).tobytes() + b"\x00" * 5)
+            
+            cache = EmbeddingCache(tmp, dim=4, dtype="float32")
+            if len(cache) != 3 or cache.vectors_path.stat().st_size != 3 * 16:
+                print(f"  ✗ Torn vectors file not truncated ({cache.vectors_path.stat().st_size} bytes)")
+                return False
+            print("  ✓ Torn vectors file cut back to whole rows")
+            
+            fresh = b"\x09" * 20
+            cache.put_many([fresh], np.full((1, 4), 7, dtype=np.float32))
+            cache = EmbeddingCache(tmp, dim=4, dtype="float32")
+            vectors = cache.get_many([fresh, keys[2]])
+            if not np.array_equal(vectors[fresh], np.full(4, 7)) or not np.array_equal(vectors[keys[2]], np.arange(8, 12)):
+                print(f"  ✗ Wrong vectors after recovery: {vectors}")
+                return False
+            print("  ✓ Vectors appended after recovery read back correctly")
+        return True
+    except Exception as e:
+        print(f"  ✗ Embedding cache recovery test failed: {e}")
+        return False
+
+def test_pipeline_sink_errors():
+    """Test that a sink error fails its batch without stalling the pipeline"""
+    print("\nTesting pipeline sink errors...")
+    
+    import tempfile
+    import threading
+    from pathlib import Path
+    from langchain_core.documents import Document
+    
+    extracted = []
+    
+    def extract(doc):
+        extracted.append(doc.page_content)
+        return [("Microgravity", "causes", "Bone Loss")]
+    
+    try:
+        from src.data_ingestion.checkpoint_journal import PipelineJournal
+        from src.data_ingestion.streaming_pipeline import StreamingIngestionPipeline
+        
+        class FlakyJournal(PipelineJournal):
+            def mark_committed(self, doc_ids, sink):
+                if sink == "vector" and "PMC_0" in doc_ids:
+                    raise RuntimeError("journal write failed")
+                super().mark_committed(doc_ids, sink)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = FlakyJournal(str(Path(tmp) / "journal.sqlite"))
+            job_id, _ = journal.open_job("test")
+            done = []
+            pipeline = StreamingIngestionPipeline(
+                extract, vector_sink=lambda chunks: {}, graph_sink=lambda triples: {"failed_batches": 0},
+                on_document_done=lambda doc_id, chunks: done.append(doc_id),
+                extract_workers=1, queue_size=1, vector_batch_chunks=1, journal=journal, job_id=job_id,
+            )
+            chunks = [
+                Document(page_content=text, metadata={"doc_id": f"PMC_{i}", "chunk_index": j})
+                for i in range(6) for j, text in enumerate([f"Findings {i}", "Boilerplate", "Boilerplate"])
+            ]
+            snapshots = []
+            runner = threading.Thread(target=lambda: snapshots.extend(pipeline.run(chunks, report_interval=0.05)), daemon=True)
+            runner.start()
+            runner.join(20)
+            dead = [entry["doc_id"] for entry in journal.dead_letters()]
+            journal.close()
+        
+        if runner.is_alive():
+            print("  ✗ Pipeline stalled after a sink error")
+            return False
+        if sorted(done) != [f"PMC_{i}" for i in range(1, 6)] or dead != ["PMC_0"]:
+            print(f"  ✗ Unexpected outcome: done={done}, dead={dead}")
+            return False
+        print("  ✓ Sink error dead-lettered its batch and the pipeline kept draining")
+        
+        if len(extracted) != 12:
+            print(f"  ✗ Repeated chunks extracted again ({len(extracted)} calls)")
+            return False
+        print("  ✓ Repeated chunks within a document extracted once")
+        return True
+    except Exception as e:
+        print(f"  ✗ Pipeline sink error test failed: {e}")
+        return False
+
+def test_job_link_validation():
+    """Test that the jobs API only accepts PMC links and streams progress deltas"""
+    print("\nTesting job link validation...")
+    
+    try:
+        from pydantic import ValidationError
+        from src.api.models.job_models import IngestJobRequest
+        from src.services.job_runner import progress_delta
+        
+        IngestJobRequest(publications=[
+            {"title": "Bone", "link": "https://pmc.ncbi.nlm.nih.gov/articles/PMC3630201/"},
+            {"title": "Muscle", "link": "http://www.ncbi.nlm.nih.gov/pmc/articles/PMC11988870/"},
+        ])
+        print("  ✓ PMC links accepted")
+        
+        rejected = [
+            "http://169.254.169.254/latest/meta-data/",
+            "http://localhost:7474/db/neo4j",
+            "file:///etc/passwd",
+            "gopher://www.ncbi.nlm.nih.gov/",
+            "https://www.ncbi.nlm.nih.gov.attacker.example/",
+            "https://user@www.ncbi.nlm.nih.gov/pmc/",
+            "https://www.ncbi.nlm.nih.gov:8443/pmc/",
+        ]
+        for link in rejected:
+            try:
+                IngestJobRequest(publications=[{"title": "x", "link": link}])
+            except ValidationError:
+                continue
+            print(f"  ✗ Link accepted: {link}")
+            return False
+        print(f"  ✓ {len(rejected)} non-PMC links rejected (422)")
+        
+        previous = "🚀 Starting...\n" * 500 + "Stages: 1 doc\n"
+        current = "🚀 Starting...\n" * 500 + "✓ Paper 1\nStages: 2 docs\n"
+        offset, delta = progress_delta(previous, current)
+        if previous[:offset] + delta != current or delta != "✓ Paper 1\nStages: 2 docs\n":
+            print(f"  ✗ Wrong progress delta: {offset}, {delta!r}")
+            return False
+        print("  ✓ Progress streamed as deltas")
+        return True
+    except Exception as e:
+        print(f"  ✗ Job link validation test failed: {e}")
+        return False
+
+def test_graph_replica_updates():
+    """Test incremental add, remove and compaction of the graph replica"""
+    print("\nTesting graph replica updates...")
+    
+    def triple(subject, relationship, obj, doc_id):
+        return {"subject": subject, "relationship": relationship, "object": obj,
+                "evidence": f"{subject} {relationship} {obj} ({doc_id})", "metadata": {"doc_id": doc_id}}
+    
+    def edges(replica, name):
+        return sorted((r["subject"], r["relationship"], r["object"], r["doc_id"])
+                      for r in replica.neighborhood([name], hops=1))
+    
+    try:
+        from src.graph_rag.bulk_writer import triple_to_row
+        from src.graph_rag.graph_replica import GraphReplica
+        
+        replica = GraphReplica(compact_threshold=100)
+        replica.load_rows([triple_to_row(triple("Microgravity", "causes", "Bone Loss", "PMC_A")),
+                           triple_to_row(triple("Microgravity", "affects", "Muscle", "PMC_B"))])
+        added = replica.add_triples([triple("Microgravity", "inhibits", "Osteoblasts", "PMC_C"),
+                                     triple("Microgravity", "inhibits", "Osteoblasts", "PMC_C")])
+        if added != 1 or len(edges(replica, "Microgravity")) != 3:
+            print(f"  ✗ Delta add wrong: added={added}, edges={edges(replica, 'Microgravity')}")
+            return False
+        print("  ✓ Added triples visible alongside loaded edges (duplicates merged)")
+        
+        removed = replica.remove_documents(["PMC_A", "PMC_C"])
+        if removed != 2 or edges(replica, "Microgravity") != [("Microgravity", "affects", "Muscle", "PMC_B")]:
+            print(f"  ✗ Remove wrong: removed={removed}, edges={edges(replica, 'Microgravity')}")
+            return False
+        if replica.add_triples([triple("Microgravity", "causes", "Bone Loss", "PMC_A")]) != 1:
+            print("  ✗ Removed edge could not be re-added")
+            return False
+        print("  ✓ Removed documents tombstoned in base and delta; re-ingest re-adds them")
+        
+        before = edges(replica, "Microgravity")
+        arena = replica.stats()["arena_mb"]
+        replica.compact()
+        stats = replica.stats()
+        if edges(replica, "Microgravity") != before or stats["delta_relationships"] or stats["relationships"] != 2:
+            print(f"  ✗ Compaction changed the graph: {edges(replica, 'Microgravity')}, {stats}")
+            return False
+        if stats["arena_mb"] >= arena or edges(replica, "Bone Loss") != [("Microgravity", "causes", "Bone Loss", "PMC_A")]:
+            print("  ✗ Compaction did not reclaim evidence or rebuild incoming edges")
+            return False
+        print("  ✓ Compaction kept live edges, dropped tombstones and reclaimed evidence")
+        
+        replica = GraphReplica(compact_threshold=10)
+        replica.load_rows([])
+        replica.add_triples([triple(f"Entity {i}", "affects", "Bone Loss", "PMC_D") for i in range(12)])
+        if replica.stats()["delta_relationships"] or len(edges(replica, "Bone Loss")) != 12:
+            print(f"  ✗ Delta not compacted at the threshold: {replica.stats()}")
+            return False
+        print("  ✓ Delta compacted automatically at the threshold")
+        return True
+    except Exception as e:
+        print(f"  ✗ Graph replica update test failed: {e}")
+        return False
+
+def test_lexical_index_updates():
+    """Test BM25 upserts and incremental document deletes"""
+    print("\nTesting lexical index updates...")
+    
+    import tempfile
+    from pathlib import Path
+    
+    def meta(doc_id):
+        return {"doc_id": doc_id, "source_title": f"Paper {doc_id}"}
+    
+    try:
+        from src.graph_rag.lexical_index import LexicalIndex
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index = LexicalIndex(str(Path(tmp) / "lexical.sqlite"))
+            index.upsert(["PMC_A_chunk_0", "PMC_A_chunk_1"],
+                         ["Microgravity induces osteoclast activity.", "Bone loss in the pelvis."],
+                         [meta("PMC_A"), meta("PMC_A")])
+            index.upsert(["PMC_B_chunk_0"], ["Osteoclast inhibitors mitigate bone loss."], [meta("PMC_B")])
+            
+            index.upsert(["PMC_A_chunk_0"], ["Microgravity induces muscle atrophy."], [meta("PMC_A")])
+            docs = {r["metadata"]["doc_id"] for r in index.search("osteoclast")}
+            if index.count() != 3 or docs != {"PMC_B"}:
+                print(f"  ✗ Upsert did not replace the chunk: count={index.count()}, docs={docs}")
+                return False
+            print("  ✓ Re-ingested chunk replaced by its chunk ID")
+            
+            removed = index.delete_documents(["PMC_A", "PMC_MISSING"])
+            docs = [r["metadata"]["doc_id"] for r in index.search("bone loss")]
+            if removed != 2 or index.count() != 1 or docs != ["PMC_B"] or index.search("atrophy"):
+                print(f"  ✗ Delete wrong: removed={removed}, count={index.count()}, docs={docs}")
+                return False
+            print("  ✓ Deleting a document removed only its chunks")
+            
+            index.upsert(["PMC_A_chunk_0"], ["Microgravity induces bone loss."], [meta("PMC_A")])
+            docs = sorted(r["metadata"]["doc_id"] for r in index.search("bone loss"))
+            index.close()
+        if docs != ["PMC_A", "PMC_B"]:
+            print(f"  ✗ Document not searchable after re-adding: {docs}")
+            return False
+        print("  ✓ Deleted document searchable again after re-ingestion")
+        return True
+    except Exception as e:
+        print(f"  ✗ Lexical index update test failed: {e}")
+        return False
+
+def test_ann_index_recovery():
+    """Test that torn ANN index files are cut back to committed rows on load"""
+    print("\nTesting ANN index recovery...")
+    
+    import tempfile
+    import numpy as np
+    
+    try:
+        from src.graph_rag.ann_index import QuantizedANNIndex
+        
+        rng = np.random.default_rng(1)
+        vectors = rng.normal(size=(6, 8)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index = QuantizedANNIndex(tmp, dim=8, train_size=1000)
+            index.add([f"chunk-{i}" for i in range(5)], vectors[:5], [f"text {i}" for i in range(5)],
+                      [{"doc_id": f"PMC_{i}"} for i in range(5)])
+            index.close()
+            
+            # Crash mid-append: vector and code rows written without their metadata, one of them partial
+            with open(index.vectors_path, "ab") as f:
+                f.write(np.ones(8, dtype=np.float16).tobytes() + b"\x00" * 3)
+            with open(index.codes_path, "ab") as f:
+                f.write(b"\x01" * 8)
+            
+            index = QuantizedANNIndex(tmp, dim=8, train_size=1000)
+            if index.count() != 5 or index.vectors_path.stat().st_size != 5 * 16 or index.codes_path.stat().st_size != 5 * 8:
+                print(f"  ✗ Torn files not truncated: {index.vectors_path.stat().st_size}, {index.codes_path.stat().st_size}")
+                return False
+            print("  ✓ Torn vector and code files cut back to committed rows")
+            
+            index.add(["chunk-new"], vectors[5:], ["new text"], [{"doc_id": "PMC_NEW"}])
+            index.close()
+            index = QuantizedANNIndex(tmp, dim=8, train_size=1000)
+            results = index.search(vectors[5], 1)
+            index.close()
+        if not results or results[0]["content"] != "new text":
+            print(f"  ✗ Row appended after recovery not found: {results}")
+            return False
+        print("  ✓ Rows appended after recovery are searchable")
+        return True
+    except Exception as e:
+        print(f"  ✗ ANN index recovery test failed: {e}")
+        return False
+
+def test_job_failure_status():
+    """Test that a job whose run crashes ends as failed, not completed"""
+    print("\nTesting job failure status...")
+    
+    try:
+        from src.services.job_runner import JobRunner
+        
+        def crashing_run(cancel_event=None):
+            status = "🚀 Starting pipeline...\n"
+            yield status
+            try:
+                raise ConnectionError("Neo4j is not reachable")
+            except Exception as e:
+                yield status + f"❌ Pipeline failed: {e}\n"
+                raise
+        
+        def clean_run(cancel_event=None):
+            yield "✅ PIPELINE COMPLETE!\n"
+        
+        runner = JobRunner(max_workers=1)
+        failed_id = runner.submit("ingest", crashing_run, label="crash")
+        ok_id = runner.submit("ingest", clean_run, label="ok")
+        failed = list(runner.follow(failed_id))[-1]
+        ok = list(runner.follow(ok_id))[-1]
+        runner.shutdown()
+        
+        if failed["status"] != "failed" or "not reachable" not in (failed["error"] or ""):
+            print(f"  ✗ Crashed run reported as {failed['status']} (error={failed['error']})")
+            return False
+        if "❌ Pipeline failed" not in failed["progress"]:
+            print("  ✗ Final failure status line lost")
+            return False
+        print("  ✓ Crashed run ends as failed with its error and last status")
+        
+        if ok["status"] != "completed" or ok["error"]:
+            print(f"  ✗ Clean run reported as {ok['status']}")
+            return False
+        print("  ✓ Clean run ends as completed")
+        return True
+    except Exception as e:
+        print(f"  ✗ Job failure status test failed: {e}")
+        return False
+
+def test_entity_canonicalizer_markers():
+    """Test that names differing in a number, numeral or letter never merge"""
+    print("\nTesting entity canonicalizer merge guards...")
+    
+    import json
+    import tempfile
+    import numpy as np
+    from pathlib import Path
+    
+    def agreeing(texts):
+        return np.ones((len(texts), 4), dtype=np.float32) / 2
+    
+    def disagreeing(texts):
+        return np.eye(len(texts), 4, dtype=np.float32)
+    
+    def triple(subject, obj):
+        return {"subject": subject, "relationship": "affects", "object": obj, "metadata": {"doc_id": "PMC_1"}}
+    
+    pairs = [("Type 1 Diabetes", "Type 2 Diabetes"), ("Interleukin-6", "Interleukin-8"),
+             ("Chromosome 21", "Chromosome 22"), ("Collagen type I", "Collagen type II"),
+             ("Vitamin D", "Vitamin K")]
+    
+    try:
+        from src.graph_rag.entity_canonicalizer import EntityCanonicalizer
+        
+        for embed_fn in (None, agreeing):
+            for first, second in pairs:
+                canonicalizer = EntityCanonicalizer(embed_fn=embed_fn)
+                canonicalizer.canonicalize([triple(first, "Bone Loss")])
+                _, stats = canonicalizer.canonicalize([triple(second, "Bone Loss")])
+                if stats["entities_merged"]:
+                    print(f"  ✗ {first!r} and {second!r} merged")
+                    return False
+        print(f"  ✓ {len(pairs)} pairs differing in a number, numeral or letter kept apart")
+        
+        merges = {}
+        for name, embed_fn in (("no model", None), ("agreeing", agreeing), ("disagreeing", disagreeing)):
+            canonicalizer = EntityCanonicalizer(embed_fn=embed_fn)
+            canonicalizer.canonicalize([triple("Microgravity", "Bone Loss")])
+            merges[name] = canonicalizer.canonicalize([triple("Microgravitty", "Bone Loss")])[1]["entities_merged"]
+        if merges != {"no model": 1, "agreeing": 1, "disagreeing": 0}:
+            print(f"  ✗ Unexpected typo merges: {merges}")
+            return False
+        print("  ✓ String matches merge only when the embeddings agree")
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "registry.jsonl"
+            path.write_text("\n".join(json.dumps(entry) for entry in [
+                {"key": "type 1 diabetes", "canonical": "Type 1 Diabetes"},
+                {"key": "type 2 diabetes", "canonical": "Type 1 Diabetes", "type": "Unknown"},
+                {"key": "type 2 diabetes", "canonical": "Type 1 Diabetes", "alias": "Type 2 Diabetes"},
+            ]) + "\n")
+            canonicalizer = EntityCanonicalizer(str(path))
+            rows, _ = canonicalizer.canonicalize([triple("Type 2 Diabetes", "Bone Loss")])
+        if rows[0]["subject"] != "Type 2 Diabetes" or canonicalizer.aliases("Type 1 Diabetes"):
+            print(f"  ✗ Bad merge from the registry still applied: {rows[0]['subject']}")
+            return False
+        print("  ✓ Forbidden merges in an existing registry ignored on load")
+        return True
+    except Exception as e:
+        print(f"  ✗ Entity canonicalizer test failed: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("=" * 60)
@@ -151,7 +1567,30 @@ def main():
         ("Connectors", test_connectors),
         ("Agent", test_agent),
         ("Deployment Files", test_deployment_files),
-        ("Mock Query", test_mock_query)
+        ("Mock Query", test_mock_query),
+        ("Concurrent Fetcher", test_concurrent_fetcher),
+        ("Bulk Graph Writer", test_bulk_graph_writer),
+        ("ANN Recall", test_ann_recall),
+        ("Metadata Filters", test_metadata_filters),
+        ("Re-ranker", test_reranker),
+        ("Intent Routing", test_intent_routing),
+        ("Section Chunker", test_section_chunker),
+        ("Session Pool", test_session_pool),
+        ("Hybrid Answer", test_hybrid_answer),
+        ("Answer Ordering", test_answer_ordering),
+        ("Answer Cache Generations", test_semantic_cache_generation),
+        ("Pipeline Dead Letters", test_pipeline_dead_letters),
+        ("Publication Cache Revalidation", test_publication_cache_revalidation),
+        ("Publication Cache Bounds", test_publication_cache_bounds),
+        ("Ingestion Manifest", test_ingestion_manifest),
+        ("Embedding Cache Recovery", test_embedding_cache_recovery),
+        ("Pipeline Sink Errors", test_pipeline_sink_errors),
+        ("Job Link Validation", test_job_link_validation),
+        ("Graph Replica Updates", test_graph_replica_updates),
+        ("Lexical Index Updates", test_lexical_index_updates),
+        ("ANN Index Recovery", test_ann_index_recovery),
+        ("Job Failure Status", test_job_failure_status),
+        ("Entity Merge Guards", test_entity_canonicalizer_markers)
     ]
     
     results = []
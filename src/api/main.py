@@ -1,9 +1,22 @@
 # src/api/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import chat  # Only import chat for now
+from .routes import chat, jobs
+from src.services import ingestion_service, rag_service
+
 
-app = FastAPI(title="BodhiRAG API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared Neo4j pool and load the vector store in the background
+    rag_service.start_warm_up()
+    yield
+    ingestion_service.jobs.shutdown()
+    rag_service.shutdown()
+
+app = FastAPI(title="BodhiRAG API", version="1.0.0", lifespan=lifespan)
 
 # CORS for web/mobile apps
 app.add_middleware(
@@ -13,13 +26,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include only chat router for now
 app.include_router(chat.router, prefix="/api/v1")
+app.include_router(jobs.router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
     return {"message": "BodhiRAG API", "status": "healthy"}
 
+# Plain def: the stats calls below hit SQLite, so FastAPI runs this on its threadpool
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "BodhiRAG API"}
\ No newline at end of file
+def health_check():
+    return {
+        "status": "healthy",
+        "service": "BodhiRAG API",
+        "neo4j_pool": rag_service.kg_pool.metrics(),
+        "vector_store": rag_service.vector_store_health(),
+        "ingestion_jobs": ingestion_service.jobs.stats(),
+        "store_stats": rag_service.store_stats.snapshot(),
+        "kg_replica": rag_service.kg_replica.stats(),
+        "lexical_index": {"enabled": rag_service.LEXICAL_SEARCH_ENABLED, "chunks": rag_service.lexical_index.count()},
+        "routing": rag_service.intent_classifier.stats(),
+        "vector_backend": {
+            "name": rag_service.VECTOR_BACKEND,
+            **(rag_service.ann_index.stats() if rag_service.ann_index is not None else {}),
+        },
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    vector_store = rag_service.vector_store_health()
+    status_code = 200 if vector_store["warm"] else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"ready": vector_store["warm"], "vector_store": vector_store},
+    )
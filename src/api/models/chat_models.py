@@ -0,0 +1,62 @@
+# src/api/models/chat_models.py
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+# Rules.md: paginate large responses (max 50 items per request)
+MAX_ITEMS = 50
+
+
+class ChatRequest(BaseModel):
+    """A question for the hybrid RAG agent."""
+    query: str = Field(..., min_length=1, max_length=1000, description="The user question.")
+    use_kg: bool = Field(True, description="Query the knowledge graph.")
+    use_vector: bool = Field(True, description="Query the vector store.")
+    filters: Optional[Dict[str, Any]] = Field(
+        None,
+        description='Metadata filter for document retrieval, e.g. {"year": {"$gte": 2015}, "keywords": "microgravity"}.',
+    )
+
+
+class KGHit(BaseModel):
+    """A knowledge graph relationship with its evidence."""
+    subject: str
+    relationship: str
+    object: str
+    evidence: Optional[str] = None
+
+
+class KGPathStep(BaseModel):
+    """One hop of a knowledge graph path, with the evidence behind it."""
+    subject: str
+    relationship: str
+    object: str
+    evidence_count: int = 0
+    evidence: List[str] = Field(default_factory=list)
+    doc_ids: List[str] = Field(default_factory=list)
+
+
+class KGPath(BaseModel):
+    """A multi-hop path between query entities."""
+    entities: List[str]
+    hops: int
+    steps: List[KGPathStep] = Field(default_factory=list)
+    evidence_count: int = 0
+    explanation: str = ""
+
+
+class VectorHit(BaseModel):
+    """A retrieved document chunk."""
+    content: str
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class ChatResponse(BaseModel):
+    """The complete (non-streaming) answer."""
+    query: str
+    query_type: Optional[str] = None
+    final_answer: str
+    kg_results: List[KGHit] = Field(default_factory=list)
+    kg_paths: List[KGPath] = Field(default_factory=list)
+    vs_results: List[VectorHit] = Field(default_factory=list)
+    retrieval_stats: Dict[str, Any] = Field(default_factory=dict)
@@ -0,0 +1,60 @@
+# src/api/models/job_models.py
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, Field, field_validator
+
+# Rules.md: paginate large responses (max 50 items per request)
+MAX_JOBS = 50
+
+# Links are fetched server-side, so only PMC / NCBI hosts (and their subdomains) are accepted
+ALLOWED_LINK_HOSTS = ("ncbi.nlm.nih.gov",)
+
+
+class Publication(BaseModel):
+    """One row of the publications CSV."""
+    title: str = Field(..., min_length=1, description="Publication title.")
+    link: str = Field(..., min_length=1, description="PMC article URL (http/https on an NCBI host).")
+
+    @field_validator("link")
+    @classmethod
+    def check_link(cls, link: str) -> str:
+        """Reject anything but http(s) links to an allowed host"""
+        link = link.strip()
+        parts = urlsplit(link)
+        if parts.scheme not in ("http", "https") or parts.username or parts.password:
+            raise ValueError("link must be a plain http or https URL")
+        if parts.port not in (None, 80, 443):
+            raise ValueError("link must use the default http/https port")
+        host = (parts.hostname or "").lower()
+        if not any(host == allowed or host.endswith("." + allowed) for allowed in ALLOWED_LINK_HOSTS):
+            raise ValueError(f"link host {host or '(none)'} is not allowed; use a PMC article URL")
+        return link
+
+
+class IngestJobRequest(BaseModel):
+    """Publications to ingest in a background job."""
+    publications: List[Publication] = Field(..., min_length=1, description="Publications to ingest.")
+    max_docs: Optional[int] = Field(None, ge=1, description="Maximum number of publications to process.")
+    sync: bool = Field(False, description="Also remove ingested publications that are not in this list.")
+
+
+class JobStatus(BaseModel):
+    """State of a background job."""
+    job_id: str
+    kind: str
+    label: str = ""
+    status: str
+    queue_position: Optional[int] = None
+    progress: Optional[str] = None
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class JobList(BaseModel):
+    """Recent jobs, newest first."""
+    jobs: List[JobStatus] = Field(default_factory=list)
+    queued: int
+    running: int
@@ -0,0 +1,186 @@
+# src/api/routes/chat.py
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from ..models.chat_models import MAX_ITEMS, ChatRequest, ChatResponse
+from src.graph_rag.metadata_filter import normalize_filters
+from src.graph_rag.semantic_cache import answer_complete
+from src.services import rag_service
+
+router = APIRouter(tags=["chat"])
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _answer(request: ChatRequest) -> Dict[str, Any]:
+    """Blocking retrieval, run on the threadpool"""
+    if request.use_kg:
+        rag_service.ensure_kg_connected()
+    if request.use_vector:
+        rag_service.ensure_vector_store()
+    return rag_service.answer_query(request.query.strip(), request.use_kg, request.use_vector, request.filters)
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """Answer a question and return the complete result as JSON"""
+    if not (request.use_kg or request.use_vector):
+        raise HTTPException(status_code=400, detail="Enable at least one of use_kg / use_vector")
+
+    try:
+        result = await run_in_threadpool(_answer, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid request: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Retrieval failed: {e}")
+
+    return ChatResponse(
+        query=request.query,
+        query_type=result.get("query_type"),
+        final_answer=result.get("final_answer", ""),
+        kg_results=(result.get("kg_results") or [])[:MAX_ITEMS],
+        kg_paths=(result.get("kg_paths") or [])[:MAX_ITEMS],
+        vs_results=(result.get("vs_results") or [])[:MAX_ITEMS],
+        retrieval_stats=result.get("retrieval_stats", {}),
+    )
+
+
+def _backend_event(backend: str, result: Optional[Dict[str, Any]], info: Dict[str, Any]) -> str:
+    """kg or vector event for one backend's result"""
+    hits = (result or {}).get(f"{backend}_results") or []
+    if backend == "kg":
+        paths = (result or {}).get("kg_paths") or []
+        return _sse("kg", {**info, "count": len(hits), "hits": hits[:MAX_ITEMS], "paths": paths[:MAX_ITEMS]})
+    return _sse("vector", {**info, "count": len(hits), "hits": hits[:MAX_ITEMS]})
+
+
+def _cached_events(request: ChatRequest, result: Dict[str, Any]):
+    """Replay a cached answer as the usual event sequence"""
+    kg_hits = result.get("kg_results") or []
+    vs_hits = result.get("vs_results") or []
+    yield "classification", {"query": request.query.strip(), "query_type": result.get("query_type")}
+    if request.use_kg:
+        yield "kg", {
+            "status": "cached", "time_ms": 0.0, "error": None, "count": len(kg_hits), "hits": kg_hits[:MAX_ITEMS],
+            "paths": (result.get("kg_paths") or [])[:MAX_ITEMS],
+        }
+    if request.use_vector:
+        yield "vector", {"status": "cached", "time_ms": 0.0, "error": None, "count": len(vs_hits), "hits": vs_hits[:MAX_ITEMS]}
+    yield "answer", {
+        "final_answer": result.get("final_answer", ""),
+        "query_type": result.get("query_type"),
+        "retrieval_stats": result.get("retrieval_stats", {}),
+    }
+
+
+async def _chat_events(request: ChatRequest) -> AsyncIterator[str]:
+    """
+    Stream a hybrid answer as it is assembled
+
+    Events, in order: classification, kg, vector, answer (or error).
+    Both backends start together; KG hits are sent as soon as they arrive,
+    so clients can render graph evidence while the vector search finishes.
+
+    Hybrid queries are routed like /chat: when the intent classifier is
+    confident, only its backend runs, and the other one is asked only if
+    it comes back empty.
+    """
+    query = request.query.strip()
+    retriever = rag_service.retriever
+    cache = rag_service.answer_cache
+
+    try:
+        # Cached answers are unfiltered
+        cached = embedding = None
+        if not request.filters:
+            cached, embedding = await run_in_threadpool(cache.lookup, query, request.use_kg, request.use_vector)
+        if cached is not None:
+            for event, payload in _cached_events(request, cached):
+                yield _sse(event, payload)
+            return
+        generation = cache.generation
+
+        decision = None
+        if request.use_kg and request.use_vector:
+            decision = await run_in_threadpool(retriever.decide_route, query)
+        if decision is not None:
+            query_type = decision["intent"]
+        else:
+            query_type = await run_in_threadpool(retriever.classify_intent, query)
+        yield _sse("classification", {"query": query, "query_type": query_type})
+
+        backends = [b for b, enabled in (("kg", request.use_kg), ("vs", request.use_vector)) if enabled]
+        if decision is not None and decision["route"] != "both":
+            backends = [decision["route"]]
+        submit = {"kg": lambda: retriever.submit_kg(query), "vs": lambda: retriever.submit_vector(query, request.filters)}
+        ensure = {"kg": rag_service.ensure_kg_connected, "vs": rag_service.ensure_vector_store}
+        timeouts = {"kg": retriever.kg_timeout, "vs": retriever.vs_timeout}
+
+        for backend in backends:
+            await run_in_threadpool(ensure[backend])
+
+        start = time.perf_counter()
+        futures = {backend: submit[backend]() for backend in backends}
+        results: Dict[str, Optional[Dict[str, Any]]] = {"kg": None, "vs": None}
+        retrieval_stats: Dict[str, Any] = {}
+
+        async def collect(backend: str, future, deadline: float):
+            results[backend], info = await retriever.collect_async(future, deadline)
+            retrieval_stats.update({f"{backend}_time_ms": info["time_ms"], f"{backend}_status": info["status"]})
+            return _backend_event(backend, results[backend], info)
+
+        for backend, future in futures.items():
+            yield await collect(backend, future, start + timeouts[backend])
+
+        fallback = False
+        if len(backends) == 1 and decision is not None and not (results[backends[0]] or {}).get(f"{backends[0]}_results"):
+            fallback = True
+            other = "vs" if backends[0] == "kg" else "kg"
+            await run_in_threadpool(ensure[other])
+            yield await collect(other, submit[other](), time.perf_counter() + timeouts[other])
+
+        if results["kg"] is None and results["vs"] is None:
+            yield _sse("error", {"detail": "No retrieval backend returned results"})
+            return
+
+        result = retriever.merge(query, results["kg"], results["vs"], query_type=query_type)
+        result["retrieval_stats"].update(retrieval_stats)
+        result["retrieval_stats"]["total_time_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if decision is not None:
+            await run_in_threadpool(retriever.record_route, query, decision, result, fallback)
+        if not request.filters and answer_complete(result):
+            cache.store(query, request.use_kg, request.use_vector, result, embedding, generation)
+        result["retrieval_stats"]["cache"] = "miss"
+        yield _sse("answer", {
+            "final_answer": result["final_answer"],
+            "query_type": result["query_type"],
+            "retrieval_stats": result["retrieval_stats"],
+        })
+
+    except Exception as e:
+        yield _sse("error", {"detail": str(e)})
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Answer a question, streaming partial results as Server-Sent Events"""
+    if not (request.use_kg or request.use_vector):
+        raise HTTPException(status_code=400, detail="Enable at least one of use_kg / use_vector")
+    try:
+        normalize_filters(request.filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid request: {e}")
+
+    return StreamingResponse(
+        _chat_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
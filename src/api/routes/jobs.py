@@ -0,0 +1,109 @@
+# src/api/routes/jobs.py
+import json
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from ..models.job_models import MAX_JOBS, IngestJobRequest, JobList, JobStatus
+from src.services import ingestion_service
+from src.services.job_runner import TERMINAL_STATES, JobQueueFullError, progress_delta
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _get_job(job_id: str) -> Dict[str, Any]:
+    job = ingestion_service.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@router.post("/ingest", response_model=JobStatus, status_code=202)
+async def submit_ingest_job(request: IngestJobRequest):
+    """Queue an ingestion job for the given publications"""
+    publication_data = [(p.title, p.link) for p in request.publications]
+    try:
+        job_id = ingestion_service.submit_ingestion(publication_data, request.max_docs, sync=request.sync)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return _get_job(job_id)
+
+
+@router.post("/retry-failed", response_model=JobStatus, status_code=202)
+async def submit_retry_job():
+    """Queue a job that retries every dead-lettered document"""
+    try:
+        job_id = ingestion_service.submit_retry()
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return _get_job(job_id)
+
+
+@router.get("", response_model=JobList)
+async def list_jobs():
+    """List recent jobs (without progress text)"""
+    runner = ingestion_service.jobs.stats()
+    return JobList(
+        jobs=ingestion_service.jobs.list_jobs()[:MAX_JOBS],
+        queued=runner["queued"],
+        running=runner["running"],
+    )
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Poll a job's status and latest progress"""
+    return _get_job(job_id)
+
+
+@router.get("/{job_id}/stream")
+async def stream_job(job_id: str):
+    """
+    Stream a job's progress as Server-Sent Events
+
+    Emits a `progress` event on every change and a final `done` event.
+    Progress events carry the job state with only the changed part of the
+    progress text: clients rebuild it as
+    `text[:progress_offset] + progress_delta`. Disconnecting does not
+    affect the job.
+    """
+    _get_job(job_id)
+
+    async def events():
+        version = -1
+        progress = ""
+        while True:
+            current = await run_in_threadpool(ingestion_service.jobs.wait, job_id, version, 15.0)
+            if current is None:
+                return
+            if current["version"] != version:
+                version = current["version"]
+                text = current.pop("progress") or ""
+                offset, delta = progress_delta(progress, text)
+                progress = text
+                yield _sse("progress", {**current, "progress_offset": offset, "progress_delta": delta})
+            if current["status"] in TERMINAL_STATES:
+                yield _sse("done", {"job_id": job_id, "status": current["status"], "error": current["error"]})
+                return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or ask a running job to stop"""
+    _get_job(job_id)
+    if not ingestion_service.jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has already finished")
+    return _get_job(job_id)
@@ -0,0 +1,53 @@
+"""
+Batch Knowledge Extraction
+Runs extract_knowledge_from_chunk over the chunks of one document
+"""
+
+import hashlib
+import logging
+from typing import Any, Callable, List, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_key(doc: Document) -> str:
+    """Stable identity of a chunk: its source document plus its text"""
+    doc_id = str(doc.metadata.get("doc_id") or doc.metadata.get("source_url") or "")
+    return hashlib.sha1(f"{doc_id}\x00{doc.page_content}".encode("utf-8")).hexdigest()
+
+
+def unique_chunks(docs: List[Document]) -> List[Document]:
+    """Drop repeated chunks (same document and text), keeping the first"""
+    seen = set()
+    unique = []
+    for doc in docs:
+        key = chunk_key(doc)
+        if key not in seen:
+            seen.add(key)
+            unique.append(doc)
+    return unique
+
+
+def extract_batch(extract_fn: Callable[[Document], List[Any]], docs: List[Document]) -> Tuple[List[List[Any]], List[str]]:
+    """
+    Extract triples for a batch of chunks
+
+    Runs in the caller's thread or, pickled, in a worker process.
+
+    Returns:
+        (triples per chunk, error messages); a failing chunk yields no
+        triples and one error
+    """
+    results = []
+    errors = []
+    for doc in docs:
+        try:
+            results.append(list(extract_fn(doc) or []))
+        except Exception as e:
+            doc_id = doc.metadata.get("doc_id") or doc.metadata.get("source_url") or "unknown"
+            logger.warning("Extraction failed for chunk %s of %s: %s", doc.metadata.get("chunk_index"), doc_id, e)
+            results.append([])
+            errors.append(f"chunk {doc.metadata.get('chunk_index')} of {doc_id}: {e}")
+    return results, errors
@@ -0,0 +1,264 @@
+"""
+Pipeline Checkpoint Journal
+Durable per-document stage checkpoints, job records and a dead-letter list
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from .ingestion_manifest import document_hash
+
+STAGES = ("vector", "graph")
+RESUMABLE_STATES = ("failed", "cancelled", "interrupted")
+
+
+def job_fingerprint(publication_data: List[Tuple[str, str]], max_docs: Optional[int], *settings: str) -> str:
+    """Identify a run by its inputs, so a restart with the same inputs resumes the same job"""
+    items = publication_data[:max_docs] if max_docs else publication_data
+    digest = hashlib.sha1()
+    for _, url in items:
+        digest.update(url.encode("utf-8"))
+        digest.update(b"\x00")
+    for setting in settings:
+        digest.update(str(setting).encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+def _jsonable(triple: Any) -> Any:
+    if hasattr(triple, "model_dump"):
+        return triple.model_dump()
+    if isinstance(triple, tuple):
+        return list(triple)
+    return triple
+
+
+class PipelineJournal:
+    """
+    SQLite journal that lets an interrupted ingestion run resume.
+
+    For every document in flight it records the content hash, the extracted
+    triples (once extraction finishes) and which sinks have committed it.
+    A restarted run reuses stored triples instead of re-extracting and skips
+    sinks that already committed; fetched pages and embeddings are already
+    reused through the publication and embedding caches.
+
+    Documents whose sink commit fails are moved to a dead-letter list with
+    the error and attempt count, and can be retried on their own.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize journal
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                documents_done INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                triples TEXT,
+                vector INTEGER NOT NULL DEFAULT 0,
+                graph INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                doc_id TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL,
+                title TEXT,
+                url TEXT,
+                stage TEXT NOT NULL,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                failed_at REAL NOT NULL
+            );
+            """
+        )
+        # Jobs still marked running were cut off by a restart
+        self._db.execute("UPDATE jobs SET status = 'interrupted' WHERE status = 'running'")
+        self._db.commit()
+
+    # Jobs
+
+    def open_job(self, fingerprint: str) -> Tuple[str, bool]:
+        """
+        Start a job, or resume the last unfinished one with the same inputs
+
+        Returns:
+            (job_id, resumed)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id FROM jobs WHERE fingerprint = ? AND status IN ({}) "
+                "ORDER BY created_at DESC LIMIT 1".format(", ".join("?" * len(RESUMABLE_STATES))),
+                (fingerprint, *RESUMABLE_STATES),
+            ).fetchone()
+            if row is not None:
+                job_id = row[0]
+                self._db.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE job_id = ?", (now, job_id)
+                )
+            else:
+                job_id = uuid.uuid4().hex[:12]
+                self._db.execute(
+                    "INSERT INTO jobs (job_id, fingerprint, status, created_at, updated_at) VALUES (?, ?, 'running', ?, ?)",
+                    (job_id, fingerprint, now, now),
+                )
+            self._db.commit()
+        return job_id, row is not None
+
+    def finish_job(self, job_id: str, status: str = "completed"):
+        """Mark a job completed (or failed, to resume it next time)"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?", (status, time.time(), job_id)
+            )
+            self._db.commit()
+
+    # Documents
+
+    def resume_document(self, job_id: str, doc_id: str, chunks: List[Document]) -> Dict[str, Any]:
+        """
+        Register a document for this job and return its saved progress
+
+        Progress recorded for different content is discarded.
+
+        Returns:
+            Dict with triples (None if not yet extracted), vector and graph flags
+        """
+        digest = document_hash(chunks)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, triples, vector, graph FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            if row is not None and row[0] == digest:
+                self._db.execute(
+                    "UPDATE documents SET job_id = ?, updated_at = ? WHERE doc_id = ?", (job_id, time.time(), doc_id)
+                )
+                self._db.commit()
+                return {
+                    "triples": json.loads(row[1]) if row[1] is not None else None,
+                    "vector": bool(row[2]),
+                    "graph": bool(row[3]),
+                }
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, job_id, content_hash, updated_at) VALUES (?, ?, ?, ?)",
+                (doc_id, job_id, digest, time.time()),
+            )
+            self._db.commit()
+        return {"triples": None, "vector": False, "graph": False}
+
+    def has_progress(self, doc_id: str, chunks: List[Document]) -> bool:
+        """True if some sink already committed this exact content"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, vector, graph FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return row is not None and row[0] == document_hash(chunks) and bool(row[1] or row[2])
+
+    def save_triples(self, doc_id: str, triples: List[Any]):
+        """Checkpoint the extraction result of a document"""
+        payload = json.dumps([_jsonable(t) for t in triples], default=str)
+        with self._lock:
+            self._db.execute(
+                "UPDATE documents SET triples = ?, updated_at = ? WHERE doc_id = ?", (payload, time.time(), doc_id)
+            )
+            self._db.commit()
+
+    def mark_committed(self, doc_ids: List[str], stage: str):
+        """Record that a sink committed these documents"""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                f"UPDATE documents SET {stage} = 1, updated_at = ? WHERE doc_id = ?",
+                [(now, doc_id) for doc_id in doc_ids],
+            )
+            self._db.commit()
+
+    def complete_document(self, job_id: str, doc_id: str):
+        """Drop the checkpoint of a fully ingested document"""
+        with self._lock:
+            self._db.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+            self._db.execute("DELETE FROM dead_letters WHERE doc_id = ?", (doc_id,))
+            self._db.execute(
+                "UPDATE jobs SET documents_done = documents_done + 1, updated_at = ? WHERE job_id = ?",
+                (time.time(), job_id),
+            )
+            self._db.commit()
+
+    # Dead letters
+
+    def dead_letter(self, job_id: str, chunks_by_doc: Dict[str, List[Document]], stage: str, error: str):
+        """Move failed documents to the dead-letter list"""
+        now = time.time()
+        rows = []
+        for doc_id, chunks in chunks_by_doc.items():
+            metadata = chunks[0].metadata if chunks else {}
+            rows.append((doc_id, job_id, metadata.get("source_title"), metadata.get("source_url"), stage, error, now))
+        self._insert_dead_letters(rows)
+
+    def dead_letter_source(self, job_id: str, doc_id: str, title: str, url: str, stage: str, error: str):
+        """Dead-letter a document that failed before it had chunks (e.g. its fetch)"""
+        self._insert_dead_letters([(doc_id, job_id, title, url, stage, error, time.time())])
+
+    def _insert_dead_letters(self, rows: List[Tuple[Any, ...]]):
+        with self._lock:
+            self._db.executemany(
+                """INSERT INTO dead_letters (doc_id, job_id, title, url, stage, error, failed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(doc_id) DO UPDATE SET
+                     job_id = excluded.job_id, stage = excluded.stage, error = excluded.error,
+                     attempts = attempts + 1, failed_at = excluded.failed_at""",
+                rows,
+            )
+            self._db.commit()
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """List dead-lettered documents, most recent failure first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT doc_id, job_id, title, url, stage, error, attempts, failed_at "
+                "FROM dead_letters ORDER BY failed_at DESC"
+            ).fetchall()
+        keys = ("doc_id", "job_id", "title", "url", "stage", "error", "attempts", "failed_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts of jobs, checkpointed documents and dead letters"""
+        with self._lock:
+            jobs = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            in_progress = self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            dead = self._db.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+        return {"jobs": jobs, "documents_in_progress": in_progress, "dead_letters": dead}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
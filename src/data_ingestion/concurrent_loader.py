@@ -0,0 +1,329 @@
+"""
+Concurrent HTML Loader
+Fetches PMC articles concurrently and chunks each one as soon as it arrives
+"""
+
+import re
+from html import unescape
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from langchain_core.documents import Document
+
+from .fetcher import ConcurrentFetcher
+from .section_chunker import TokenCounter, chunk_sections
+
+_BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form"]
+_HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_BLOCK_TAGS = {"p", "li", "pre", "blockquote", "figcaption", "caption", "dt", "dd"}
+_INLINE_TAGS = {"a", "abbr", "b", "cite", "code", "em", "i", "small", "span", "strong", "sub", "sup", "u"}
+_WHITESPACE = re.compile(r"\s+")
+_PMC_SEGMENT = re.compile(r"/(PMC\d+)/?$")
+_META_TAG = re.compile(r"<meta\s[^>]*>", re.IGNORECASE)
+_META_ATTR = re.compile(r"""(name|content)\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+
+# Citation <meta> tags on PMC pages -> filterable chunk metadata fields
+_CITATION_FIELDS = {
+    "citation_publication_date": "year",
+    "citation_date": "year",
+    "citation_author": "authors",
+    "citation_keywords": "keywords",
+    "keywords": "keywords",
+}
+
+
+def doc_id_from_url(url: str) -> str:
+    """Build the document ID used across the KG and vector store (PMC_<id>)"""
+    match = _PMC_SEGMENT.search(url)
+    segment = match.group(1) if match else url.rstrip("/").split("/")[-1]
+    return f"PMC_{segment}"
+
+
+def chunker_config(chunk_tokens: int, chunk_overlap: int, tokenizer: str) -> str:
+    """Identifier of the chunker settings (cache and manifest key)"""
+    return f"sections:{tokenizer}:{chunk_tokens}:{chunk_overlap}"
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def html_sections(html: str) -> List[Tuple[str, List[str]]]:
+    """
+    Split a PMC HTML page into sections of text blocks
+
+    The page is walked once in document order. h2-h6 headings (Abstract,
+    Methods, Results, ...) form a section path such as "Results > Bone
+    density"; the h1 article title starts a new, unnamed section. Blocks
+    are paragraphs, list items and captions, plus tables, which are kept
+    as one block with a line per row and cells joined by " | ".
+
+    Returns:
+        (section_path, blocks) in document order, empty sections dropped
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(_BOILERPLATE_TAGS):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    headings: List[Tuple[int, str]] = []
+    inline: List[str] = []
+
+    def add_block(text: str):
+        if text:
+            sections[-1][1].append(text)
+
+    def flush_inline():
+        add_block(_clean("".join(inline)))
+        inline.clear()
+
+    def walk(node: Tag):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                if not isinstance(child, Comment):
+                    inline.append(str(child))
+                continue
+            if not isinstance(child, Tag):
+                continue
+            if child.name in _INLINE_TAGS:
+                inline.append(child.get_text())
+                continue
+
+            flush_inline()
+            if child.name in _HEADING_LEVELS:
+                level, title = _HEADING_LEVELS[child.name], _clean(child.get_text(" "))
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                if level > 1 and title:
+                    headings.append((level, title))
+                sections.append((" > ".join(t for _, t in headings), []))
+            elif child.name == "table":
+                rows = (
+                    " | ".join(cell for cell in (_clean(c.get_text(" ")) for c in tr.find_all(["th", "td"])) if cell)
+                    for tr in child.find_all("tr")
+                )
+                add_block("\n".join(row for row in rows if row))
+            elif child.name in _BLOCK_TAGS:
+                add_block(_clean(child.get_text()))
+            else:
+                walk(child)
+                flush_inline()
+
+    walk(root)
+    flush_inline()
+    return [(path, blocks) for path, blocks in sections if blocks]
+
+
+def article_metadata(html: str) -> Dict[str, Any]:
+    """
+    Publication year, authors and keywords from a page's citation <meta> tags
+
+    Authors and keywords are joined with "; ", since ChromaDB metadata
+    values must be scalars. Only the document head is scanned.
+    """
+    end = html.find("</head>")
+    year = None
+    lists: Dict[str, List[str]] = {"authors": [], "keywords": []}
+    for tag in _META_TAG.findall(html if end < 0 else html[:end]):
+        attrs = {name.lower(): unescape(double or single) for name, double, single in _META_ATTR.findall(tag)}
+        field = _CITATION_FIELDS.get(attrs.get("name", "").lower())
+        content = attrs.get("content", "").strip()
+        if field is None or not content:
+            continue
+        if field == "year":
+            match = _YEAR.search(content)
+            if match and year is None:
+                year = int(match.group(0))
+        elif field == "keywords":
+            lists["keywords"].extend(k.strip() for k in re.split(r"[;,]", content) if k.strip())
+        else:
+            lists["authors"].append(content)
+
+    metadata: Dict[str, Any] = {}
+    if year is not None:
+        metadata["year"] = year
+    for field, values in lists.items():
+        if values:
+            metadata[field] = "; ".join(dict.fromkeys(values))
+    return metadata
+
+
+def _chunk_html(html: str, chunk_tokens: int, chunk_overlap: int, counter: TokenCounter) -> Tuple[str, List[List[str]]]:
+    """Article text and [section_path, chunk] pairs of one page"""
+    sections = html_sections(html)
+    text = "\n".join(block for _, blocks in sections for block in blocks)
+    chunks = chunk_sections(sections, counter, chunk_tokens=chunk_tokens, chunk_overlap=chunk_overlap)
+    return text, [[path, chunk] for path, chunk in chunks]
+
+
+def _cached_chunks(
+    cache, url: str, entry: Dict[str, Any], chunker_key: str, chunk_tokens: int, chunk_overlap: int, counter: TokenCounter
+) -> List[List[str]]:
+    """Chunks of a cached page for this chunker, computed and stored if missing"""
+    chunks = entry["chunks"].get(chunker_key)
+    if chunks is None:
+        text, chunks = _chunk_html(entry["html"], chunk_tokens, chunk_overlap, counter)
+        cache.put(url, entry["html"], text=text, chunks={chunker_key: chunks}, etag=entry.get("etag"),
+                  last_modified=entry.get("last_modified"), fetched_at=entry.get("fetched_at"))
+    return chunks
+
+
+def _chunk_documents(title: str, url: str, chunks: List[List[str]], html: str = "") -> Iterator[Document]:
+    doc_id = doc_id_from_url(url)
+    extra = article_metadata(html) if html else {}
+    for index, (section_path, chunk) in enumerate(chunks):
+        yield Document(
+            page_content=chunk,
+            metadata={
+                "source_title": title,
+                "source_url": url,
+                "doc_id": doc_id,
+                "chunk_index": index,
+                "section_path": section_path,
+                **extra,
+            },
+        )
+
+
+def iter_publication_documents(
+    publication_data: List[Tuple[str, str]],
+    max_docs: Optional[int] = None,
+    chunk_tokens: int = 256,
+    chunk_overlap: int = 32,
+    progress_callback: Optional[Callable[[str], None]] = None,
+    fetcher: Optional[ConcurrentFetcher] = None,
+    cache=None,
+    token_counter: Optional[TokenCounter] = None,
+    failure_callback: Optional[Callable[[str, str, str, str], None]] = None,
+) -> Iterator[Document]:
+    """
+    Fetch and chunk publications, yielding chunks as each article arrives
+
+    Args:
+        publication_data: List of (title, url) tuples
+        max_docs: Maximum number of publications to process
+        chunk_tokens: Embedding model input window in tokens
+        chunk_overlap: Tokens of context repeated between chunks of a section
+        progress_callback: Called with status lines
+        fetcher: Shared ConcurrentFetcher (a temporary one is used if None)
+        cache: Optional PublicationCache; cached articles skip network and
+            parsing, and stale ones are revalidated with a conditional GET
+        token_counter: Tokenizer of the embedding model (estimated counts if None)
+        failure_callback: Called with (doc_id, title, url, error) for every
+            article that could not be fetched
+
+    Yields:
+        Document chunks with source_title, source_url, doc_id, chunk_index
+        and section_path metadata, plus year, authors and keywords when the
+        page declares them
+    """
+    items = publication_data[:max_docs] if max_docs else publication_data
+    counter = token_counter or TokenCounter()
+    chunker_key = chunker_config(chunk_tokens, chunk_overlap, counter.name)
+    done = 0
+
+    # Serve fresh cached articles first, without touching the network
+    to_fetch = []
+    revalidate: Dict[str, Dict[str, Any]] = {}
+    for title, url in items:
+        entry = cache.get(url) if cache is not None else None
+        if entry is None:
+            if cache is not None and cache.offline:
+                done += 1
+                if progress_callback:
+                    progress_callback(f"  ⏭️ [{done}/{len(items)}] {title[:50]}... (offline, not cached)\n")
+                continue
+            to_fetch.append((title, url))
+            continue
+        if entry.get("stale") and not cache.offline:
+            revalidate[url] = entry
+            to_fetch.append((title, url))
+            continue
+
+        chunks = _cached_chunks(cache, url, entry, chunker_key, chunk_tokens, chunk_overlap, counter)
+        done += 1
+        yield from _chunk_documents(title, url, chunks, entry.get("html") or "")
+        if progress_callback:
+            progress_callback(f"  ✓ [{done}/{len(items)}] {title[:50]}... {len(chunks)} chunks (cached)\n")
+
+    if not to_fetch:
+        return
+
+    own_fetcher = fetcher is None
+    fetcher = fetcher or ConcurrentFetcher(validator_store=cache)
+
+    try:
+        for title, result in fetcher.fetch_all(to_fetch):
+            done += 1
+            url = result["url"]
+            entry = revalidate.get(url)
+            if result["error"] or not result["html"]:
+                if entry is None:
+                    if progress_callback:
+                        progress_callback(f"  ❌ [{done}/{len(items)}] {title[:50]}... ({result['error']})\n")
+                    if failure_callback:
+                        failure_callback(doc_id_from_url(url), title, url, result["error"] or "empty response")
+                    continue
+                # Revalidation failed: serve the stale copy; it stays stale and is retried next run
+                chunks = _cached_chunks(cache, url, entry, chunker_key, chunk_tokens, chunk_overlap, counter)
+                yield from _chunk_documents(title, url, chunks, entry["html"])
+                if progress_callback:
+                    progress_callback(
+                        f"  ⚠️ [{done}/{len(items)}] {title[:50]}... {len(chunks)} chunks "
+                        f"(cached; revalidation failed: {result['error']})\n"
+                    )
+                continue
+
+            text = None
+            chunks = (entry or {}).get("chunks", {}).get(chunker_key) if result["not_modified"] else None
+            if chunks is None:
+                text, chunks = _chunk_html(result["html"], chunk_tokens, chunk_overlap, counter)
+            if cache is not None:
+                cache.put(url, result["html"], text=text, chunks={chunker_key: chunks},
+                          etag=result["etag"], last_modified=result["last_modified"])
+
+            yield from _chunk_documents(title, url, chunks, result["html"])
+
+            if progress_callback:
+                cached = " (not modified)" if result["not_modified"] else ""
+                progress_callback(
+                    f"  ✓ [{done}/{len(items)}] {title[:50]}... "
+                    f"{len(chunks)} chunks, {result['elapsed']:.1f}s{cached}\n"
+                )
+    finally:
+        if own_fetcher:
+            fetcher.close()
+
+
+def load_and_chunk_documents_concurrent(
+    publication_data: List[Tuple[str, str]],
+    max_docs: Optional[int] = None,
+    chunk_tokens: int = 256,
+    chunk_overlap: int = 32,
+    progress_callback: Optional[Callable[[str], None]] = None,
+    fetcher: Optional[ConcurrentFetcher] = None,
+    cache=None,
+    token_counter: Optional[TokenCounter] = None,
+) -> List[Document]:
+    """
+    Fetch and chunk publications into a list
+
+    Eager form of iter_publication_documents (same arguments), for callers
+    that want every chunk at once rather than streaming them into the
+    pipeline as articles arrive.
+
+    Returns:
+        Document chunks of every publication that could be loaded
+    """
+    return list(iter_publication_documents(
+        publication_data,
+        max_docs=max_docs,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap=chunk_overlap,
+        progress_callback=progress_callback,
+        fetcher=fetcher,
+        cache=cache,
+        token_counter=token_counter,
+    ))
@@ -0,0 +1,229 @@
+"""
+Concurrent Publication Fetcher
+Pooled, polite HTTP fetching of PMC article pages
+"""
+
+import queue
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+DEFAULT_USER_AGENT = "BodhiRAG/1.0 (NASA Space Biology Knowledge Engine)"
+
+
+class ConcurrentFetcher:
+    """
+    Fetches many pages concurrently over keep-alive sessions.
+
+    - Sessions are kept in a pool and reused across fetches and runs, so
+      connections stay alive between requests.
+    - Concurrency per host is capped, so PMC is never hit with more than
+      ``per_host_limit`` parallel requests.
+    - Connection errors, timeouts, 429 and 5xx responses are retried with
+      exponential backoff and jitter (Retry-After is honoured).
+    - When ``validator_store`` holds an ETag/Last-Modified for a URL, a
+      conditional GET is sent and a 304 reuses the stored HTML.
+    - fetch_all() yields results as they complete, so callers can start
+      parsing while other downloads are still in flight.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        per_host_limit: int = 4,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        validator_store: Optional[Any] = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        """
+        Initialize fetcher
+
+        Args:
+            max_workers: Concurrent downloads across all hosts
+            per_host_limit: Concurrent downloads against a single host
+            timeout: Per-request timeout in seconds
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff delay in seconds
+            backoff_max: Upper bound for a single backoff delay
+            validator_store: Mapping-like store of url -> {"etag", "last_modified", "html"}
+            user_agent: User-Agent header sent with every request
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_limit = max(1, int(per_host_limit))
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.validator_store = validator_store if validator_store is not None else {}
+        self.user_agent = user_agent
+
+        self._idle_sessions: "queue.LifoQueue[requests.Session]" = queue.LifoQueue()
+        self._sessions = []
+        self._sessions_guard = threading.Lock()
+        self._host_locks: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock_guard = threading.Lock()
+
+    def _borrow_session(self) -> requests.Session:
+        try:
+            return self._idle_sessions.get_nowait()
+        except queue.Empty:
+            pass
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.per_host_limit, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = self.user_agent
+        with self._sessions_guard:
+            self._sessions.append(session)
+        return session
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_lock_guard:
+            if host not in self._host_locks:
+                self._host_locks[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_locks[host]
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def fetch(self, url: str) -> Dict[str, Any]:
+        """
+        Fetch one page
+
+        Returns:
+            Dict with url, status, html, etag, last_modified, not_modified,
+            attempts, elapsed and error (None on success)
+        """
+        start = time.perf_counter()
+        cached = self.validator_store.get(url) or {}
+        headers = {}
+        if cached.get("html") is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        result: Dict[str, Any] = {
+            "url": url,
+            "status": None,
+            "html": None,
+            "etag": None,
+            "last_modified": None,
+            "not_modified": False,
+            "attempts": 0,
+            "elapsed": 0.0,
+            "error": None,
+        }
+
+        for attempt in range(self.max_retries + 1):
+            result["attempts"] = attempt + 1
+            retry_after = None
+            try:
+                session = self._borrow_session()
+                try:
+                    with self._host_slot(url):
+                        response = session.get(url, headers=headers, timeout=self.timeout)
+                finally:
+                    self._idle_sessions.put(session)
+                result["status"] = response.status_code
+
+                if response.status_code == 304:
+                    result.update(
+                        html=cached["html"],
+                        etag=cached.get("etag"),
+                        last_modified=cached.get("last_modified"),
+                        not_modified=True,
+                        error=None,
+                    )
+                    break
+
+                if response.status_code in RETRY_STATUS:
+                    result["error"] = f"HTTP {response.status_code}"
+                    retry_after = response.headers.get("Retry-After")
+                else:
+                    response.raise_for_status()
+                    result.update(
+                        html=response.text,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                        error=None,
+                    )
+                    if result["etag"] or result["last_modified"]:
+                        self.validator_store[url] = {
+                            "etag": result["etag"],
+                            "last_modified": result["last_modified"],
+                            "html": result["html"],
+                        }
+                    break
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+                result["error"] = str(e)
+            except requests.RequestException as e:
+                # Non-retryable (e.g. 404)
+                result["error"] = str(e)
+                break
+
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, retry_after))
+
+        result["elapsed"] = time.perf_counter() - start
+        return result
+
+    def fetch_all(self, items: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Fetch many pages, yielding each as soon as it completes
+
+        Args:
+            items: (title, url) pairs
+
+        Yields:
+            (title, fetch result) in completion order
+        """
+        in_flight_limit = 2 * self.max_workers
+        items = iter(items)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bodhirag-fetch") as pool:
+            pending = {}
+            exhausted = False
+
+            while pending or not exhausted:
+                while not exhausted and len(pending) < in_flight_limit:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    title, url = item
+                    pending[pool.submit(self.fetch, url)] = title
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    title = pending.pop(future)
+                    yield title, future.result()
+
+    def close(self):
+        """Close every pooled session"""
+        with self._sessions_guard:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+            self._idle_sessions = queue.LifoQueue()
@@ -0,0 +1,138 @@
+"""
+Ingestion Manifest
+Tracks what has been ingested so re-runs only process new or changed publications
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from langchain_core.documents import Document
+
+
+def chunk_id(doc_id: str, index: int) -> str:
+    """Deterministic vector store ID for a chunk"""
+    return f"{doc_id}_chunk_{index}"
+
+
+def document_hash(chunks: List[Document]) -> str:
+    """Content hash over every chunk of one document"""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk.page_content.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """
+    Per-document record of what is in the knowledge graph and vector store.
+
+    Each doc_id (PMC_<id>) maps to the content hash, chunker configuration
+    and extractor version it was ingested with. A document whose record
+    still matches is skipped on re-run; a change to any of the three fields
+    marks it for re-ingestion. Stale chunks are deleted by doc_id, so no
+    per-chunk IDs are kept here.
+
+    Changes are written by save(); checkpoint() saves only once save_every
+    changes have accumulated, so a long run does not rewrite the whole
+    file after every document.
+    """
+
+    def __init__(self, path: str, save_every: int = 50):
+        """
+        Initialize manifest
+
+        Args:
+            path: JSON file backing the manifest
+            save_every: Unsaved changes after which checkpoint() writes the file
+        """
+        self.path = Path(path)
+        self.save_every = max(1, save_every)
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8")).get("documents", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def diff(
+        self,
+        grouped: Dict[str, List[Document]],
+        chunker_config: str,
+        extractor_version: str,
+        corpus_doc_ids: Iterable[str] = (),
+    ) -> Dict[str, List[str]]:
+        """
+        Compare loaded documents against the manifest
+
+        Args:
+            grouped: Chunks of each document, keyed by doc_id
+            chunker_config: Identifier of the chunker settings in use
+            extractor_version: Identifier of the extractor in use
+            corpus_doc_ids: Every doc_id of a full corpus; manifest entries not
+                in it are reported as removed (nothing is removed if empty)
+
+        Returns:
+            Dict with added, updated, unchanged and removed doc_id lists
+        """
+        result = {"added": [], "updated": [], "unchanged": [], "removed": []}
+        for doc_id, chunks in grouped.items():
+            entry = self.entries.get(doc_id)
+            if entry is None:
+                result["added"].append(doc_id)
+            elif (
+                entry.get("content_hash") != document_hash(chunks)
+                or entry.get("chunker") != chunker_config
+                or entry.get("extractor_version") != extractor_version
+            ):
+                result["updated"].append(doc_id)
+            else:
+                result["unchanged"].append(doc_id)
+
+        corpus = set(corpus_doc_ids)
+        if corpus:
+            result["removed"] = [doc_id for doc_id in self.entries if doc_id not in corpus]
+        return result
+
+    def record(self, doc_id: str, chunks: List[Document], chunker_config: str, extractor_version: str):
+        """Record a successfully ingested document"""
+        with self._lock:
+            self.entries[doc_id] = {
+                "content_hash": document_hash(chunks),
+                "chunker": chunker_config,
+                "extractor_version": extractor_version,
+                "ingested_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._unsaved += 1
+
+    def forget(self, doc_id: str):
+        """Remove a document from the manifest"""
+        with self._lock:
+            if self.entries.pop(doc_id, None) is not None:
+                self._unsaved += 1
+
+    def checkpoint(self) -> bool:
+        """Save if at least save_every changes are unsaved; returns whether it saved"""
+        with self._lock:
+            due = self._unsaved >= self.save_every
+        if due:
+            self.save()
+        return due
+
+    def save(self):
+        """Atomically write the manifest to disk"""
+        with self._lock:
+            if self._unsaved == 0 and self.path.exists():
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"documents": self.entries}, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._unsaved = 0
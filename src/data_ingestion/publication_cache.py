@@ -0,0 +1,277 @@
+"""
+Publication Cache
+Content-addressed on-disk cache of fetched and parsed PMC articles
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .concurrent_loader import doc_id_from_url
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a page or text body"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PublicationCache:
+    """
+    Persistent cache of raw HTML, cleaned text and chunk lists.
+
+    Entries are keyed by PMC document ID (parsed from the Link URL). Bodies
+    are stored as zlib-compressed JSON in files named by content hash, so
+    identical pages are stored once. A small SQLite index tracks sizes and
+    access times for LRU eviction under ``max_mb``; every blob on disk is
+    referenced by the index and counted once, and a blob is deleted as soon
+    as no entry references it.
+
+    Chunk lists are stored per chunker configuration, so changing the chunk
+    size re-chunks from the cached text without touching the network.
+
+    Entries older than ``max_age_hours`` are marked stale; the loader then
+    revalidates them with a conditional GET, so upstream edits are picked
+    up while unchanged pages cost only a 304.
+
+    The cache also acts as the fetcher's validator store (ETag and
+    Last-Modified per URL). It is read-only in that role: the loader stores
+    each fetched page once, together with its text and chunks, via put().
+    """
+
+    def __init__(
+        self, cache_dir: str, max_mb: float = 512.0, offline: bool = False, max_age_hours: Optional[float] = 24.0
+    ):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory for the index and compressed bodies
+            max_mb: Size bound for stored bodies
+            offline: Never fetch; only serve what is cached
+            max_age_hours: Age after which an entry is revalidated (None = never)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.offline = offline
+        self.max_age_s = max_age_hours * 3600 if max_age_hours is not None else None
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.cache_dir / "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                doc_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_hash ON entries(content_hash)")
+        self._db.commit()
+        with self._lock:
+            self._sweep_orphans()
+            self._evict()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.json.z"
+
+    def _read_blob(self, digest: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(zlib.decompress(self._blob_path(digest).read_bytes()))
+        except (OSError, zlib.error, ValueError):
+            return None
+
+    def _write_blob(self, digest: str, body: Dict[str, Any]) -> int:
+        path = self._blob_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(json.dumps(body, separators=(",", ":")).encode("utf-8"), 6)
+        # Unique temp file per writer, so concurrent writes of the same blob cannot interleave
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return len(data)
+
+    def _release_blob(self, digest: str) -> bool:
+        """Delete a blob once no entry references it (call with the lock held)"""
+        shared = self._db.execute("SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (digest,)).fetchone()
+        if shared is not None:
+            return False
+        try:
+            self._blob_path(digest).unlink()
+        except OSError:
+            pass
+        return True
+
+    def _sweep_orphans(self):
+        """Delete blobs and temp files the index does not reference (e.g. after a crash)"""
+        referenced = {row[0] for row in self._db.execute("SELECT DISTINCT content_hash FROM entries")}
+        for path in self.blob_dir.glob("*/*"):
+            if path.name.endswith(".tmp") or path.name.split(".", 1)[0] not in referenced:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _total_size(self) -> int:
+        """Bytes on disk, counting each shared blob once"""
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM entries GROUP BY content_hash)"
+        ).fetchone()[0]
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached publication by URL
+
+        Returns:
+            Dict with url, doc_id, content_hash, etag, last_modified, html,
+            text, chunks ({chunker_key: [chunk, ...]}), fetched_at and stale
+            (older than max_age_hours), or None
+        """
+        doc_id = doc_id_from_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, etag, last_modified, fetched_at FROM entries WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            body = self._read_blob(row[0])
+            if body is None:
+                self._db.execute("DELETE FROM entries WHERE doc_id = ?", (doc_id,))
+                self._release_blob(row[0])
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE doc_id = ?", (time.time(), doc_id))
+            self._db.commit()
+
+        stale = self.max_age_s is not None and time.time() - row[3] > self.max_age_s
+        body.update(url=url, doc_id=doc_id, content_hash=row[0], etag=row[1], last_modified=row[2],
+                    fetched_at=row[3], stale=stale)
+        return body
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        text: Optional[str] = None,
+        chunks: Optional[Dict[str, List[Any]]] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ) -> str:
+        """
+        Store a fetched (and optionally parsed) publication
+
+        Args:
+            fetched_at: When the HTML was fetched or revalidated (default now);
+                pass the entry's own time when only adding chunks
+
+        Returns:
+            Content hash of the HTML
+        """
+        digest = content_hash(html)
+        doc_id = doc_id_from_url(url)
+
+        # Read-merge-write of the blob and the index update happen under one
+        # lock, so concurrent puts of the same page cannot drop each other's chunks
+        with self._lock:
+            existing = self._read_blob(digest) or {}
+            body = {
+                "html": html,
+                "text": text if text is not None else existing.get("text"),
+                "chunks": {**existing.get("chunks", {}), **(chunks or {})},
+            }
+            size = self._write_blob(digest, body)
+            now = time.time()
+
+            previous = self._db.execute("SELECT content_hash FROM entries WHERE doc_id = ?", (doc_id,)).fetchone()
+            self._db.execute(
+                """INSERT INTO entries (doc_id, url, content_hash, etag, last_modified, size, fetched_at, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(doc_id) DO UPDATE SET
+                     url = excluded.url, content_hash = excluded.content_hash, etag = excluded.etag,
+                     last_modified = excluded.last_modified, size = excluded.size,
+                     fetched_at = excluded.fetched_at, last_access = excluded.last_access""",
+                (doc_id, url, digest, etag, last_modified, size, fetched_at or now, now),
+            )
+            # Other entries sharing this blob now point at the rewritten file
+            self._db.execute("UPDATE entries SET size = ? WHERE content_hash = ?", (size, digest))
+            if previous is not None and previous[0] != digest:
+                self._release_blob(previous[0])
+            self._db.commit()
+            self._evict()
+        return digest
+
+    def put_chunks(self, url: str, chunker_key: str, chunks: List[Any]):
+        """Attach a chunk list (for one chunker configuration) to a cached entry"""
+        entry = self.get(url)
+        if entry is None:
+            return
+        self.put(
+            url,
+            entry["html"],
+            text=entry.get("text"),
+            chunks={chunker_key: chunks},
+            etag=entry.get("etag"),
+            last_modified=entry.get("last_modified"),
+            fetched_at=entry.get("fetched_at"),
+        )
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        total = self._total_size()
+        if total <= self.max_bytes:
+            return
+
+        for doc_id, digest, size in self._db.execute(
+            "SELECT doc_id, content_hash, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE doc_id = ?", (doc_id,))
+            if self._release_blob(digest):
+                total -= size
+        self._db.commit()
+
+    # Validator store interface used by ConcurrentFetcher
+
+    def __setitem__(self, url: str, validators: Dict[str, Any]):
+        # No-op: the loader stores the page with its chunks through put(),
+        # so each body is compressed and written once
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size statistics"""
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._total_size()
+        return {
+            "entries": count,
+            "size_mb": size / (1024 * 1024),
+            "max_mb": self.max_bytes / (1024 * 1024),
+            "offline": self.offline,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,180 @@
+"""
+Section Chunker
+Packs article sections into chunks sized by the embedding model's tokenizer
+"""
+
+import re
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+try:
+    from transformers import AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\[])")
+# Fallback estimate: WordPiece splits long words, so count 5-character pieces
+_ESTIMATED_TOKEN = re.compile(r"\w{1,5}|[^\w\s]")
+
+
+def _load_tokenizer(model_name: str) -> Optional[Any]:
+    # SentenceTransformer resolves bare model names under sentence-transformers/
+    names = [model_name] if "/" in model_name else [f"sentence-transformers/{model_name}", model_name]
+    for name in names:
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(name, use_fast=True)
+        except Exception:
+            continue
+        if tokenizer.is_fast:
+            return tokenizer
+    print(f"⚠️ Could not load a fast tokenizer for {model_name}; estimating token counts")
+    return None
+
+
+class TokenCounter:
+    """
+    Counts tokens the way the embedding model will see them.
+
+    Uses the model's own fast tokenizer when transformers is installed
+    (it ships with sentence-transformers), loaded once on first use.
+    Otherwise token counts are estimated by splitting words into pieces
+    of at most five characters.
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        """
+        Initialize counter
+
+        Args:
+            model_name: Embedding model whose tokenizer is used (None = estimate)
+        """
+        self.model_name = model_name
+        self._tokenizer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _get_tokenizer(self) -> Optional[Any]:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    if self.model_name and TRANSFORMERS_AVAILABLE:
+                        self._tokenizer = _load_tokenizer(self.model_name)
+                    self._loaded = True
+        return self._tokenizer
+
+    @property
+    def name(self) -> str:
+        """Tokenizer in use ("estimate" without one); part of the chunker key"""
+        return self.model_name if self._get_tokenizer() is not None else "estimate"
+
+    @property
+    def special_tokens(self) -> int:
+        """Tokens the model adds around every input ([CLS], [SEP])"""
+        tokenizer = self._get_tokenizer()
+        return tokenizer.num_special_tokens_to_add() if tokenizer is not None else 2
+
+    def count(self, texts: Sequence[str]) -> List[int]:
+        """Token counts of several texts, tokenized in one batch"""
+        if not texts:
+            return []
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            return [len(_ESTIMATED_TOKEN.findall(text)) for text in texts]
+        encoded = tokenizer(list(texts), add_special_tokens=False, verbose=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """Character (start, end) of every token in text"""
+        tokenizer = self._get_tokenizer()
+        if tokenizer is None:
+            return [match.span() for match in _ESTIMATED_TOKEN.finditer(text)]
+        encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        return [(start, end) for start, end in encoded["offset_mapping"]]
+
+
+def _split_block(block: str) -> Tuple[List[str], str]:
+    """Split an oversized block into table rows or sentences, with their glue"""
+    if "\n" in block:
+        return [row for row in block.split("\n") if row.strip()], "\n"
+    return [s for s in _SENTENCE_END.split(block) if s.strip()], " "
+
+
+def chunk_sections(
+    sections: Sequence[Tuple[str, Sequence[str]]],
+    counter: TokenCounter,
+    chunk_tokens: int = 256,
+    chunk_overlap: int = 32,
+) -> List[Tuple[str, str]]:
+    """
+    Pack section blocks into chunks that fit the embedding window
+
+    Chunks never cross a section boundary. Blocks (paragraphs, list items,
+    tables) stay whole when they fit; longer ones are split into sentences
+    or table rows, and anything still too long at token boundaries. Each
+    chunk after the first in a section repeats up to chunk_overlap tokens
+    of trailing pieces from the previous one. Every piece is tokenized
+    once, in a batch per document, so the cost is linear in its length.
+
+    Args:
+        sections: (section_path, blocks) in document order
+        counter: Token counter of the embedding model
+        chunk_tokens: Model input window, including special tokens
+        chunk_overlap: Tokens of context carried into the next chunk
+
+    Returns:
+        (section_path, chunk_text) pairs in document order
+    """
+    budget = max(16, chunk_tokens - counter.special_tokens)
+    overlap = min(chunk_overlap, budget // 2)
+
+    blocks = [(index, block) for index, (_, section_blocks) in enumerate(sections) for block in section_blocks]
+    block_counts = counter.count([block for _, block in blocks])
+
+    # Oversized blocks are split into rows or sentences, counted in a second batch
+    split = {i: _split_block(block) for i, ((_, block), n) in enumerate(zip(blocks, block_counts)) if n > budget}
+    parts = [part for pieces, _ in split.values() for part in pieces]
+    part_counts = iter(counter.count(parts))
+
+    # Pieces per section: (text, tokens, glue to the previous piece)
+    pieces: List[List[Tuple[str, int, str]]] = [[] for _ in sections]
+    for i, ((section, block), n) in enumerate(zip(blocks, block_counts)):
+        if i not in split:
+            pieces[section].append((block, n, "\n"))
+            continue
+        block_parts, glue = split[i]
+        for j, part in enumerate(block_parts):
+            part_glue = "\n" if j == 0 else glue
+            part_count = next(part_counts)
+            if part_count <= budget:
+                pieces[section].append((part, part_count, part_glue))
+                continue
+            spans = counter.spans(part)
+            for k in range(0, len(spans), budget):
+                window = spans[k:k + budget]
+                pieces[section].append((part[window[0][0]:window[-1][1]], len(window), part_glue if k == 0 else " "))
+
+    chunks: List[Tuple[str, str]] = []
+    for (path, _), section_pieces in zip(sections, pieces):
+        current: List[Tuple[str, int, str]] = []
+        size = 0
+        for piece in section_pieces:
+            if current and size + piece[1] > budget:
+                chunks.append((path, _join(current)))
+                carried: List[Tuple[str, int, str]] = []
+                size = 0
+                for previous in reversed(current):
+                    if size + previous[1] > overlap or size + previous[1] + piece[1] > budget:
+                        break
+                    carried.append(previous)
+                    size += previous[1]
+                current = carried[::-1]
+            current.append(piece)
+            size += piece[1]
+        if current:
+            chunks.append((path, _join(current)))
+    return chunks
+
+
+def _join(pieces: List[Tuple[str, int, str]]) -> str:
+    return (pieces[0][0] + "".join(glue + text for text, _, glue in pieces[1:])).strip()
@@ -0,0 +1,417 @@
+"""
+Streaming Ingestion Pipeline
+fetch → chunk → (extract ∥ embed) → sink, connected by bounded queues
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from .batch_extractor import extract_batch, unique_chunks
+
+_DONE = object()
+
+
+def iter_document_groups(chunks: Iterable[Document]) -> Iterator[Tuple[str, List[Document]]]:
+    """
+    Group a chunk stream into (doc_id, chunks) units
+
+    The loaders emit every chunk of an article consecutively, so grouping
+    only needs to watch for the doc_id to change.
+    """
+    current_id = None
+    group: List[Document] = []
+    for chunk in chunks:
+        doc_id = chunk.metadata.get("doc_id") or chunk.metadata.get("source_url") or "unknown"
+        if doc_id != current_id and group:
+            yield current_id, group
+            group = []
+        current_id = doc_id
+        group.append(chunk)
+    if group:
+        yield current_id, group
+
+
+class _Stage:
+    """Counters for one pipeline stage"""
+
+    def __init__(self, name: str, unit: str, inbox: Optional[queue.Queue] = None):
+        self.name = name
+        self.unit = unit
+        self.inbox = inbox
+        self.processed = 0
+
+    def snapshot(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "unit": self.unit,
+            "processed": self.processed,
+            "queue_depth": self.inbox.qsize() if self.inbox is not None else 0,
+            "queue_max": self.inbox.maxsize if self.inbox is not None else 0,
+            "per_s": self.processed / elapsed if elapsed else 0.0,
+        }
+
+
+class StreamingIngestionPipeline:
+    """
+    Ingests documents as a stream instead of in materialized phases.
+
+    A source thread turns the chunk stream into per-document units and fans
+    each one out to the extraction workers and the embedding stage. Triples
+    and embedded chunks are committed in micro-batches by the graph and
+    vector sinks, so the knowledge base fills while the run is in progress.
+    Every queue is bounded, so a slow stage throttles the ones upstream and
+    memory stays flat regardless of corpus size.
+
+    A document counts as done once both sinks have committed all of its
+    data; ``on_document_done`` is called for it exactly then. With a
+    checkpoint journal, extracted triples and sink commits are recorded per
+    document, a resumed document skips the work already done, and documents
+    whose extraction or sink commit fails are dead-lettered, as are
+    documents the loader reports through ``fail_source``.
+    """
+
+    def __init__(
+        self,
+        extract_fn: Callable[[Document], List[Any]],
+        vector_sink: Callable[[List[Document]], Dict[str, Any]],
+        graph_sink: Optional[Callable[[List[Any]], Dict[str, Any]]] = None,
+        document_filter: Optional[Callable[[str, List[Document]], bool]] = None,
+        on_document_done: Optional[Callable[[str, List[Document]], None]] = None,
+        extract_workers: int = 4,
+        executor: str = "thread",
+        queue_size: int = 8,
+        vector_batch_chunks: int = 256,
+        graph_batch_triples: int = 1000,
+        journal=None,
+        job_id: Optional[str] = None,
+    ):
+        """
+        Initialize pipeline
+
+        Args:
+            extract_fn: Per-chunk knowledge extractor
+            vector_sink: Embeds and stores a micro-batch of chunks
+            graph_sink: Writes a micro-batch of triples (None skips the graph)
+            document_filter: Returns False for documents that need no ingestion
+            on_document_done: Called once a document is fully committed
+            extract_workers: Parallel extraction workers
+            executor: "thread" or "process" for extraction
+            queue_size: Capacity of each inter-stage queue, in documents
+            vector_batch_chunks: Chunks per vector store commit
+            graph_batch_triples: Triples per graph commit
+            journal: Optional PipelineJournal for checkpoints and dead letters
+            job_id: Job the checkpoints are recorded under
+        """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type: {executor}")
+
+        self.extract_fn = extract_fn
+        self.vector_sink = vector_sink
+        self.graph_sink = graph_sink
+        self.document_filter = document_filter
+        self.on_document_done = on_document_done
+        self.extract_workers = max(1, int(extract_workers))
+        self.executor = executor
+        self.vector_batch_chunks = max(1, int(vector_batch_chunks))
+        self.graph_batch_triples = max(1, int(graph_batch_triples))
+        self.journal = journal
+        self.job_id = job_id
+
+        self._extract_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._embed_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._graph_q: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        self.stages = {
+            "fetch": _Stage("fetch", "docs"),
+            "extract": _Stage("extract", "chunks", self._extract_q),
+            "embed": _Stage("embed", "chunks", self._embed_q),
+            "graph": _Stage("graph", "triples", self._graph_q),
+        }
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._messages: deque = deque()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._extractors_left = self.extract_workers
+        self.totals: Dict[str, Any] = {
+            "documents_done": 0,
+            "documents_skipped": 0,
+            "documents_resumed": 0,
+            "documents_failed": 0,
+            "triples": 0,
+            "entities_created": 0,
+            "relationships_created": 0,
+            "entities_merged": 0,
+            "errors": [],
+        }
+
+    def log(self, message: str):
+        """Queue a status line for the next snapshot (thread-safe)"""
+        self._messages.append(message)
+
+    def stop(self):
+        """Stop reading new documents; work already queued is still committed"""
+        self._stop.set()
+
+    # Source
+
+    def _source(self, chunks: Iterable[Document]):
+        try:
+            for doc_id, group in iter_document_groups(chunks):
+                if self._stop.is_set():
+                    break
+                self.stages["fetch"].processed += 1
+                if self.document_filter is not None and not self.document_filter(doc_id, group):
+                    with self._lock:
+                        self.totals["documents_skipped"] += 1
+                    continue
+
+                state = {"triples": None, "vector": False, "graph": False}
+                if self.journal is not None:
+                    state = self.journal.resume_document(self.job_id, doc_id, group)
+
+                graph_done = self.graph_sink is None or state["graph"]
+                with self._lock:
+                    self._pending[doc_id] = {"chunks": group, "graph": graph_done, "vector": state["vector"]}
+                    if state["triples"] is not None or state["vector"] or state["graph"]:
+                        self.totals["documents_resumed"] += 1
+
+                if graph_done and state["vector"]:
+                    self._mark(doc_id, "vector")
+                    continue
+                if not graph_done:
+                    if state["triples"] is not None:
+                        self._graph_q.put((doc_id, state["triples"]))
+                    else:
+                        self._extract_q.put((doc_id, group))
+                if not state["vector"]:
+                    self._embed_q.put((doc_id, group))
+        except Exception as e:
+            self._record_error("fetch", e)
+        finally:
+            for _ in range(self.extract_workers):
+                self._extract_q.put(_DONE)
+            self._embed_q.put(_DONE)
+
+    # Extraction
+
+    def _extractor(self, pool: Optional[ProcessPoolExecutor]):
+        while True:
+            item = self._extract_q.get()
+            if item is _DONE:
+                break
+            doc_id, group = item
+            try:
+                # Repeated chunks (e.g. boilerplate sections) are extracted once
+                unique = unique_chunks(group)
+                if pool is not None:
+                    results, errors = pool.submit(extract_batch, self.extract_fn, unique).result()
+                else:
+                    results, errors = extract_batch(self.extract_fn, unique)
+                if errors:
+                    raise RuntimeError(f"{len(errors)} chunks failed, e.g. {errors[0]}")
+                triples = [triple for chunk_triples in results for triple in chunk_triples]
+                if self.journal is not None:
+                    self.journal.save_triples(doc_id, triples)
+            except Exception as e:
+                # Committing partial (or no) triples would mark the document done; dead-letter it for a retry
+                self._fail([doc_id], "extract", e)
+                triples = None
+            with self._lock:
+                self.stages["extract"].processed += len(group)
+            if triples is not None:
+                self._graph_q.put((doc_id, triples))
+
+        with self._lock:
+            self._extractors_left -= 1
+            last = self._extractors_left == 0
+        if last:
+            self._graph_q.put(_DONE)
+
+    # Sinks
+
+    def _drain(self, inbox: queue.Queue, first: Any, size_of: Callable[[Any], int], limit: int) -> Tuple[List[Any], bool]:
+        """Collect queued items into one micro-batch without waiting for more"""
+        batch = [first]
+        total = size_of(first)
+        while total < limit:
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+            total += size_of(item)
+        return batch, False
+
+    def _sink_loop(self, inbox: queue.Queue, stage: str, limit: int, commit: Callable[[List[Any]], None]):
+        """
+        Commit micro-batches until the stream ends
+
+        Any error fails the batch's documents and the loop keeps draining;
+        a dead sink would leave the upstream stages blocked on a full queue.
+        """
+        finished = False
+        while not finished:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            batch, finished = self._drain(inbox, item, lambda it: len(it[1]), limit)
+            try:
+                commit(batch)
+            except Exception as e:
+                self._fail([doc_id for doc_id, _ in batch], stage, e)
+
+    def _commit_vectors(self, batch: List[Tuple[str, List[Document]]]):
+        chunks = [chunk for _, group in batch for chunk in group]
+        doc_ids = [doc_id for doc_id, _ in batch]
+        self.vector_sink(chunks)
+        if self.journal is not None:
+            self.journal.mark_committed(doc_ids, "vector")
+        self.stages["embed"].processed += len(chunks)
+        for doc_id in doc_ids:
+            self._mark(doc_id, "vector")
+
+    def _commit_triples(self, batch: List[Tuple[str, List[Any]]]):
+        doc_ids = [doc_id for doc_id, _ in batch]
+        triples = [triple for _, doc_triples in batch for triple in doc_triples]
+        with self._lock:
+            self.totals["triples"] += len(triples)
+
+        if self.graph_sink is not None and triples:
+            result = self.graph_sink(triples) or {}
+            with self._lock:
+                self.totals["entities_created"] += result.get("entities_created", 0)
+                self.totals["relationships_created"] += result.get("relationships_created", 0)
+                self.totals["entities_merged"] += (result.get("canonicalization") or {}).get("entities_merged", 0)
+            if result.get("failed_batches"):
+                # Canonicalization merges triples across documents, so the whole
+                # micro-batch is failed; a retry is safe because writes are MERGEs
+                errors = result.get("errors") or ["unknown error"]
+                raise RuntimeError(f"{result['failed_batches']} graph write batches failed, e.g. {errors[0]}")
+            self.stages["graph"].processed += len(triples)
+
+        if self.journal is not None:
+            self.journal.mark_committed(doc_ids, "graph")
+        for doc_id in doc_ids:
+            self._mark(doc_id, "graph")
+
+    def _mark(self, doc_id: str, sink: str):
+        with self._lock:
+            entry = self._pending.get(doc_id)
+            if entry is None:
+                return
+            entry[sink] = True
+            if not (entry["graph"] and entry["vector"]):
+                return
+            del self._pending[doc_id]
+            self.totals["documents_done"] += 1
+
+        if self.on_document_done is not None:
+            try:
+                self.on_document_done(doc_id, entry["chunks"])
+            except Exception as e:
+                self._record_error("commit", e)
+                return
+        if self.journal is not None:
+            self.journal.complete_document(self.job_id, doc_id)
+
+    def _fail(self, doc_ids: List[str], stage: str, error: Exception):
+        """Drop documents whose commit failed and dead-letter them"""
+        self._record_error(stage, error)
+        with self._lock:
+            failed = {doc_id: self._pending.pop(doc_id)["chunks"] for doc_id in doc_ids if doc_id in self._pending}
+            self.totals["documents_failed"] += len(failed)
+        if self.journal is not None and failed:
+            try:
+                self.journal.dead_letter(self.job_id, failed, stage, str(error))
+            except Exception as e:
+                self._record_error("dead-letter", e)
+
+    def fail_source(self, doc_id: str, title: str, url: str, error: str):
+        """Dead-letter a document that never reached the pipeline, e.g. because its fetch failed"""
+        with self._lock:
+            self.totals["documents_failed"] += 1
+            self.totals["errors"].append(f"fetch: {doc_id}: {error}")
+        if self.journal is not None:
+            try:
+                self.journal.dead_letter_source(self.job_id, doc_id, title, url, "fetch", error)
+            except Exception as e:
+                self._record_error("dead-letter", e)
+
+    def _record_error(self, stage: str, error: Exception):
+        with self._lock:
+            self.totals["errors"].append(f"{stage}: {error}")
+        self.log(f"  ❌ {stage} stage error: {error}\n")
+
+    # Driver
+
+    def snapshot(self, elapsed: float) -> Dict[str, Any]:
+        """Current per-stage counters, totals and new status lines"""
+        messages = []
+        while self._messages:
+            messages.append(self._messages.popleft())
+        with self._lock:
+            totals = {**self.totals, "errors": list(self.totals["errors"])}
+            in_flight = len(self._pending)
+        return {
+            "stages": {name: stage.snapshot(elapsed) for name, stage in self.stages.items()},
+            "documents_in_flight": in_flight,
+            "messages": messages,
+            "elapsed_s": elapsed,
+            **totals,
+        }
+
+    def run(self, chunks: Iterable[Document], report_interval: float = 2.0) -> Iterator[Dict[str, Any]]:
+        """
+        Stream chunks through the pipeline
+
+        Args:
+            chunks: Chunk stream (e.g. iter_publication_documents)
+            report_interval: Seconds between snapshots
+
+        Yields:
+            Snapshots (see snapshot); the last one has finished=True
+        """
+        start = time.perf_counter()
+        pool = ProcessPoolExecutor(max_workers=self.extract_workers) if self.executor == "process" else None
+
+        threads = [threading.Thread(target=self._source, args=(chunks,), name="ingest-source", daemon=True)]
+        threads += [
+            threading.Thread(target=self._extractor, args=(pool,), name=f"ingest-extract-{i}", daemon=True)
+            for i in range(self.extract_workers)
+        ]
+        threads += [
+            threading.Thread(
+                target=self._sink_loop,
+                args=(self._embed_q, "embed", self.vector_batch_chunks, self._commit_vectors),
+                name="ingest-embed",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._sink_loop,
+                args=(self._graph_q, "graph", self.graph_batch_triples, self._commit_triples),
+                name="ingest-graph",
+                daemon=True,
+            ),
+        ]
+
+        try:
+            for thread in threads:
+                thread.start()
+            while any(thread.is_alive() for thread in threads):
+                deadline = time.monotonic() + report_interval
+                for thread in threads:
+                    thread.join(max(0.0, deadline - time.monotonic()))
+                yield {**self.snapshot(time.perf_counter() - start), "finished": False}
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        yield {**self.snapshot(time.perf_counter() - start), "finished": True}
@@ -0,0 +1,525 @@
+"""
+ANN Index
+Memory-mapped, int8-quantized IVF vector index with exact float re-ranking
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .metadata_filter import RANGE_OPERATORS, index_entries, normalize_filters
+
+logger = logging.getLogger(__name__)
+
+SCALE_HEADROOM = 1.05
+TRAIN_SAMPLE = 20000
+KMEANS_ITERATIONS = 10
+SCAN_BLOCK = 65536
+
+
+class QuantizedANNIndex:
+    """
+    On-disk vector index that stays out of resident memory.
+
+    Each vector is stored twice in append-only flat files: as float16 in
+    ``vectors.f16`` for exact re-ranking and as int8 codes (one scale per
+    dimension) in ``codes.i8`` for the first-stage scan. Both are read
+    through np.memmap, so opening the index is near-instant and the OS
+    pages in only the rows a query touches. Chunk text and metadata live
+    in a SQLite side table keyed by row.
+
+    Once ``train_size`` vectors are stored, a spherical k-means coarse
+    quantizer (IVF) is trained on a sample and every row is assigned to
+    its nearest centroid; queries then scan only the ``nprobe`` closest
+    lists. Until then, and for tiny stores, the int8 codes are scanned in
+    full. The top ``rerank`` approximate candidates are re-scored exactly
+    against the float vectors. Replacing or deleting a chunk tombstones
+    its row; the quantizer is retrained as the store grows.
+
+    Filterable metadata fields (doc_id, source_title, year, authors,
+    keywords) are indexed per value at write time in a SQLite table, so a
+    filtered search first selects the matching rows and then searches
+    only those: exactly when the subset is small, otherwise through the
+    probed lists restricted to the subset.
+    """
+
+    def __init__(
+        self,
+        index_dir: str,
+        dim: int = 384,
+        nlist: Optional[int] = None,
+        nprobe: int = 16,
+        rerank: int = 100,
+        train_size: int = 4096,
+        brute_force_limit: int = 2048,
+    ):
+        """
+        Initialize index
+
+        Args:
+            index_dir: Directory for the vector files and the row table
+            dim: Embedding dimension
+            nlist: IVF lists (None = about sqrt(rows) at training time)
+            nprobe: Lists scanned per query
+            rerank: Approximate candidates re-scored with float vectors
+            train_size: Rows stored before the IVF quantizer is trained
+            brute_force_limit: Filtered searches over at most this many
+                rows score every row exactly
+        """
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.train_size = train_size
+        self.brute_force_limit = brute_force_limit
+
+        self.header_path = self.index_dir / "header.json"
+        self.vectors_path = self.index_dir / "vectors.f16"
+        self.codes_path = self.index_dir / "codes.i8"
+        self.lists_path = self.index_dir / "lists.i32"
+        self.centroids_path = self.index_dir / "centroids.npy"
+
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.index_dir / "rows.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS rows (
+                row INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS rows_chunk_id ON rows (chunk_id);
+            CREATE INDEX IF NOT EXISTS rows_doc_id ON rows (doc_id);
+            CREATE TABLE IF NOT EXISTS row_fields (
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                num REAL,
+                row INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS row_fields_value ON row_fields (field, value);
+            CREATE INDEX IF NOT EXISTS row_fields_num ON row_fields (field, num);
+            """
+        )
+        self._db.commit()
+        self._backfill_fields()
+        self._load()
+
+    def _load(self):
+        header = json.loads(self.header_path.read_text()) if self.header_path.exists() else {}
+        if header and header["dim"] != self.dim:
+            raise ValueError(f"Index at {self.index_dir} has dim {header['dim']}, expected {self.dim}")
+        self._scale = np.asarray(header["scale"], dtype=np.float32) if header.get("scale") else None
+        self._trained_rows = header.get("trained_rows", 0)
+
+        row_counts = [self._file_rows(self.vectors_path, 2 * self.dim), self._file_rows(self.codes_path, self.dim)]
+        with self._db_lock:
+            stored = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM rows").fetchone()[0]
+            # A crash between appends leaves files of different lengths; trust the shortest
+            self._rows = min(row_counts + [stored])
+            self._db.execute("DELETE FROM rows WHERE row >= ?", (self._rows,))
+            self._db.execute("DELETE FROM row_fields WHERE row >= ?", (self._rows,))
+            self._db.commit()
+            deleted = [row for (row,) in self._db.execute("SELECT row FROM rows WHERE deleted = 1")]
+        # Cut the files back to whole, committed rows, or later appends would land at the wrong offsets
+        self._truncate(self.vectors_path, self._rows * 2 * self.dim)
+        self._truncate(self.codes_path, self._rows * self.dim)
+        self._alive = np.ones(self._rows, dtype=bool)
+        self._alive[deleted] = False
+
+        self._centroids = None
+        self._lists = np.zeros(0, dtype=np.int32)
+        if self._trained_rows and self.centroids_path.exists():
+            self._centroids = np.load(self.centroids_path)
+            lists = np.fromfile(self.lists_path, dtype=np.int32) if self.lists_path.exists() else self._lists
+            if len(lists) >= self._rows:
+                self._lists = lists[:self._rows]
+                self._truncate(self.lists_path, self._rows * self._lists.itemsize)
+            else:
+                # Rows appended after the last list write are assigned now
+                self._lists = np.concatenate([lists, self._assign(self._read_vectors(len(lists), self._rows))])
+                self._lists.tofile(self.lists_path)
+        self._vectors = self._codes = None
+        self._order = self._offsets = None
+
+    def _backfill_fields(self):
+        """Index the metadata of rows written before field indexes existed"""
+        with self._db_lock:
+            if self._db.execute("SELECT 1 FROM row_fields LIMIT 1").fetchone():
+                return
+            self._db.executemany(
+                "INSERT INTO row_fields (field, value, num, row) VALUES (?, ?, ?, ?)",
+                (
+                    (field, value, num, row)
+                    for row, metadata in self._db.execute("SELECT row, metadata FROM rows").fetchall()
+                    for field, value, num in index_entries(json.loads(metadata))
+                ),
+            )
+            self._db.commit()
+
+    @staticmethod
+    def _file_rows(path: Path, row_bytes: int) -> int:
+        return path.stat().st_size // row_bytes if path.exists() else 0
+
+    @staticmethod
+    def _truncate(path: Path, size: int):
+        if path.exists() and path.stat().st_size > size:
+            os.truncate(path, size)
+
+    def _write_header(self):
+        header = {
+            "dim": self.dim,
+            "scale": self._scale.tolist() if self._scale is not None else None,
+            "trained_rows": self._trained_rows,
+        }
+        tmp = self.header_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(header))
+        os.replace(tmp, self.header_path)
+
+    def _mapped(self) -> Tuple[Optional[np.memmap], Optional[np.memmap]]:
+        if self._vectors is None and self._rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(self._rows, self.dim))
+            self._codes = np.memmap(self.codes_path, dtype=np.int8, mode="r", shape=(self._rows, self.dim))
+        return self._vectors, self._codes
+
+    def _read_vectors(self, start: int, end: int) -> np.ndarray:
+        vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(end, self.dim))
+        return np.asarray(vectors[start:end], dtype=np.float32)
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows grouped by list (CSR), rebuilt lazily after appends"""
+        if self._order is None:
+            self._order = np.argsort(self._lists, kind="stable").astype(np.int32)
+            counts = np.bincount(self._lists, minlength=len(self._centroids))
+            self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        return self._order, self._offsets
+
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(vectors / self._scale), -127, 127).astype(np.int8)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        lists = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), SCAN_BLOCK):
+            block = vectors[start:start + SCAN_BLOCK]
+            lists[start:start + SCAN_BLOCK] = np.argmax(block @ self._centroids.T, axis=1)
+        return lists
+
+    def _train(self):
+        """Spherical k-means on a sample, then assign every row"""
+        start = time.perf_counter()
+        rows = self._rows
+        nlist = self.nlist or int(np.clip(np.sqrt(rows), 16, 4096))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(rows, size=min(rows, TRAIN_SAMPLE), replace=False))
+        vectors, _ = self._mapped()
+        sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+        nlist = min(nlist, len(sample))
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty lists keep their old centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        self._centroids = centroids.astype(np.float32)
+
+        lists = np.empty(rows, dtype=np.int32)
+        for offset in range(0, rows, SCAN_BLOCK):
+            end = min(rows, offset + SCAN_BLOCK)
+            lists[offset:end] = self._assign(np.asarray(vectors[offset:end], dtype=np.float32))
+        np.save(self.centroids_path, self._centroids)
+        lists.tofile(self.lists_path)
+        self._lists = lists
+        self._order = self._offsets = None
+        self._trained_rows = rows
+        self._write_header()
+        logger.info("ANN index trained: %d lists over %d vectors in %.1fs", nlist, rows, time.perf_counter() - start)
+
+    def add(
+        self,
+        chunk_ids: List[str],
+        embeddings: np.ndarray,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> int:
+        """
+        Add or replace chunks
+
+        Args:
+            chunk_ids: Deterministic chunk IDs; existing IDs are replaced
+            embeddings: (n, dim) L2-normalized vectors
+            texts: Chunk text
+            metadatas: Chunk metadata
+
+        Returns:
+            Number of chunks written
+        """
+        if not chunk_ids:
+            return 0
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(chunk_ids), self.dim)
+        with self._lock:
+            if self._scale is None:
+                # The int8 range is fixed by the first batch; later outliers are clipped
+                peak = np.abs(embeddings).max(axis=0) * SCALE_HEADROOM
+                self._scale = np.maximum(peak, 1e-6).astype(np.float32) / 127
+                self._write_header()
+
+            self._tombstone("chunk_id", chunk_ids)
+            first = self._rows
+            try:
+                with open(self.vectors_path, "ab") as f:
+                    f.write(embeddings.astype(np.float16).tobytes())
+                with open(self.codes_path, "ab") as f:
+                    f.write(self._quantize(embeddings).tobytes())
+            except OSError:
+                # Drop whatever part of the append made it to disk
+                self._load()
+                raise
+            with self._db_lock:
+                self._db.executemany(
+                    "INSERT INTO rows (row, chunk_id, doc_id, content, metadata) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (first + i, chunk_id_, metadata.get("doc_id") or "", text, json.dumps(metadata, default=str))
+                        for i, (chunk_id_, text, metadata) in enumerate(zip(chunk_ids, texts, metadatas))
+                    ],
+                )
+                self._db.executemany(
+                    "INSERT INTO row_fields (field, value, num, row) VALUES (?, ?, ?, ?)",
+                    [
+                        (field, value, num, first + i)
+                        for i, metadata in enumerate(metadatas)
+                        for field, value, num in index_entries(metadata)
+                    ],
+                )
+                self._db.commit()
+
+            self._rows += len(chunk_ids)
+            self._alive = np.concatenate([self._alive, np.ones(len(chunk_ids), dtype=bool)])
+            self._vectors = self._codes = None
+            if self._centroids is not None:
+                lists = self._assign(embeddings)
+                with open(self.lists_path, "ab") as f:
+                    f.write(lists.tobytes())
+                self._lists = np.concatenate([self._lists, lists])
+                self._order = self._offsets = None
+
+            alive = int(self._alive.sum())
+            if alive >= self.train_size and (not self._trained_rows or self._rows >= 4 * self._trained_rows):
+                self._train()
+        return len(chunk_ids)
+
+    def _tombstone(self, column: str, values: List[str]) -> int:
+        rows: List[int] = []
+        with self._db_lock:
+            for offset in range(0, len(values), 500):
+                batch = values[offset:offset + 500]
+                rows += [row for (row,) in self._db.execute(
+                    f"SELECT row FROM rows WHERE deleted = 0 AND {column} IN ({', '.join('?' * len(batch))})", batch
+                )]
+            self._db.executemany("UPDATE rows SET deleted = 1 WHERE row = ?", [(row,) for row in rows])
+            self._db.commit()
+        self._alive[rows] = False
+        return len(rows)
+
+    def delete_documents(self, doc_ids: List[str]) -> int:
+        """
+        Tombstone every chunk of the given documents
+
+        Returns:
+            Number of chunks removed
+        """
+        with self._lock:
+            return self._tombstone("doc_id", list(doc_ids))
+
+    def select(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Rows whose metadata matches a filter expression
+
+        Args:
+            filters: Filter expression (see metadata_filter.normalize_filters)
+
+        Returns:
+            Sorted row numbers (deleted rows included; nearest() skips them)
+
+        Raises:
+            ValueError: If the filter expression is invalid
+        """
+        selected: Optional[np.ndarray] = None
+        with self._db_lock:
+            for field, clause in normalize_filters(filters).items():
+                sql, params = "SELECT row FROM row_fields WHERE field = ?", [field]
+                if "$in" in clause:
+                    sql += f" AND value IN ({', '.join('?' * len(clause['$in']))})"
+                    params += clause["$in"]
+                for operator, bound in clause.items():
+                    if operator != "$in":
+                        sql += f" AND num {RANGE_OPERATORS[operator]} ?"
+                        params.append(bound)
+                rows = np.unique(np.fromiter((row for (row,) in self._db.execute(sql, params)), dtype=np.int64))
+                selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+                if not len(selected):
+                    break
+        if selected is None:
+            return np.arange(self._rows)
+        return selected
+
+    def nearest(self, vector: np.ndarray, k: int = 10, rows: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Approximate k nearest rows by inner product
+
+        Args:
+            vector: Query embedding
+            k: Rows returned
+            rows: Only consider these rows (e.g. from select())
+
+        Returns:
+            (row, exact score) pairs, best first
+        """
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            if not self._rows:
+                return []
+            vectors, codes = self._mapped()
+            alive = self._alive
+            scaled = query * self._scale
+            subset = None
+            if rows is not None:
+                subset = np.asarray(rows, dtype=np.int64)
+                subset = subset[subset < len(alive)]
+                subset = subset[alive[subset]]
+            candidates = None
+            if self._centroids is not None and (subset is None or len(subset) > self.brute_force_limit):
+                order, offsets = self._inverted_lists()
+                probe = np.argsort(-(self._centroids @ query))[:self.nprobe]
+                candidates = np.sort(np.concatenate([order[offsets[p]:offsets[p + 1]] for p in probe]))
+                if subset is not None:
+                    mask = np.zeros(len(alive), dtype=bool)
+                    mask[subset] = True
+                    candidates = candidates[mask[candidates]]
+                    # A selective filter can leave the probed lists (nearly) empty
+                    if len(candidates) < k:
+                        candidates = subset
+
+        # Small filtered subsets are scored exactly, without the approximate stage
+        if subset is not None and len(subset) <= self.brute_force_limit:
+            return self._exact(vectors, subset, query, k)
+
+        # First stage: approximate scores from the int8 codes
+        if candidates is None:
+            candidates = subset if subset is not None else np.arange(len(alive))
+            scores = np.concatenate([
+                codes[candidates[start:start + SCAN_BLOCK]].astype(np.float32) @ scaled
+                for start in range(0, len(candidates), SCAN_BLOCK)
+            ])
+        else:
+            scores = codes[candidates].astype(np.float32) @ scaled
+        keep = alive[candidates]
+        candidates, scores = candidates[keep], scores[keep]
+        if not len(candidates):
+            return []
+        shortlist = min(len(candidates), max(k, self.rerank))
+        top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+
+        # Second stage: exact scores from the float vectors
+        return self._exact(vectors, np.sort(candidates[top]), query, k)
+
+    @staticmethod
+    def _exact(vectors: np.memmap, rows: np.ndarray, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if not len(rows):
+            return []
+        exact = np.asarray(vectors[rows], dtype=np.float32) @ query
+        best = np.argsort(-exact)[:k]
+        return [(int(rows[i]), float(exact[i])) for i in best]
+
+    def search(self, vector: np.ndarray, k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Nearest chunks to a query embedding
+
+        Args:
+            vector: Query embedding
+            k: Results returned
+            filters: Optional metadata filter; the search runs over the
+                matching rows only
+
+        Returns:
+            Up to k results in vs_results shape (content, metadata) plus
+            score (cosine similarity)
+        """
+        hits = self.nearest(vector, k, self.select(filters) if filters else None)
+        if not hits:
+            return []
+        with self._db_lock:
+            found = {
+                row: (content, metadata)
+                for row, content, metadata in self._db.execute(
+                    f"SELECT row, content, metadata FROM rows WHERE row IN ({', '.join('?' * len(hits))})",
+                    [row for row, _ in hits],
+                )
+            }
+        return [
+            {"content": found[row][0], "metadata": json.loads(found[row][1]), "score": round(score, 4)}
+            for row, score in hits
+            if row in found
+        ]
+
+    def measure_documents(self, doc_ids: List[str]) -> Tuple[int, int]:
+        """(live chunks, total content length) of the given documents"""
+        chunks = content_length = 0
+        with self._db_lock:
+            for doc_id in doc_ids:
+                count, length = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM rows WHERE deleted = 0 AND doc_id = ?",
+                    (doc_id,),
+                ).fetchone()
+                chunks += count
+                content_length += length
+        return chunks, content_length
+
+    def collection_stats(self) -> Dict[str, Any]:
+        """Counts in the shape of VectorStoreConnector.get_collection_stats"""
+        with self._db_lock:
+            total, average = self._db.execute(
+                "SELECT COUNT(*), COALESCE(AVG(LENGTH(content)), 0) FROM rows WHERE deleted = 0"
+            ).fetchone()
+            sample = self._db.execute("SELECT metadata FROM rows WHERE deleted = 0 LIMIT 1").fetchone()
+        return {
+            "total_documents": total,
+            "average_content_length": float(average),
+            "sample_metadata_fields": sorted(json.loads(sample[0])) if sample else [],
+        }
+
+    def count(self) -> int:
+        """Live (not deleted) chunks"""
+        with self._lock:
+            return int(self._alive.sum())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rows": self._rows,
+                "live": int(self._alive.sum()),
+                "trained": self._centroids is not None,
+                "lists": 0 if self._centroids is None else len(self._centroids),
+                "disk_mb": round(sum(
+                    p.stat().st_size for p in (self.vectors_path, self.codes_path, self.lists_path) if p.exists()
+                ) / 1e6, 1),
+            }
+
+    def close(self):
+        with self._db_lock:
+            self._db.close()
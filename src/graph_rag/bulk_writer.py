@@ -0,0 +1,202 @@
+"""
+Bulk Graph Writer
+Batched UNWIND/MERGE writes of knowledge triples into Neo4j
+"""
+
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .connection_pool import Neo4jSessionPool
+
+CONSTRAINT_QUERIES = [
+    "CREATE CONSTRAINT entity_name IF NOT EXISTS FOR (e:Entity) REQUIRE e.name IS UNIQUE",
+    "CREATE INDEX relates_to_doc_id IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.doc_id)",
+]
+
+EXISTING_ENTITIES_QUERY = "MATCH (e:Entity) WHERE e.name IN $names RETURN e.name AS name"
+
+UNWIND_QUERY = """
+UNWIND $rows AS row
+MERGE (s:Entity {name: row.subject})
+  ON CREATE SET s.type = row.subject_type
+MERGE (o:Entity {name: row.object})
+  ON CREATE SET o.type = row.object_type
+MERGE (s)-[r:RELATES_TO {relationship: row.relationship, doc_id: row.doc_id}]->(o)
+  ON CREATE SET r.evidence = row.evidence,
+                r.evidence_count = row.evidence_count,
+                r.evidence_list = row.evidence_list,
+                r.source_title = row.source_title,
+                r.source_url = row.source_url
+"""
+
+
+def triple_to_row(triple: Any) -> Dict[str, Any]:
+    """
+    Flatten a triple into the parameter row used by UNWIND_QUERY
+
+    Accepts dicts, Pydantic models (RelationshipTriple) and
+    (subject, relationship, object[, evidence]) tuples.
+    """
+    if hasattr(triple, "model_dump"):
+        triple = triple.model_dump()
+    elif isinstance(triple, (tuple, list)):
+        triple = dict(zip(("subject", "relationship", "object", "evidence"), triple))
+
+    metadata = triple.get("metadata") or {}
+    evidence = triple.get("evidence") or triple.get("evidence_span") or ""
+    return {
+        "subject": str(triple["subject"]).strip(),
+        "relationship": str(triple["relationship"]).strip(),
+        "object": str(triple["object"]).strip(),
+        "evidence": evidence,
+        "evidence_count": triple.get("evidence_count") or 1,
+        "evidence_list": triple.get("evidence_list") or ([evidence] if evidence else []),
+        "subject_type": triple.get("subject_type") or "Unknown",
+        "object_type": triple.get("object_type") or "Unknown",
+        "doc_id": triple.get("doc_id") or metadata.get("doc_id") or "",
+        "source_title": triple.get("source_title") or metadata.get("source_title") or "",
+        "source_url": triple.get("source_url") or metadata.get("source_url") or "",
+    }
+
+
+def _batched(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _created_by_type(rows: List[Dict[str, Any]], existing: Iterable[str]) -> Tuple[Counter, Counter]:
+    """
+    Types of the entities and relationships a batch creates
+
+    Entities are exact (a name not already in the graph is created with
+    the type of its first row). Relationships count distinct
+    (subject, relationship, object, doc_id) keys, which can overshoot when
+    an identical edge already exists; the periodic statistics recount
+    corrects that.
+    """
+    seen = set(existing)
+    entity_types: Counter = Counter()
+    relationship_keys = set()
+    for row in rows:
+        for name, entity_type in ((row["subject"], row["subject_type"]), (row["object"], row["object_type"])):
+            if name not in seen:
+                seen.add(name)
+                entity_types[entity_type] += 1
+        relationship_keys.add((row["subject"], row["relationship"], row["object"], row["doc_id"]))
+    relationship_types = Counter(key[1] for key in relationship_keys)
+    return entity_types, relationship_types
+
+
+def _write_batch(tx, rows: List[Dict[str, Any]]) -> Tuple[int, int, Counter, Counter]:
+    names = list({row["subject"] for row in rows} | {row["object"] for row in rows})
+    existing = [record["name"] for record in tx.run(EXISTING_ENTITIES_QUERY, names=names)]
+    counters = tx.run(UNWIND_QUERY, rows=rows).consume().counters
+    entity_types, relationship_types = _created_by_type(rows, existing)
+    return counters.nodes_created, counters.relationships_created, entity_types, relationship_types
+
+
+class BulkGraphWriter:
+    """
+    Writes triples in batches, one parameterized UNWIND transaction each.
+
+    Uniqueness constraints are created up front so every MERGE is an index
+    lookup. A failed batch is retried with backoff; batches that still fail
+    are counted and skipped, so one bad batch does not abort the load.
+    """
+
+    def __init__(
+        self,
+        pool: Neo4jSessionPool,
+        batch_size: int = 1000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        """
+        Initialize writer
+
+        Args:
+            pool: Shared Neo4j session pool
+            batch_size: Triples per transaction
+            max_retries: Retries per failed batch
+            retry_backoff: Base delay between retries (doubles each time)
+        """
+        self.pool = pool
+        self.batch_size = max(1, int(batch_size))
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._constraints_ready = False
+
+    def ensure_constraints(self):
+        """Create uniqueness constraints and indexes (idempotent)"""
+        if self._constraints_ready:
+            return
+        with self.pool.session() as session:
+            for query in CONSTRAINT_QUERIES:
+                session.run(query).consume()
+        self._constraints_ready = True
+
+    def write_triples(self, triples: Iterable[Any]) -> Dict[str, Any]:
+        """
+        Write triples to the graph
+
+        Args:
+            triples: Extracted triples (see triple_to_row for accepted shapes)
+
+        Returns:
+            Dict with entities_created, relationships_created, triples_written,
+            batches, failed_batches, failed_triples (the input triples of
+            batches that failed after all retries), errors, elapsed_s,
+            triples_per_s and entity_types / relationship_types (created
+            counts by type)
+        """
+        self.ensure_constraints()
+
+        stats: Dict[str, Any] = {
+            "entities_created": 0,
+            "relationships_created": 0,
+            "triples_written": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "failed_triples": [],
+            "errors": [],
+            "elapsed_s": 0.0,
+            "triples_per_s": 0.0,
+            "entity_types": Counter(),
+            "relationship_types": Counter(),
+        }
+        start = time.perf_counter()
+
+        for batch in _batched(((t, triple_to_row(t)) for t in triples), self.batch_size):
+            rows = [row for _, row in batch]
+            stats["batches"] += 1
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with self.pool.session() as session:
+                        nodes, relationships, entity_types, relationship_types = session.execute_write(_write_batch, rows)
+                    stats["entities_created"] += nodes
+                    stats["relationships_created"] += relationships
+                    stats["entity_types"].update(entity_types)
+                    stats["relationship_types"].update(relationship_types)
+                    stats["triples_written"] += len(rows)
+                    break
+                except Exception as e:
+                    if attempt >= self.max_retries:
+                        stats["failed_batches"] += 1
+                        stats["failed_triples"].extend(t for t, _ in batch)
+                        stats["errors"].append(str(e))
+                    else:
+                        time.sleep(self.retry_backoff * (2 ** attempt))
+
+        elapsed = time.perf_counter() - start
+        stats["elapsed_s"] = elapsed
+        stats["triples_per_s"] = stats["triples_written"] / elapsed if elapsed else 0.0
+        stats["entity_types"] = dict(stats["entity_types"])
+        stats["relationship_types"] = dict(stats["relationship_types"])
+        return stats
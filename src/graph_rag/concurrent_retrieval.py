@@ -0,0 +1,565 @@
+"""
+Concurrent Retrieval
+Runs knowledge graph and vector retrieval side by side for hybrid queries
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .lexical_index import reciprocal_rank_fusion
+from .metadata_filter import metadata_matches, normalize_filters
+from .reranker import RERANK_STATS, document_text, relationship_text
+
+# Per-backend stats carried into merged hybrid results
+VECTOR_STATS = ("vs_backend", "filter", "lexical_hits", "lexical_time_ms", "lexical_status", "fusion") + tuple(
+    f"vs_{name}" for name in RERANK_STATS
+)
+KG_STATS = tuple(f"kg_{name}" for name in RERANK_STATS)
+
+
+def _title(result: Dict[str, Any]) -> str:
+    return (result.get("metadata") or {}).get("source_title") or "Document"
+
+
+def passages_answer(vs_results: List[Dict[str, Any]], limit: int = 3) -> str:
+    """Answer text listing the leading passages"""
+    lines = [f"- {_title(r)}: {r['content'][:200]}" for r in vs_results[:limit]]
+    return "Relevant passages:\n" + "\n".join(lines) if lines else "No relevant documents found."
+
+
+def relationships_answer(
+    kg_results: List[Dict[str, Any]], kg_paths: List[Dict[str, Any]], entities: Optional[List[str]] = None
+) -> str:
+    """Answer text listing KG paths, or the leading relationships"""
+    about = f" between {', '.join(entities)}" if entities else ""
+    if kg_paths:
+        lines = [f"- {p['explanation']} (evidence: {p['evidence_count']})" for p in kg_paths]
+        return f"Knowledge graph paths{about}:\n" + "\n".join(lines)
+    if not kg_results:
+        return "No knowledge graph relationships found."
+    about = f" for {', '.join(entities)}" if entities else ""
+    lines = [f"- {r['subject']} {r['relationship']} {r['object']}" for r in kg_results[:10]]
+    return f"Knowledge graph relationships{about}:\n" + "\n".join(lines)
+
+
+def hybrid_answer(
+    kg_results: List[Dict[str, Any]],
+    kg_paths: List[Dict[str, Any]],
+    vs_results: List[Dict[str, Any]],
+    facts: int = 5,
+    passages: int = 3,
+) -> str:
+    """
+    Answer text combining graph facts with the passages that support them
+
+    Each leading fact (paths first, then relationships) is followed by the
+    best-ranked passage mentioning most of its entities; passages not
+    cited by any fact are listed after.
+    """
+    items = [
+        (p["explanation"], {name for step in p["steps"] for name in (step["subject"], step["object"])})
+        for p in kg_paths
+    ]
+    items += [(f"{r['subject']} {r['relationship']} {r['object']}", {r["subject"], r["object"]}) for r in kg_results]
+    texts = [(r.get("content") or "").lower() for r in vs_results]
+
+    lines, cited, seen = [], set(), set()
+    for fact, names in items:
+        if fact in seen:
+            continue
+        seen.add(fact)
+        lines.append(f"- {fact}")
+        terms = [name.lower() for name in names if name]
+        hits = [sum(term in text for term in terms) for text in texts]
+        best = max(range(len(texts)), key=lambda i: (hits[i], -i), default=None)
+        if best is not None and hits[best]:
+            cited.add(best)
+            lines.append(f"  Source: {_title(vs_results[best])}: {vs_results[best]['content'][:200]}")
+        if len(seen) == facts:
+            break
+
+    answer = "Knowledge graph findings with supporting passages:\n" + "\n".join(lines)
+    others = [r for i, r in enumerate(vs_results) if i not in cited][:passages]
+    if others:
+        answer += "\n\nOther relevant passages:\n" + "\n".join(f"- {_title(r)}: {r['content'][:200]}" for r in others)
+    return answer
+
+
+class ConcurrentRetriever:
+    """
+    Drop-in front end for HybridRAGAgent.route_query.
+
+    Hybrid queries are split into a KG-only and a vector-only call that run
+    on a small shared thread pool, so latency tracks the slower backend
+    instead of the sum of both. Each backend has its own timeout; if one
+    times out or fails, the other's results are returned on their own.
+    When both return results, the answer pairs graph facts with the
+    passages that support them.
+
+    When a graph replica is attached, KG lookups for queries that mention
+    known entities (resolved by the entity linker, if one is attached) are
+    answered from it in-process; everything else still goes to Neo4j
+    through the agent. Queries that mention two or more
+    entities also get multi-hop paths between them from the path searcher.
+
+    With a lexical index attached, vector retrieval runs BM25 alongside the
+    dense search (on its own thread pool, so vector workers never wait on
+    queued BM25 work) and merges both rankings with reciprocal rank
+    fusion, so exact scientific terms the embedding model blurs still
+    surface.
+
+    A dense_search callable (e.g. over the local quantized ANN index)
+    replaces the agent's vector store lookup for dense retrieval.
+
+    Metadata filters restrict document retrieval. They are passed down to
+    dense_search, which searches only the matching chunks (pre-filter);
+    agent and BM25 results are filtered after retrieval instead.
+
+    With a reranker attached, each backend's leading candidates are
+    re-scored by a cross-encoder before they are returned; KG path steps
+    stay first. Answer text is built from the fused, re-ranked lists.
+
+    With an intent classifier attached, hybrid queries it is confident
+    about go to one backend only; if that backend comes back empty the
+    other one is asked before answering. Low-confidence queries fan out
+    to both. Every decision and its outcome is logged by the classifier.
+    """
+
+    def __init__(
+        self,
+        agent,
+        kg_timeout: float = 2.0,
+        vs_timeout: float = 2.0,
+        max_workers: int = 8,
+        kg_replica=None,
+        replica_hops: int = 2,
+        replica_limit: int = 50,
+        path_searcher=None,
+        path_relationships: Optional[List[str]] = None,
+        entity_linker=None,
+        lexical_index=None,
+        lexical_k: int = 10,
+        rrf_k: int = 60,
+        dense_search: Optional[Callable[[str, int, Optional[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+        dense_k: int = 10,
+        reranker=None,
+        intent_classifier=None,
+    ):
+        """
+        Initialize retriever
+
+        Args:
+            agent: HybridRAGAgent instance
+            kg_timeout: Seconds to wait for knowledge graph results
+            vs_timeout: Seconds to wait for vector store results
+            max_workers: Size of the shared retrieval thread pool
+            kg_replica: Optional GraphReplica consulted before Neo4j
+            replica_hops: Neighborhood radius for replica lookups
+            replica_limit: Maximum relationships returned from the replica
+            path_searcher: Optional PathSearcher over the same replica
+            path_relationships: Relationship types paths may follow (None = all)
+            entity_linker: Optional EntityLinker used to find query entities
+            lexical_index: Optional LexicalIndex searched alongside the vector store
+            lexical_k: BM25 results fused per query
+            rrf_k: Reciprocal rank fusion constant
+            dense_search: Optional (query, k, filters) -> vs_results used
+                instead of the agent's vector store
+            dense_k: Dense results per query when dense_search is set
+            reranker: Optional CrossEncoderReranker applied to each backend's results
+            intent_classifier: Optional QueryIntentClassifier that routes
+                hybrid queries and replaces the agent's classification
+        """
+        self.agent = agent
+        self.kg_replica = kg_replica
+        self.replica_hops = replica_hops
+        self.replica_limit = replica_limit
+        self.path_searcher = path_searcher
+        self.path_relationships = path_relationships
+        self.entity_linker = entity_linker
+        self.lexical_index = lexical_index
+        self.lexical_k = lexical_k
+        self.rrf_k = rrf_k
+        self.dense_search = dense_search
+        self.dense_k = dense_k
+        self.reranker = reranker
+        self.intent_classifier = intent_classifier
+        self.kg_timeout = kg_timeout
+        self.vs_timeout = vs_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bodhirag-retrieval"
+        )
+        self._lexical_executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bodhirag-lexical"
+        )
+
+    def _timed(self, fn: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], float]:
+        start = time.perf_counter()
+        result = fn()
+        return result, (time.perf_counter() - start) * 1000
+
+    def classify_intent(self, query: str) -> str:
+        """Query type (kg_primary, vs_primary or hybrid)"""
+        if self.intent_classifier is not None:
+            return self.intent_classifier.classify(query)["intent"]
+        return self.agent.classify_query_intent(query)
+
+    def _mentions(self, query: str) -> List[List[str]]:
+        """Entity names per mention in the query"""
+        if self.entity_linker is not None and len(self.entity_linker):
+            return [mention["names"] for mention in self.entity_linker.link(query)]
+        return [[name] for name in self.kg_replica.match_entities(query)]
+
+    def _replica_route(self, query: str) -> Optional[Dict[str, Any]]:
+        """Answer a KG-only query from the replica, or None if it cannot"""
+        replica = self.kg_replica
+        if replica is None or not replica.ready:
+            return None
+        mentions = self._mentions(query)
+        entities = list(dict.fromkeys(name for names in mentions for name in names))
+        if not entities:
+            return None
+
+        paths: List[Dict[str, Any]] = []
+        retrieval_stats: Dict[str, Any] = {"kg_source": "replica"}
+        if self.path_searcher is not None and len(mentions) >= 2:
+            targets = [name for names in mentions[1:] for name in names]
+            search = self.path_searcher.find_paths(mentions[0], targets, relationships=self.path_relationships)
+            paths = search["paths"]
+            retrieval_stats.update({"kg_paths": len(paths), "path_search_ms": search["stats"]["elapsed_ms"]})
+
+        # Path steps lead, followed by the entities' neighborhoods
+        kg_results: List[Dict[str, Any]] = []
+        seen = set()
+        for path in paths:
+            for step in path["steps"]:
+                key = (step["subject"], step["relationship"], step["object"])
+                if key not in seen:
+                    seen.add(key)
+                    kg_results.append({**step, "evidence": " | ".join(step["evidence"])})
+        for rel in replica.neighborhood(entities, hops=self.replica_hops, limit=self.replica_limit):
+            key = (rel["subject"], rel["relationship"], rel["object"])
+            if key not in seen:
+                seen.add(key)
+                kg_results.append(rel)
+        kg_results = kg_results[:self.replica_limit]
+        if not kg_results:
+            return None
+
+        retrieval_stats.update({"kg_relationships": len(kg_results), "vs_documents": 0})
+        result = self._rerank(query, {
+            "query": query,
+            "query_type": self.classify_intent(query),
+            "kg_results": kg_results,
+            "kg_paths": paths,
+            "vs_results": [],
+            "retrieval_stats": retrieval_stats,
+        }, "kg")
+        result["final_answer"] = relationships_answer(result["kg_results"], paths, entities)
+        return result
+
+    def kg_route(self, query: str) -> Dict[str, Any]:
+        """KG-only retrieval: the replica when it can answer, Neo4j otherwise"""
+        result = self._replica_route(query)
+        if result is None:
+            result = self.agent.route_query(query, True, False)
+            result.setdefault("retrieval_stats", {})["kg_source"] = "neo4j"
+            result = self._rerank(query, result, "kg")
+            if self._reordered(result, "kg"):
+                result["final_answer"] = relationships_answer(result["kg_results"], result.get("kg_paths") or [])
+        return result
+
+    @staticmethod
+    def _reordered(result: Dict[str, Any], backend: str) -> bool:
+        """Whether the reranker re-ordered this backend's results"""
+        return result.get("retrieval_stats", {}).get(f"{backend}_rerank_status") in ("ok", "cached")
+
+    def _rerank(self, query: str, result: Dict[str, Any], backend: str) -> Dict[str, Any]:
+        """Re-rank one backend's results in place, recording {backend}_rerank_* stats"""
+        if self.reranker is None:
+            return result
+        key = f"{backend}_results"
+        if backend == "kg":
+            path_steps = {
+                (step["subject"], step["relationship"], step["object"])
+                for path in result.get("kg_paths") or [] for step in path["steps"]
+            }
+            results, stats = self.reranker.rerank(query, result.get(key) or [], relationship_text, pinned=len(path_steps))
+        else:
+            results, stats = self.reranker.rerank(query, result.get(key) or [], document_text)
+        result[key] = results
+        result.setdefault("retrieval_stats", {}).update({f"{backend}_{name}": value for name, value in stats.items()})
+        return result
+
+    def submit_kg(self, query: str):
+        """Start knowledge graph retrieval on the pool"""
+        return self._executor.submit(self._timed, lambda: self.kg_route(query))
+
+    def _dense_route(self, query: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Vector-only retrieval through the dense_search backend"""
+        vs_results = self.dense_search(query, self.dense_k, filters)
+        return {
+            "query": query,
+            "query_type": self.classify_intent(query),
+            "kg_results": [],
+            "vs_results": vs_results,
+            "final_answer": passages_answer(vs_results),
+            "retrieval_stats": {"kg_relationships": 0, "vs_documents": len(vs_results), "vs_backend": "ann"},
+        }
+
+    def _dense(self, query: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if self.dense_search is not None:
+            result = self._dense_route(query, filters)
+            if filters:
+                result["retrieval_stats"]["filter"] = "pre"
+            return result
+        result = self.agent.route_query(query, False, True)
+        if filters:
+            normalized = normalize_filters(filters)
+            result["vs_results"] = [
+                r for r in result.get("vs_results") or [] if metadata_matches(r.get("metadata") or {}, normalized)
+            ]
+            result.setdefault("retrieval_stats", {}).update({"vs_documents": len(result["vs_results"]), "filter": "post"})
+        return result
+
+    def _lexical(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        if not filters:
+            return self.lexical_index.search(query, self.lexical_k)
+        # BM25 has no pre-filter; over-fetch and filter
+        normalized = normalize_filters(filters)
+        hits = self.lexical_index.search(query, self.lexical_k * 5)
+        return [hit for hit in hits if metadata_matches(hit["metadata"], normalized)][:self.lexical_k]
+
+    def vector_route(self, query: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Vector-only retrieval: dense search, fused with BM25 when a lexical index is attached
+
+        Args:
+            query: User question
+            filters: Optional metadata filter (see metadata_filter.normalize_filters)
+        """
+        if filters:
+            normalize_filters(filters)
+        if self.lexical_index is None:
+            result = self._rerank(query, self._dense(query, filters), "vs")
+            if self._reordered(result, "vs"):
+                result["final_answer"] = passages_answer(result["vs_results"])
+            return result
+
+        lexical_future = self._lexical_executor.submit(self._timed, lambda: self._lexical(query, filters))
+        result = self._dense(query, filters)
+        lexical, info = self.collect(lexical_future, time.perf_counter() + self.vs_timeout)
+
+        dense = result.get("vs_results") or []
+        fused = reciprocal_rank_fusion([dense, lexical or []], k=self.rrf_k, limit=max(len(dense), self.lexical_k))
+        result["vs_results"] = fused
+        result.setdefault("retrieval_stats", {}).update({
+            "vs_documents": len(fused),
+            "lexical_hits": len(lexical or []),
+            "lexical_time_ms": info["time_ms"],
+            "lexical_status": info["status"],
+            "fusion": "rrf",
+        })
+        result = self._rerank(query, result, "vs")
+        result["final_answer"] = passages_answer(result["vs_results"])
+        return result
+
+    def submit_vector(self, query: str, filters: Optional[Dict[str, Any]] = None):
+        """Start vector store retrieval on the pool"""
+        return self._executor.submit(self._timed, lambda: self.vector_route(query, filters))
+
+    @staticmethod
+    def collect(future, deadline: float) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Wait for one backend until its deadline
+
+        Returns:
+            (result or None, {"status", "time_ms", "error"})
+        """
+        start = time.perf_counter()
+        try:
+            result, elapsed_ms = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            return result, {"status": "ok", "time_ms": round(elapsed_ms, 1), "error": None}
+        except FutureTimeout:
+            future.cancel()
+            waited_ms = (time.perf_counter() - start) * 1000
+            return None, {"status": "timeout", "time_ms": round(waited_ms, 1), "error": None}
+        except Exception as e:
+            waited_ms = (time.perf_counter() - start) * 1000
+            return None, {"status": "error", "time_ms": round(waited_ms, 1), "error": str(e)}
+
+    @staticmethod
+    async def collect_async(future, deadline: float) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Like collect(), but awaits the future without blocking the event loop"""
+        start = time.perf_counter()
+        try:
+            result, elapsed_ms = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=max(0.0, deadline - time.perf_counter())
+            )
+            return result, {"status": "ok", "time_ms": round(elapsed_ms, 1), "error": None}
+        except asyncio.TimeoutError:
+            waited_ms = (time.perf_counter() - start) * 1000
+            return None, {"status": "timeout", "time_ms": round(waited_ms, 1), "error": None}
+        except Exception as e:
+            waited_ms = (time.perf_counter() - start) * 1000
+            return None, {"status": "error", "time_ms": round(waited_ms, 1), "error": str(e)}
+
+    def route_query(
+        self, query: str, use_kg: bool = True, use_vector: bool = True, filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Route a query, running both backends concurrently when both are enabled
+
+        Args:
+            query: User question
+            use_kg: Use Knowledge Graph
+            use_vector: Use Vector Store
+            filters: Optional metadata filter applied to document retrieval
+
+        Returns:
+            Result dict in the same shape as HybridRAGAgent.route_query,
+            with per-backend timings added to retrieval_stats
+        """
+        if not (use_kg and use_vector):
+            if use_kg:
+                result, elapsed_ms = self._timed(lambda: self.kg_route(query))
+            elif use_vector:
+                result, elapsed_ms = self._timed(lambda: self.vector_route(query, filters))
+            else:
+                result, elapsed_ms = self._timed(lambda: self.agent.route_query(query, False, False))
+            backend = "kg" if use_kg else "vs"
+            result.setdefault("retrieval_stats", {})
+            result["retrieval_stats"][f"{backend}_time_ms"] = round(elapsed_ms, 1)
+            result["retrieval_stats"][f"{backend}_status"] = "ok"
+            return result
+
+        if filters:
+            normalize_filters(filters)
+        decision = self.decide_route(query)
+        if decision is not None and decision["route"] != "both":
+            return self._route_single(query, decision, filters)
+
+        start = time.perf_counter()
+        kg_future = self.submit_kg(query)
+        vs_future = self.submit_vector(query, filters)
+
+        kg_result, kg_info = self.collect(kg_future, start + self.kg_timeout)
+        vs_result, vs_info = self.collect(vs_future, start + self.vs_timeout)
+
+        if kg_result is None and vs_result is None:
+            raise RuntimeError(
+                f"Both backends failed (kg: {kg_info['error'] or kg_info['status']}, "
+                f"vs: {vs_info['error'] or vs_info['status']})"
+            )
+
+        merged = self.merge(query, kg_result, vs_result, query_type=decision["intent"] if decision else None)
+        merged["retrieval_stats"].update({
+            "kg_time_ms": kg_info["time_ms"],
+            "kg_status": kg_info["status"],
+            "vs_time_ms": vs_info["time_ms"],
+            "vs_status": vs_info["status"],
+            "total_time_ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+        if decision is not None:
+            self.record_route(query, decision, merged, fallback=False)
+        return merged
+
+    def _route_single(self, query: str, decision: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send a confidently classified query to one backend, falling back to the other if it finds nothing"""
+        backend = decision["route"]
+        other = "vs" if backend == "kg" else "kg"
+        submit = {"kg": lambda: self.submit_kg(query), "vs": lambda: self.submit_vector(query, filters)}
+        timeouts = {"kg": self.kg_timeout, "vs": self.vs_timeout}
+
+        start = time.perf_counter()
+        partial: Dict[str, Optional[Dict[str, Any]]] = {"kg": None, "vs": None}
+        infos: Dict[str, Dict[str, Any]] = {}
+        partial[backend], infos[backend] = self.collect(submit[backend](), start + timeouts[backend])
+        fallback = not (partial[backend] or {}).get(f"{backend}_results")
+        if fallback:
+            partial[other], infos[other] = self.collect(submit[other](), time.perf_counter() + timeouts[other])
+            if partial["kg"] is None and partial["vs"] is None:
+                raise RuntimeError(
+                    f"Both backends failed (kg: {infos['kg']['error'] or infos['kg']['status']}, "
+                    f"vs: {infos['vs']['error'] or infos['vs']['status']})"
+                )
+
+        merged = self.merge(query, partial["kg"], partial["vs"], query_type=decision["intent"])
+        for name, info in infos.items():
+            merged["retrieval_stats"].update({f"{name}_time_ms": info["time_ms"], f"{name}_status": info["status"]})
+        merged["retrieval_stats"]["total_time_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.record_route(query, decision, merged, fallback)
+        return merged
+
+    def decide_route(self, query: str) -> Optional[Dict[str, Any]]:
+        """Intent classifier decision for a hybrid query (None without a classifier)"""
+        return self.intent_classifier.classify(query) if self.intent_classifier is not None else None
+
+    def record_route(self, query: str, decision: Dict[str, Any], result: Dict[str, Any], fallback: bool):
+        """Add the routing decision to a result's stats and log its outcome"""
+        result["retrieval_stats"].update({
+            "route": decision["route"],
+            "intent_confidence": decision["confidence"],
+            "intent_method": decision["method"],
+            "route_fallback": fallback,
+        })
+        self.intent_classifier.record(query, decision, result, fallback)
+
+    def merge(
+        self,
+        query: str,
+        kg_result: Optional[Dict[str, Any]],
+        vs_result: Optional[Dict[str, Any]],
+        query_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Combine single-backend results into one hybrid result"""
+        kg_results: List[Dict[str, Any]] = (kg_result or {}).get("kg_results") or []
+        kg_paths: List[Dict[str, Any]] = (kg_result or {}).get("kg_paths") or []
+        vs_results: List[Dict[str, Any]] = (vs_result or {}).get("vs_results") or []
+
+        if kg_results and vs_results:
+            final_answer = hybrid_answer(kg_results, kg_paths, vs_results)
+        else:
+            answers = []
+            for partial in (kg_result, vs_result):
+                answer = (partial or {}).get("final_answer")
+                if answer and answer not in answers:
+                    answers.append(answer)
+            final_answer = "\n\n".join(answers)
+
+        if query_type is None:
+            if kg_result is None or vs_result is None:
+                query_type = (kg_result or vs_result).get("query_type")
+            else:
+                query_type = self.classify_intent(query)
+
+        retrieval_stats = {
+            "kg_relationships": len(kg_results),
+            "vs_documents": len(vs_results),
+        }
+        if kg_result is not None:
+            kg_stats = kg_result.get("retrieval_stats") or {}
+            retrieval_stats["kg_source"] = kg_stats.get("kg_source", "neo4j")
+            if "kg_paths" in kg_stats:
+                retrieval_stats["kg_paths"] = kg_stats["kg_paths"]
+                retrieval_stats["path_search_ms"] = kg_stats["path_search_ms"]
+            retrieval_stats.update({key: kg_stats[key] for key in KG_STATS if key in kg_stats})
+        if vs_result is not None:
+            vs_stats = vs_result.get("retrieval_stats") or {}
+            retrieval_stats.update({key: vs_stats[key] for key in VECTOR_STATS if key in vs_stats})
+
+        return {
+            "query": query,
+            "query_type": query_type,
+            "kg_results": kg_results,
+            "kg_paths": kg_paths,
+            "vs_results": vs_results,
+            "final_answer": final_answer,
+            "retrieval_stats": retrieval_stats,
+        }
+
+    def shutdown(self):
+        """Stop the retrieval thread pools"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._lexical_executor.shutdown(wait=False, cancel_futures=True)
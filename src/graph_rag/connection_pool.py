@@ -0,0 +1,276 @@
+"""
+Neo4j Session Pool
+Long-lived, thread-safe Neo4j driver shared by every request
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from neo4j import GraphDatabase
+    NEO4J_AVAILABLE = True
+except ImportError:
+    NEO4J_AVAILABLE = False
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no session slot frees up within the acquire timeout."""
+
+
+class Neo4jSessionPool:
+    """
+    Bounded pool of Neo4j sessions over a single long-lived driver.
+
+    The driver (and its Bolt connections) is created once per process, so
+    requests no longer pay for a handshake and auth round-trip, and no
+    request can close a connection another thread is still using.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        username: str,
+        password: str,
+        max_size: int = 10,
+        acquire_timeout: float = 5.0,
+        idle_check_after: float = 30.0,
+        reconnect_backoff: float = 30.0,
+        database: Optional[str] = None,
+        driver_factory: Optional[Callable[..., Any]] = None,
+    ):
+        """
+        Initialize pool
+
+        Args:
+            uri: Neo4j Bolt URI
+            username: Neo4j username
+            password: Neo4j password
+            max_size: Maximum number of sessions borrowed at once
+            acquire_timeout: Seconds to wait for a free slot before failing
+            idle_check_after: Verify connectivity when the pool has been idle this long
+            reconnect_backoff: Seconds to wait before retrying a failed connect
+            database: Optional database name passed to every session
+            driver_factory: Callable returning a driver (defaults to GraphDatabase.driver)
+        """
+        self.uri = uri
+        self.username = username
+        self.password = password
+        self.max_size = max(1, int(max_size))
+        self.acquire_timeout = acquire_timeout
+        self.idle_check_after = idle_check_after
+        self.reconnect_backoff = reconnect_backoff
+        self.database = database
+        self._driver_factory = driver_factory
+
+        self.driver = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._in_use = 0
+        self._last_used = 0.0
+        self._last_failure = 0.0
+        self._probing = False
+
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._liveness_checks = 0
+        self._reconnects = 0
+
+    def _create_driver(self):
+        if self._driver_factory is not None:
+            return self._driver_factory(self.uri, auth=(self.username, self.password))
+        if not NEO4J_AVAILABLE:
+            raise RuntimeError("neo4j driver is not installed")
+        return GraphDatabase.driver(
+            self.uri,
+            auth=(self.username, self.password),
+            max_connection_pool_size=self.max_size,
+            connection_acquisition_timeout=self.acquire_timeout,
+            liveness_check_timeout=self.idle_check_after,
+        )
+
+    def connect(self) -> bool:
+        """
+        Create and verify the shared driver (idempotent)
+
+        Returns:
+            True if the pool is connected
+        """
+        with self._lock:
+            if self.driver is not None:
+                return True
+            if self._last_failure and time.monotonic() - self._last_failure < self.reconnect_backoff:
+                return False
+
+            driver = None
+            try:
+                driver = self._create_driver()
+                driver.verify_connectivity()
+            except Exception as e:
+                print(f"⚠️ Neo4j pool connect failed: {e}")
+                if driver is not None:
+                    try:
+                        driver.close()
+                    except Exception:
+                        pass
+                self._last_failure = time.monotonic()
+                return False
+
+            self.driver = driver
+            self._last_used = time.monotonic()
+            self._last_failure = 0.0
+            return True
+
+    def _check_liveness(self):
+        """
+        Re-verify (and if needed recreate) the driver after a long idle period.
+
+        The network round-trip runs outside the lock, so other requests and
+        metrics() never queue behind it; only one thread probes at a time.
+
+        Returns:
+            The driver to borrow sessions from, or None if there is none
+        """
+        with self._lock:
+            driver = self.driver
+            if driver is None or self._probing:
+                return driver
+            if time.monotonic() - self._last_used < self.idle_check_after:
+                return driver
+            self._probing = True
+            self._liveness_checks += 1
+
+        try:
+            try:
+                driver.verify_connectivity()
+            except Exception:
+                pass
+            else:
+                with self._lock:
+                    self._last_used = time.monotonic()
+                return driver
+
+            try:
+                fresh = self._create_driver()
+            except Exception:
+                with self._lock:
+                    if self.driver is driver:
+                        self.driver = None
+                    # session() reconnects through connect() once the backoff expires
+                    self._last_failure = time.monotonic()
+                self._close_quietly(driver)
+                raise
+
+            with self._lock:
+                replaced = self.driver is driver
+                if replaced:
+                    self.driver = fresh
+                    self._last_used = time.monotonic()
+                    self._reconnects += 1
+                current = self.driver
+            self._close_quietly(driver if replaced else fresh)
+            return current
+        finally:
+            with self._lock:
+                self._probing = False
+
+    @staticmethod
+    def _close_quietly(driver):
+        try:
+            driver.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def session(self, **session_kwargs):
+        """
+        Borrow a session from the pool
+
+        Usage:
+            with pool.session() as session:
+                session.run("MATCH (n) RETURN count(n)")
+        """
+        if self.driver is None and not self.connect():
+            raise ConnectionError("Neo4j is not reachable")
+
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeoutError(
+                f"No Neo4j session available after {self.acquire_timeout:.1f}s "
+                f"(pool size {self.max_size})"
+            )
+        waited = time.monotonic() - start
+
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        try:
+            driver = self._check_liveness()
+            if driver is None:
+                raise ConnectionError("Neo4j driver unavailable (closed or reconnecting)")
+            if self.database and "database" not in session_kwargs:
+                session_kwargs["database"] = self.database
+            with driver.session(**session_kwargs) as session:
+                yield session
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._last_used = time.monotonic()
+            self._slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get pool utilization metrics"""
+        with self._lock:
+            acquired = self._acquired
+            return {
+                "connected": self.driver is not None,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": self.max_size - self._in_use,
+                "acquired": acquired,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": (self._wait_total / acquired * 1000) if acquired else 0.0,
+                "max_wait_ms": self._wait_max * 1000,
+                "liveness_checks": self._liveness_checks,
+                "reconnects": self._reconnects,
+            }
+
+    def close(self):
+        """Close the shared driver (call once at process shutdown)"""
+        with self._lock:
+            if self.driver is not None:
+                try:
+                    self.driver.close()
+                finally:
+                    self.driver = None
+
+
+class PooledDriver:
+    """
+    Driver-shaped view of a Neo4jSessionPool.
+
+    Code written against a neo4j driver (``driver.session()``) borrows its
+    sessions from the pool instead, so it always uses the pool's current
+    driver and is covered by its size bound, acquire timeout and metrics.
+    """
+
+    def __init__(self, pool: Neo4jSessionPool):
+        self.pool = pool
+
+    def session(self, **session_kwargs):
+        return self.pool.session(**session_kwargs)
+
+    def verify_connectivity(self):
+        with self.pool.session() as session:
+            session.run("RETURN 1").consume()
+
+    def close(self):
+        """No-op: the pool owns the driver and closes it at shutdown"""
@@ -0,0 +1,212 @@
+"""
+Embedding Engine
+Length-bucketed batch embedding with a memory-mapped on-disk vector cache
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+KEY_BYTES = 20
+
+
+def embedding_key(model_name: str, text: str) -> bytes:
+    """Cache key for one (model, text) pair"""
+    return hashlib.sha1(f"{model_name}\x00{text}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Append-only embedding store backed by two flat files.
+
+    ``keys.bin`` holds one 20-byte SHA-1 per row and ``vectors.bin`` holds
+    the matching rows as float16 (or float32). Vectors are read through
+    np.memmap, so the OS pages them in on demand and the cache costs almost
+    no resident memory.
+    """
+
+    def __init__(self, cache_dir: str, dim: int, dtype: str = "float16"):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory for keys.bin and vectors.bin
+            dim: Embedding dimension
+            dtype: "float16" or "float32"
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.keys_path = self.cache_dir / "keys.bin"
+        self.vectors_path = self.cache_dir / "vectors.bin"
+
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._load()
+
+    def _load(self):
+        keys = self.keys_path.read_bytes() if self.keys_path.exists() else b""
+        row_bytes = self.dim * self.dtype.itemsize
+        stored_rows = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+
+        # A crash between or during the two appends leaves one file longer or
+        # a partial row; trust the shorter one and cut both back to whole rows,
+        # or later appends would land at the wrong offsets
+        rows = min(len(keys) // KEY_BYTES, stored_rows)
+        for path, size in ((self.keys_path, rows * KEY_BYTES), (self.vectors_path, rows * row_bytes)):
+            if path.exists() and path.stat().st_size != size:
+                os.truncate(path, size)
+        self._index = {keys[i * KEY_BYTES:(i + 1) * KEY_BYTES]: i for i in range(rows)}
+        self._rows = rows
+        self._vectors = None
+
+    def _mapped(self) -> Optional[np.memmap]:
+        if self._vectors is None and self._rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(self._rows, self.dim))
+        return self._vectors
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """Return cached vectors (as float32) for the keys that are present"""
+        with self._lock:
+            rows = [(key, self._index[key]) for key in keys if key in self._index]
+            if not rows:
+                return {}
+            vectors = self._mapped()
+            return {key: np.asarray(vectors[row], dtype=np.float32) for key, row in rows}
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray):
+        """Append new vectors (keys already present are ignored)"""
+        with self._lock:
+            fresh = [(i, key) for i, key in enumerate(keys) if key not in self._index]
+            if not fresh:
+                return
+            block = np.ascontiguousarray(vectors[[i for i, _ in fresh]], dtype=self.dtype)
+            try:
+                with open(self.vectors_path, "ab") as f:
+                    f.write(block.tobytes())
+                with open(self.keys_path, "ab") as f:
+                    f.write(b"".join(key for _, key in fresh))
+            except OSError:
+                # Drop whatever part of the append made it to disk
+                self._load()
+                raise
+            for _, key in fresh:
+                self._index[key] = self._rows
+                self._rows += 1
+            self._vectors = None
+
+
+class EmbeddingEngine:
+    """
+    Batched sentence embedding for ingestion.
+
+    Texts are deduplicated, looked up in the on-disk cache, and only the
+    misses are embedded. Misses are sorted by length before batching so
+    each batch pads to similar lengths. Vectors are L2-normalized, matching
+    the cosine space ChromaDB uses.
+    """
+
+    def __init__(
+        self,
+        model_loader: Callable[[], Any],
+        model_name: str,
+        cache_dir: Optional[str] = None,
+        dim: int = 384,
+        batch_size: int = 64,
+        dtype: str = "float16",
+        num_threads: Optional[int] = None,
+    ):
+        """
+        Initialize engine
+
+        Args:
+            model_loader: Returns the (shared) SentenceTransformer
+            model_name: Model name, part of every cache key
+            cache_dir: Directory for the vector cache (no cache if None)
+            dim: Embedding dimension (384 for all-MiniLM-L6-v2)
+            batch_size: Texts per forward pass
+            dtype: On-disk vector dtype ("float16" or "float32")
+            num_threads: torch intra-op threads; torch.set_num_threads is
+                process-wide, so it is only called when this is given
+        """
+        self.model_loader = model_loader
+        self.model_name = model_name
+        self.batch_size = max(1, int(batch_size))
+        self.num_threads = num_threads
+        self.cache = EmbeddingCache(cache_dir, dim, dtype) if cache_dir else None
+        self.dim = dim
+        self._threads_set = False
+
+        self.last_stats: Dict[str, Any] = {}
+
+    def _model(self):
+        model = self.model_loader()
+        if model is None:
+            raise RuntimeError(f"Embedding model {self.model_name} not available")
+        if self.num_threads and not self._threads_set:
+            try:
+                import torch
+                torch.set_num_threads(self.num_threads)
+            except ImportError:
+                pass
+            self._threads_set = True
+        return model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, reusing cached vectors
+
+        Args:
+            texts: Texts to embed (duplicates are embedded once)
+
+        Returns:
+            float32 array of shape (len(texts), dim), in input order
+        """
+        start = time.perf_counter()
+        keys = [embedding_key(self.model_name, text) for text in texts]
+        unique: Dict[bytes, str] = dict(zip(keys, texts))
+
+        vectors = self.cache.get_many(list(unique)) if self.cache is not None else {}
+        missing = [key for key in unique if key not in vectors]
+        cache_hits = len(unique) - len(missing)
+
+        # Sort by length so each batch pads to similar sequence lengths
+        missing.sort(key=lambda key: len(unique[key]))
+        if missing:
+            model = self._model()
+            for offset in range(0, len(missing), self.batch_size):
+                batch_keys = missing[offset:offset + self.batch_size]
+                batch = model.encode(
+                    [unique[key] for key in batch_keys],
+                    batch_size=len(batch_keys),
+                    normalize_embeddings=True,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                ).astype(np.float32)
+                if self.cache is not None:
+                    self.cache.put_many(batch_keys, batch)
+                vectors.update(zip(batch_keys, batch))
+
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            "texts": len(texts),
+            "unique": len(unique),
+            "cache_hits": cache_hits,
+            "embedded": len(missing),
+            "elapsed_s": elapsed,
+            "embeddings_per_s": len(missing) / elapsed if elapsed and missing else 0.0,
+        }
+
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
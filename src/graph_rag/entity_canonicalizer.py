@@ -0,0 +1,290 @@
+"""
+Entity Canonicalizer
+Merges near-duplicate entity names and duplicate triples before graph population
+"""
+
+import json
+import re
+import threading
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .bulk_writer import triple_to_row
+from .entity_linker import STOPWORDS, normalize_entity
+
+MAX_EVIDENCE_SPANS = 5
+
+_ROMAN = re.compile(r"^m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})$")
+
+
+def normalize_relationship(relationship: str) -> str:
+    """'Mitigated By' / 'mitigated-by' -> 'mitigated_by'"""
+    return "_".join(re.findall(r"[a-z0-9]+", relationship.lower())) or "relates_to"
+
+
+def _marker_tokens(key: str) -> set:
+    """Tokens that tell otherwise similar names apart: numbers, roman numerals, single letters"""
+    return {
+        token for token in key.split()
+        if len(token) == 1 or any(c.isdigit() for c in token) or _ROMAN.match(token)
+    }
+
+
+def _block_keys(key: str) -> set:
+    """Content words plus the first characters with spaces removed, so
+    'micro gravity' and 'microgravitty' land in the same block"""
+    return (set(key.split()) - STOPWORDS) | {"#" + key.replace(" ", "")[:4]}
+
+
+class EntityCanonicalizer:
+    """
+    Maps every extracted entity name to one canonical name.
+
+    Names are first normalized (case, accents, punctuation, plurals), so
+    "Pelvic Bone" and "pelvic bones" share a key outright. Remaining keys
+    are compared only against canonical entities that share a content word
+    or their first few letters (blocking), never all pairs. A string
+    similarity above ``candidate_threshold`` merges only if the embeddings
+    also agree; without an embedding model, only similarities above
+    ``string_threshold`` merge. Entities with different known types never
+    merge, and neither do names that differ in a number, roman numeral or
+    single letter ("Type 1 Diabetes" / "Type 2 Diabetes", "Interleukin-6" /
+    "Interleukin-8"), however similar the strings are.
+
+    The registry of canonical names and their aliases is kept in an
+    append-only JSONL file, so later batches and restarts map the same
+    surface forms to the same graph node. Registry merges that the marker
+    rule forbids are ignored on load.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        embed_fn: Optional[Callable[[List[str]], Optional[np.ndarray]]] = None,
+        string_threshold: float = 0.92,
+        candidate_threshold: float = 0.8,
+        embedding_threshold: float = 0.9,
+        max_block_size: int = 500,
+    ):
+        """
+        Initialize canonicalizer
+
+        Args:
+            path: JSONL registry file (None keeps the registry in memory)
+            embed_fn: Returns normalized embeddings for a list of strings,
+                or None when no model is available
+            string_threshold: Similarity that merges when no embeddings are available
+            candidate_threshold: Similarity that merges if embeddings agree
+            embedding_threshold: Cosine similarity required for candidates
+            max_block_size: Blocking tokens shared by more canonical
+                entities than this are too common to block on
+        """
+        self.path = Path(path) if path else None
+        self.embed_fn = embed_fn
+        self.string_threshold = string_threshold
+        self.candidate_threshold = candidate_threshold
+        self.embedding_threshold = embedding_threshold
+        self.max_block_size = max_block_size
+        self._lock = threading.Lock()
+
+        self._canonical: Dict[str, str] = {}
+        self._types: Dict[str, str] = {}
+        self._blocks: Dict[str, List[str]] = {}
+        self._aliases: Dict[str, List[str]] = {}
+
+        if self.path is not None and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    # Merges recorded before the marker rule existed are dropped
+                    canonical_key = normalize_entity(entry["canonical"])
+                    if _marker_tokens(entry["key"]) != _marker_tokens(canonical_key):
+                        continue
+                    self._register(entry["key"], entry["canonical"], entry.get("type"))
+                    alias = entry.get("alias")
+                    if alias and _marker_tokens(normalize_entity(alias)) == _marker_tokens(canonical_key):
+                        self._aliases.setdefault(entry["canonical"], []).append(alias)
+
+    def _register(self, key: str, canonical: str, entity_type: Optional[str]) -> bool:
+        if key in self._canonical:
+            return False
+        self._canonical[key] = canonical
+        self._types[key] = entity_type or "Unknown"
+        for block in _block_keys(key):
+            self._blocks.setdefault(block, []).append(key)
+        return True
+
+    def seed(self, names: Iterable[str]) -> int:
+        """
+        Register names already in the graph as canonical, without merging them
+
+        Returns:
+            Number of names newly registered
+        """
+        entries = []
+        with self._lock:
+            for name in names:
+                key = normalize_entity(name or "")
+                if key and self._register(key, name, None):
+                    entries.append({"key": key, "canonical": name})
+            self._append(entries)
+        return len(entries)
+
+    def _append(self, entries: List[Dict[str, Any]]):
+        if self.path is None or not entries:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
+
+    def _best_match(self, key: str, entity_type: str) -> Optional[str]:
+        """Canonical key this key should merge into, if any"""
+        candidates = set()
+        for block_key in _block_keys(key):
+            block = self._blocks.get(block_key, [])
+            if len(block) <= self.max_block_size:
+                candidates.update(block)
+
+        markers = _marker_tokens(key)
+        scored: List[Tuple[float, str]] = []
+        for candidate in candidates:
+            candidate_type = self._types[candidate]
+            if "Unknown" not in (entity_type, candidate_type) and entity_type != candidate_type:
+                continue
+            if _marker_tokens(candidate) != markers:
+                continue
+            # Length bound first: ratio can never exceed 2*min/(len_a+len_b)
+            if 2 * min(len(key), len(candidate)) / (len(key) + len(candidate)) < self.candidate_threshold:
+                continue
+            score = SequenceMatcher(None, key, candidate).ratio()
+            if score >= self.candidate_threshold:
+                scored.append((score, candidate))
+        if not scored:
+            return None
+
+        scored.sort(reverse=True)
+        # Every string match needs the embeddings to agree; without them only near-identical strings merge
+        vectors = self.embed_fn([key] + [candidate for _, candidate in scored]) if self.embed_fn is not None else None
+        if vectors is None:
+            return scored[0][1] if scored[0][0] >= self.string_threshold else None
+        similarities = vectors[1:] @ vectors[0]
+        best = int(np.argmax(similarities))
+        return scored[best][1] if similarities[best] >= self.embedding_threshold else None
+
+    def canonicalize(self, triples: Iterable[Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Rewrite triples onto canonical entity names and merge duplicates
+
+        Args:
+            triples: Extracted triples (any shape accepted by triple_to_row)
+
+        Returns:
+            (rows for BulkGraphWriter, stats). Each row carries
+            evidence_count and up to MAX_EVIDENCE_SPANS evidence_list
+            entries. Stats include entities_in, entities_out,
+            entities_merged, triples_in, triples_out and new_aliases
+            ({alias: canonical}).
+        """
+        rows = [triple_to_row(t) for t in triples]
+
+        mentions: Counter = Counter()
+        types: Dict[str, str] = {}
+        for row in rows:
+            for name, entity_type in ((row["subject"], row["subject_type"]), (row["object"], row["object_type"])):
+                mentions[name] += 1
+                if types.get(name, "Unknown") == "Unknown":
+                    types[name] = entity_type or "Unknown"
+
+        # Surface names grouped by normalized key, most mentioned first
+        groups: Dict[str, List[str]] = {}
+        for name, _ in mentions.most_common():
+            key = normalize_entity(name)
+            if key:
+                groups.setdefault(key, []).append(name)
+
+        mapping: Dict[str, str] = {}
+        new_aliases: Dict[str, str] = {}
+        entries: List[Dict[str, Any]] = []
+        with self._lock:
+            for key, names in groups.items():
+                entity_type = next((types[n] for n in names if types[n] != "Unknown"), "Unknown")
+                target = key if key in self._canonical else self._best_match(key, entity_type)
+                if target is None:
+                    # The most mentioned surface form becomes canonical
+                    self._register(key, names[0], entity_type)
+                    entries.append({"key": key, "canonical": names[0], "type": entity_type})
+                    target = key
+                elif target != key:
+                    # Later lookups of this key skip the similarity search
+                    self._register(key, self._canonical[target], entity_type)
+                    entries.append({"key": key, "canonical": self._canonical[target], "type": entity_type})
+
+                canonical = self._canonical[target]
+                for name in names:
+                    mapping[name] = canonical
+                    if name != canonical and name not in self._aliases.get(canonical, []):
+                        self._aliases.setdefault(canonical, []).append(name)
+                        new_aliases[name] = canonical
+                        entries.append({"key": key, "canonical": canonical, "alias": name})
+            self._append(entries)
+
+        merged: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+        for row in rows:
+            subject = mapping.get(row["subject"], row["subject"])
+            obj = mapping.get(row["object"], row["object"])
+            if not subject or not obj or subject == obj:
+                continue
+            relationship = normalize_relationship(row["relationship"])
+            key = (subject, relationship, obj, row["doc_id"])
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = {
+                    **row,
+                    "subject": subject,
+                    "object": obj,
+                    "relationship": relationship,
+                    "evidence_count": 1,
+                    "evidence_list": [row["evidence"]] if row["evidence"] else [],
+                }
+                continue
+            existing["evidence_count"] += 1
+            if row["evidence"] and row["evidence"] not in existing["evidence_list"]:
+                if len(existing["evidence_list"]) < MAX_EVIDENCE_SPANS:
+                    existing["evidence_list"].append(row["evidence"])
+            if not existing["evidence"]:
+                existing["evidence"] = row["evidence"]
+
+        stats = {
+            "triples_in": len(rows),
+            "triples_out": len(merged),
+            "entities_in": len(mentions),
+            "entities_out": len(set(mapping.values())),
+            "entities_merged": sum(1 for name, canonical in mapping.items() if name != canonical),
+            "new_aliases": new_aliases,
+        }
+        return list(merged.values()), stats
+
+    def aliases(self, canonical: str) -> List[str]:
+        """Known alternative names of a canonical entity"""
+        with self._lock:
+            return list(self._aliases.get(canonical, []))
+
+    def alias_map(self) -> Dict[str, str]:
+        """Every known alias mapped to its canonical name"""
+        with self._lock:
+            return {alias: canonical for canonical, aliases in self._aliases.items() for alias in aliases}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "canonical_keys": len(self._canonical),
+                "canonical_entities": len(set(self._canonical.values())),
+                "aliases": sum(len(a) for a in self._aliases.values()),
+            }
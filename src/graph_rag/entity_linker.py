@@ -0,0 +1,294 @@
+"""
+Entity Linker
+Dictionary index that resolves query text to knowledge graph entity names
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_ACRONYM = re.compile(r"^(.*?)\s*\(([^()]{2,12})\)\s*$")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does during for from how in into is it of on or "
+    "than that the their this to under via was what when where which who why with".split()
+)
+
+_PLURAL_EXCEPTIONS = frozenset({"species", "series", "diabetes", "herpes", "mitochondria"})
+
+
+def _fold(token: str) -> str:
+    """Cheap plural folding so 'bone losses' and 'bone loss' share a key"""
+    if len(token) <= 3 or not token.endswith("s") or token.endswith(("ss", "us", "is")):
+        return token
+    if token in _PLURAL_EXCEPTIONS:
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith(("sses", "xes", "ches", "shes")):
+        return token[:-2]
+    return token[:-1]
+
+
+def entity_tokens(text: str) -> List[str]:
+    """Normalize text into lowercase, accent-free, plural-folded tokens"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return [_fold(t) for t in _TOKEN.findall(text)]
+
+
+def normalize_entity(text: str) -> str:
+    """Normalized lookup key for an entity name or alias"""
+    return " ".join(entity_tokens(text))
+
+
+def _grams(key: str, n: int = 3) -> Set[str]:
+    padded = f" {key} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+class EntityLinker:
+    """
+    Resolves mentions in a query to KG entity names.
+
+    Every entity name (and alias) is normalized to a key and inserted into
+    a token trie, so all multi-word mentions in a query are found in one
+    left-to-right pass with longest-match at each position. Keys are also
+    indexed by token, to expand a short mention such as "bone loss" to the
+    longer names that contain it ("pelvic bone loss"), and by character
+    trigrams for fuzzy matches of misspelt or differently inflected
+    mentions. All three structures are append-only, so newly merged
+    entities are added without rebuilding.
+    """
+
+    def __init__(
+        self,
+        fuzzy_threshold: float = 0.75,
+        max_expansions: int = 5,
+        max_span_tokens: int = 8,
+        max_gram_postings: int = 5000,
+    ):
+        """
+        Initialize linker
+
+        Args:
+            fuzzy_threshold: Minimum trigram Dice similarity for fuzzy matches
+            max_expansions: Longer names returned per matched mention
+            max_span_tokens: Longest mention considered
+            max_gram_postings: Trigrams more common than this are ignored
+                for fuzzy matching
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_expansions = max_expansions
+        self.max_span_tokens = max_span_tokens
+        self.max_gram_postings = max_gram_postings
+        self._lock = threading.Lock()
+
+        self._keys: List[str] = []
+        self._key_ids: Dict[str, int] = {}
+        self._names: List[List[str]] = []
+        self._is_alias: List[bool] = []
+        self._trie: Dict[str, Any] = {}
+        self._token_postings: Dict[str, List[int]] = {}
+        self._gram_postings: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+        self._gram_arrays: Dict[str, np.ndarray] = {}
+        self._gram_count_array = np.zeros(0, dtype=np.int32)
+
+    def _add_key(self, key: str, name: str, alias: bool) -> bool:
+        key_id = self._key_ids.get(key)
+        if key_id is not None:
+            if name in self._names[key_id]:
+                return False
+            self._names[key_id].append(name)
+            return True
+
+        key_id = len(self._keys)
+        self._key_ids[key] = key_id
+        self._keys.append(key)
+        self._names.append([name])
+        self._is_alias.append(alias)
+
+        tokens = key.split()
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[None] = key_id
+        for token in set(tokens):
+            self._token_postings.setdefault(token, []).append(key_id)
+        grams = _grams(key)
+        for gram in grams:
+            self._gram_postings.setdefault(gram, []).append(key_id)
+            self._gram_arrays.pop(gram, None)
+        self._gram_counts.append(len(grams))
+        return True
+
+    def add_entities(self, names: Iterable[str]) -> int:
+        """
+        Index entity names; names like "Reactive Oxygen Species (ROS)"
+        also get their parenthesized acronym and bare form as aliases
+
+        Returns:
+            Number of names newly indexed
+        """
+        added = 0
+        with self._lock:
+            for name in names:
+                key = normalize_entity(name or "")
+                if not key:
+                    continue
+                added += self._add_key(key, name, alias=False)
+                match = _ACRONYM.match(name)
+                if match:
+                    for alias in match.groups():
+                        alias_key = normalize_entity(alias)
+                        if alias_key:
+                            self._add_key(alias_key, name, alias=True)
+        return added
+
+    def add_alias(self, alias: str, name: str) -> bool:
+        """Map an alternative surface form to an entity name"""
+        key = normalize_entity(alias)
+        if not key:
+            return False
+        with self._lock:
+            return self._add_key(key, name, alias=True)
+
+    def _expand(self, tokens: List[str], exclude: int) -> List[str]:
+        """Longer entity names containing the mention's tokens in order"""
+        postings = [self._token_postings.get(t, []) for t in tokens]
+        if not all(postings):
+            return []
+        candidates = set(min(postings, key=len))
+        for posting in postings:
+            candidates.intersection_update(posting)
+        phrase = f" {' '.join(tokens)} "
+        expanded = [
+            key_id for key_id in candidates
+            if key_id != exclude and not self._is_alias[key_id] and phrase in f" {self._keys[key_id]} "
+        ]
+        expanded.sort(key=lambda key_id: (len(self._keys[key_id]), self._keys[key_id]))
+        return [name for key_id in expanded[:self.max_expansions] for name in self._names[key_id]]
+
+    def _posting_array(self, gram: str) -> np.ndarray:
+        array = self._gram_arrays.get(gram)
+        if array is None:
+            array = np.asarray(self._gram_postings.get(gram, ()), dtype=np.int32)
+            self._gram_arrays[gram] = array
+        return array
+
+    def _fuzzy(self, span: str) -> Optional[Tuple[int, float]]:
+        grams = _grams(span)
+        postings = [self._posting_array(g) for g in grams]
+        postings = [p for p in postings if 0 < len(p) <= self.max_gram_postings]
+        if not postings:
+            return None
+        if len(self._gram_count_array) != len(self._gram_counts):
+            self._gram_count_array = np.asarray(self._gram_counts, dtype=np.int32)
+
+        # Shared trigram counts per key, then Dice similarity
+        key_ids, common = np.unique(np.concatenate(postings), return_counts=True)
+        scores = 2 * common / (len(grams) + self._gram_count_array[key_ids])
+        best = int(np.argmax(scores))
+        if scores[best] < self.fuzzy_threshold:
+            return None
+        return int(key_ids[best]), float(scores[best])
+
+    def link(self, text: str, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """
+        Find entity mentions in text
+
+        Args:
+            text: Query text
+            fuzzy: Try trigram matching for spans with no exact match
+
+        Returns:
+            Mentions in text order, each with span, token start/end, names
+            (matched entity names first, then longer names containing the
+            mention), score and method ("exact", "alias" or "fuzzy")
+        """
+        tokens = entity_tokens(text)
+        mentions: List[Dict[str, Any]] = []
+        with self._lock:
+            i = 0
+            while i < len(tokens):
+                # Longest trie match starting at token i
+                node, match = self._trie, None
+                for j in range(i, min(len(tokens), i + self.max_span_tokens)):
+                    node = node.get(tokens[j])
+                    if node is None:
+                        break
+                    if None in node:
+                        match = (j + 1, node[None])
+                if match is not None and not all(t in STOPWORDS for t in tokens[i:match[0]]):
+                    end, key_id = match
+                    mentions.append({
+                        "span": " ".join(tokens[i:end]),
+                        "start": i,
+                        "end": end,
+                        "names": list(dict.fromkeys(self._names[key_id] + self._expand(tokens[i:end], key_id))),
+                        "score": 1.0,
+                        "method": "alias" if self._is_alias[key_id] else "exact",
+                    })
+                    i = end
+                    continue
+                i += 1
+
+            if fuzzy:
+                mentions.extend(self._fuzzy_mentions(tokens, mentions))
+        return sorted(mentions, key=lambda m: m["start"])
+
+    def _fuzzy_mentions(self, tokens: List[str], exact: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        covered = {i for mention in exact for i in range(mention["start"], mention["end"])}
+        candidates = []
+        for size in range(min(3, self.max_span_tokens), 0, -1):
+            for i in range(len(tokens) - size + 1):
+                window = range(i, i + size)
+                if any(j in covered for j in window) or tokens[i] in STOPWORDS or tokens[i + size - 1] in STOPWORDS:
+                    continue
+                # Windows made only of indexed words cannot hide a misspelling
+                if all(tokens[j] in self._token_postings for j in window):
+                    continue
+                span = " ".join(tokens[i:i + size])
+                if len(span) < 4:
+                    continue
+                best = self._fuzzy(span)
+                if best is not None:
+                    candidates.append((best[1], size, i, span, best[0]))
+
+        # Best-scoring, then longest, non-overlapping windows
+        mentions: List[Dict[str, Any]] = []
+        for score, size, i, span, key_id in sorted(candidates, key=lambda c: (-c[0], -c[1])):
+            if any(j in covered for j in range(i, i + size)):
+                continue
+            covered.update(range(i, i + size))
+            mentions.append({
+                "span": span,
+                "start": i,
+                "end": i + size,
+                "names": list(self._names[key_id]),
+                "score": round(score, 3),
+                "method": "fuzzy",
+            })
+        return mentions
+
+    def resolve(self, text: str, fuzzy: bool = True) -> List[str]:
+        """Entity names mentioned in text, best matches first, without duplicates"""
+        names = [name for mention in self.link(text, fuzzy) for name in mention["names"]]
+        return list(dict.fromkeys(names))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "keys": len(self._keys),
+                "aliases": sum(self._is_alias),
+                "tokens": len(self._token_postings),
+                "trigrams": len(self._gram_postings),
+            }
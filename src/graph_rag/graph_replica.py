@@ -0,0 +1,408 @@
+"""
+Graph Replica
+In-memory CSR read replica of the knowledge graph for neighborhood lookups
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .bulk_writer import triple_to_row
+
+REPLICA_LOAD_QUERY = """
+MATCH (s:Entity)-[r:RELATES_TO]->(o:Entity)
+RETURN s.name AS subject, s.type AS subject_type, r.relationship AS relationship,
+       o.name AS object, o.type AS object_type, r.evidence AS evidence, r.doc_id AS doc_id
+"""
+
+_WORD = re.compile(r"\w+(?:[-']\w+)*")
+
+
+class _Interner:
+    """Bidirectional string <-> int table"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class GraphReplica:
+    """
+    Compressed, read-mostly copy of the Entity/RELATES_TO graph.
+
+    Entity names, relationship types and doc IDs are interned to integers.
+    Edges live in parallel numpy arrays sorted by source, with CSR offsets
+    for outgoing edges and a permutation index for incoming ones, so a
+    neighborhood lookup is two array slices. Evidence text is stored once
+    in a UTF-8 arena and referenced by (offset, length).
+
+    Writes after the initial load go to a small delta buffer that lookups
+    also consult; deletions set tombstones. Once the delta grows past
+    ``compact_threshold`` edges the CSR arrays are rebuilt.
+    """
+
+    def __init__(self, compact_threshold: int = 10000):
+        """
+        Initialize an empty replica
+
+        Args:
+            compact_threshold: Delta edges that trigger a CSR rebuild
+        """
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._reset()
+        self.ready = False
+        self.loaded_at: Optional[float] = None
+
+    def _reset(self):
+        self._entities = _Interner()
+        self._entity_types: List[str] = []
+        self._lower: Dict[str, List[int]] = {}
+        self._relationships = _Interner()
+        self._docs = _Interner()
+        self._arena = bytearray()
+        self._edge_keys: Set[Tuple[int, int, int, int]] = set()
+
+        # Base CSR edge arrays (sorted by source)
+        self._src = np.zeros(0, dtype=np.int32)
+        self._dst = np.zeros(0, dtype=np.int32)
+        self._rel = np.zeros(0, dtype=np.int32)
+        self._doc = np.zeros(0, dtype=np.int32)
+        self._ev_off = np.zeros(0, dtype=np.int64)
+        self._ev_len = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._out_ptr = np.zeros(1, dtype=np.int64)
+        self._in_ptr = np.zeros(1, dtype=np.int64)
+        self._in_idx = np.zeros(0, dtype=np.int64)
+
+        # Delta edges: (src, dst, rel, doc, ev_off, ev_len, alive) plus adjacency lists
+        self._delta: List[List[int]] = []
+        self._delta_out: Dict[int, List[int]] = {}
+        self._delta_in: Dict[int, List[int]] = {}
+
+    # Interning
+
+    def _entity(self, name: str, entity_type: Optional[str]) -> int:
+        before = len(self._entities)
+        code = self._entities.intern(name)
+        if code == before:
+            self._entity_types.append(entity_type or "Unknown")
+            self._lower.setdefault(name.lower(), []).append(code)
+        return code
+
+    def _evidence(self, text: Optional[str]) -> Tuple[int, int]:
+        data = (text or "").encode("utf-8")
+        offset = len(self._arena)
+        self._arena += data
+        return offset, len(data)
+
+    # Writes
+
+    def _add_row(self, row: Dict[str, Any]) -> bool:
+        subject, obj = row.get("subject"), row.get("object")
+        if not subject or not obj:
+            return False
+        src = self._entity(subject, row.get("subject_type"))
+        dst = self._entity(obj, row.get("object_type"))
+        rel = self._relationships.intern(row.get("relationship") or "RELATES_TO")
+        doc = self._docs.intern(row.get("doc_id") or "")
+
+        # Same identity as the MERGE in BulkGraphWriter
+        key = (src, rel, dst, doc)
+        if key in self._edge_keys:
+            return False
+        self._edge_keys.add(key)
+
+        offset, length = self._evidence(row.get("evidence"))
+        index = len(self._delta)
+        self._delta.append([src, dst, rel, doc, offset, length, 1])
+        self._delta_out.setdefault(src, []).append(index)
+        self._delta_in.setdefault(dst, []).append(index)
+        return True
+
+    def add_triples(self, triples: Iterable[Any]) -> int:
+        """
+        Add triples (any shape accepted by triple_to_row)
+
+        Returns:
+            Number of new edges
+        """
+        with self._lock:
+            added = sum(self._add_row(triple_to_row(t)) for t in triples)
+            if len(self._delta) >= self.compact_threshold:
+                self.compact()
+            return added
+
+    def load_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Replace the replica's contents with the given edge rows
+
+        Returns:
+            Number of edges loaded
+        """
+        replica = GraphReplica(self.compact_threshold)
+        for row in rows:
+            replica._add_row(row)
+        replica.compact()
+
+        with self._lock:
+            self.__dict__.update({k: v for k, v in replica.__dict__.items() if k != "_lock"})
+            self.ready = True
+            self.loaded_at = time.time()
+            return int(self._alive.sum())
+
+    def load_from_neo4j(self, pool) -> int:
+        """
+        Build the replica from Neo4j
+
+        Args:
+            pool: Neo4jSessionPool
+
+        Returns:
+            Number of edges loaded
+        """
+        with pool.session() as session:
+            rows = [dict(record) for record in session.run(REPLICA_LOAD_QUERY)]
+        return self.load_rows(rows)
+
+    def remove_documents(self, doc_ids: Sequence[str]) -> int:
+        """
+        Tombstone every edge that came from the given documents
+
+        Returns:
+            Number of edges removed
+        """
+        with self._lock:
+            codes = {self._docs.codes[d] for d in doc_ids if d in self._docs.codes}
+            if not codes:
+                return 0
+
+            mask = self._alive & np.isin(self._doc, list(codes))
+            removed = int(mask.sum())
+            for i in np.flatnonzero(mask):
+                self._edge_keys.discard((int(self._src[i]), int(self._rel[i]), int(self._dst[i]), int(self._doc[i])))
+            self._alive[mask] = False
+
+            for edge in self._delta:
+                if edge[6] and edge[3] in codes:
+                    edge[6] = 0
+                    removed += 1
+                    self._edge_keys.discard((edge[0], edge[2], edge[1], edge[3]))
+            return removed
+
+    def compact(self):
+        """Merge the delta into the CSR arrays and drop tombstones"""
+        with self._lock:
+            base = np.flatnonzero(self._alive)
+            delta = np.array([e for e in self._delta if e[6]], dtype=np.int64).reshape(-1, 7)
+
+            src = np.concatenate([self._src[base], delta[:, 0]]).astype(np.int32)
+            dst = np.concatenate([self._dst[base], delta[:, 1]]).astype(np.int32)
+            rel = np.concatenate([self._rel[base], delta[:, 2]]).astype(np.int32)
+            doc = np.concatenate([self._doc[base], delta[:, 3]]).astype(np.int32)
+            ev_off = np.concatenate([self._ev_off[base], delta[:, 4]]).astype(np.int64)
+            ev_len = np.concatenate([self._ev_len[base], delta[:, 5]]).astype(np.int32)
+
+            order = np.argsort(src, kind="stable")
+            src, dst, rel, doc = src[order], dst[order], rel[order], doc[order]
+            ev_off, ev_len = ev_off[order], ev_len[order]
+
+            # Rewrite the arena so tombstoned evidence is reclaimed
+            arena = bytearray()
+            new_off = np.empty_like(ev_off)
+            for i in range(len(ev_off)):
+                new_off[i] = len(arena)
+                arena += self._arena[ev_off[i]:ev_off[i] + ev_len[i]]
+
+            n = len(self._entities)
+            self._src, self._dst, self._rel, self._doc = src, dst, rel, doc
+            self._ev_off, self._ev_len = new_off, ev_len
+            self._alive = np.ones(len(src), dtype=bool)
+            self._arena = arena
+            self._out_ptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n))]).astype(np.int64)
+            self._in_idx = np.argsort(dst, kind="stable").astype(np.int64)
+            self._in_ptr = np.concatenate([[0], np.cumsum(np.bincount(dst, minlength=n))]).astype(np.int64)
+
+            self._delta = []
+            self._delta_out = {}
+            self._delta_in = {}
+
+    # Reads
+
+    def entity_ids(self, names: Iterable[str]) -> List[int]:
+        """Resolve names to entity IDs (exact match, then case-insensitive)"""
+        ids: List[int] = []
+        for name in names:
+            code = self._entities.codes.get(name)
+            if code is not None:
+                ids.append(code)
+            else:
+                ids.extend(self._lower.get(name.lower(), []))
+        return list(dict.fromkeys(ids))
+
+    def match_entities(self, text: str, max_words: int = 6, min_chars: int = 3) -> List[str]:
+        """
+        Find entity names mentioned in free text
+
+        Checks every word n-gram (up to max_words) against the
+        case-insensitive name table, preferring the longest match. Phrases
+        shorter than min_chars are ignored so stray letters do not match.
+        """
+        words = _WORD.findall(text.lower())
+        found: List[int] = []
+        i = 0
+        while i < len(words):
+            for size in range(min(max_words, len(words) - i), 0, -1):
+                phrase = " ".join(words[i:i + size])
+                ids = self._lower.get(phrase) if len(phrase) >= min_chars else None
+                if ids:
+                    found.extend(ids)
+                    i += size
+                    break
+            else:
+                i += 1
+        return [self._entities.values[code] for code in dict.fromkeys(found)]
+
+    def _edge_indices(self, node: int, direction: str) -> List[Tuple[bool, int]]:
+        """(is_delta, index) for the live edges touching a node"""
+        edges: List[Tuple[bool, int]] = []
+        n_base = len(self._out_ptr) - 1
+        if node < n_base:
+            if direction in ("out", "both"):
+                edges.extend((False, int(i)) for i in range(self._out_ptr[node], self._out_ptr[node + 1]))
+            if direction in ("in", "both"):
+                edges.extend((False, int(i)) for i in self._in_idx[self._in_ptr[node]:self._in_ptr[node + 1]])
+        if direction in ("out", "both"):
+            edges.extend((True, i) for i in self._delta_out.get(node, []))
+        if direction in ("in", "both"):
+            edges.extend((True, i) for i in self._delta_in.get(node, []))
+        return [
+            (is_delta, i) for is_delta, i in edges
+            if (self._delta[i][6] if is_delta else self._alive[i])
+        ]
+
+    def read_lock(self) -> threading.RLock:
+        """Lock to hold across several reads that must see one consistent graph"""
+        return self._lock
+
+    def entity_name(self, entity_id: int) -> str:
+        return self._entities.values[entity_id]
+
+    def entity_names(self) -> List[str]:
+        """Every interned entity name"""
+        with self._lock:
+            return list(self._entities.values)
+
+    def relationship_codes(self, relationships: Iterable[str]) -> Set[int]:
+        """Integer codes of the known relationship types among ``relationships``"""
+        return {self._relationships.codes[r] for r in relationships if r in self._relationships.codes}
+
+    def edges_of(self, node: int, direction: str = "both") -> List[Tuple[int, int, int, int, int, int]]:
+        """Live edges touching a node as (src, dst, rel, doc, evidence_offset, evidence_length)"""
+        with self._lock:
+            return [self._edge(is_delta, i) for is_delta, i in self._edge_indices(node, direction)]
+
+    def edge_to_dict(self, edge: Tuple[int, int, int, int, int, int]) -> Dict[str, Any]:
+        """Decode an edge tuple into a relationship dict"""
+        return self._to_dict(edge)
+
+    def _edge(self, is_delta: bool, i: int) -> Tuple[int, int, int, int, int, int]:
+        if is_delta:
+            return tuple(self._delta[i][:6])
+        return (int(self._src[i]), int(self._dst[i]), int(self._rel[i]), int(self._doc[i]),
+                int(self._ev_off[i]), int(self._ev_len[i]))
+
+    def _to_dict(self, edge: Tuple[int, int, int, int, int, int]) -> Dict[str, Any]:
+        src, dst, rel, doc, offset, length = edge
+        return {
+            "subject": self._entities.values[src],
+            "relationship": self._relationships.values[rel],
+            "object": self._entities.values[dst],
+            "evidence": self._arena[offset:offset + length].decode("utf-8", errors="replace"),
+            "doc_id": self._docs.values[doc],
+        }
+
+    def neighborhood(
+        self,
+        names: Iterable[str],
+        hops: int = 1,
+        direction: str = "both",
+        relationships: Optional[Iterable[str]] = None,
+        limit: int = 50,
+        max_fanout: int = 200,
+    ) -> List[Dict[str, Any]]:
+        """
+        Relationships within ``hops`` of the given entities
+
+        Args:
+            names: Seed entity names
+            hops: Neighborhood radius
+            direction: "out", "in" or "both"
+            relationships: Only follow these relationship types
+            limit: Maximum relationships returned
+            max_fanout: Maximum edges expanded per node (caps hub nodes)
+
+        Returns:
+            Relationship dicts (subject, relationship, object, evidence, doc_id)
+        """
+        with self._lock:
+            rel_codes = self.relationship_codes(relationships) if relationships is not None else None
+
+            frontier = self.entity_ids(names)
+            visited = set(frontier)
+            seen_edges = set()
+            results: List[Dict[str, Any]] = []
+
+            for _ in range(max(1, hops)):
+                next_frontier = []
+                for node in frontier:
+                    for is_delta, i in self._edge_indices(node, direction)[:max_fanout]:
+                        if (is_delta, i) in seen_edges:
+                            continue
+                        edge = self._edge(is_delta, i)
+                        if rel_codes is not None and edge[2] not in rel_codes:
+                            continue
+                        seen_edges.add((is_delta, i))
+                        results.append(self._to_dict(edge))
+                        if len(results) >= limit:
+                            return results
+                        other = edge[1] if edge[0] == node else edge[0]
+                        if other not in visited:
+                            visited.add(other)
+                            next_frontier.append(other)
+                frontier = next_frontier
+                if not frontier:
+                    break
+            return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Replica size and freshness"""
+        with self._lock:
+            base_edges = int(self._alive.sum())
+            delta_edges = sum(1 for e in self._delta if e[6])
+            arrays = (self._src, self._dst, self._rel, self._doc, self._ev_off, self._ev_len,
+                      self._alive, self._out_ptr, self._in_ptr, self._in_idx)
+            return {
+                "ready": self.ready,
+                "loaded_at": self.loaded_at,
+                "entities": len(self._entities),
+                "relationships": base_edges + delta_edges,
+                "delta_relationships": delta_edges,
+                "relationship_types": len(self._relationships),
+                "arena_mb": len(self._arena) / (1024 * 1024),
+                "arrays_mb": sum(a.nbytes for a in arrays) / (1024 * 1024),
+            }
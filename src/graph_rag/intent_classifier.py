@@ -0,0 +1,318 @@
+"""
+Query Intent Classifier
+Compiled keyword rules with an embedding fallback, and a routing decision log
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INTENTS = ("kg_primary", "vs_primary", "hybrid")
+
+# Routing keywords from the agent design (DesignDocFinal.json)
+KEYWORD_RULES: Dict[str, Tuple[str, ...]] = {
+    "kg_primary": ("relationship", "effect", "cause", "mechanism", "pathway"),
+    "vs_primary": ("describe", "explain", "overview", "summary", "what is"),
+}
+
+# Labelled queries the embedding classifier starts from
+SEED_EXAMPLES: Tuple[Tuple[str, str], ...] = (
+    ("How does microgravity lead to bone loss?", "kg_primary"),
+    ("Which genes are upregulated by spaceflight radiation?", "kg_primary"),
+    ("What countermeasures mitigate muscle atrophy in astronauts?", "kg_primary"),
+    ("Which proteins interact with CDKN1a/p21 in osteoblasts?", "kg_primary"),
+    ("What does cosmic radiation do to the central nervous system?", "kg_primary"),
+    ("Does hindlimb unloading inhibit osteoblast differentiation?", "kg_primary"),
+    ("Tell me about the Bion-M 1 mission", "vs_primary"),
+    ("Give me a summary of plant growth experiments on the ISS", "vs_primary"),
+    ("What methods were used to study mice in space?", "vs_primary"),
+    ("Which studies measured immune function during spaceflight?", "vs_primary"),
+    ("Background on rodent research hardware", "vs_primary"),
+    ("What did the twin study find?", "vs_primary"),
+    ("Compare the evidence on bone loss across rodent and human studies", "hybrid"),
+    ("What is known about radiation and cardiovascular risk, and which papers support it?", "hybrid"),
+    ("How do microgravity and radiation together affect the immune system, with sources?", "hybrid"),
+    ("What are the open questions about long-duration Mars missions?", "hybrid"),
+)
+
+
+def compile_rules(rules: Dict[str, Sequence[str]]) -> "re.Pattern":
+    """
+    Compile keyword rules into one regex matched in a single pass
+
+    Each intent becomes a named group; keywords match whole words plus a
+    plural or verb ending ("causes", "caused", "pathways") but not longer
+    words that merely start with them ("effect" does not match
+    "effective"), and multi-word keywords tolerate any whitespace.
+    """
+    groups = []
+    for i, keywords in enumerate(rules.values()):
+        alternatives = sorted((re.escape(k).replace(r"\ ", r"\s+") for k in keywords), key=len, reverse=True)
+        groups.append(f"(?P<g{i}>{'|'.join(alternatives)})")
+    return re.compile(r"\b(?:" + "|".join(groups) + r")(?:s|es|d|ed|ing)?\b", re.IGNORECASE)
+
+
+class QueryIntentClassifier:
+    """
+    Classifies a query as kg_primary, vs_primary or hybrid, with a confidence.
+
+    Keyword rules are compiled into one regex and applied in a single
+    pass; their confidence grows with the number of keyword hits and
+    drops when intents conflict. Below ``confidence_threshold``, a tiny
+    nearest-centroid classifier over the (cached) query embedding decides,
+    agreeing rules raising its confidence. Queries still below the
+    threshold fan out to both backends.
+
+    Every routing decision and its outcome (hits per backend, whether the
+    single-backend route had to fall back) is appended to a JSONL log, so
+    routing accuracy can be measured and the centroids refit from it.
+    Records are buffered in memory and written by a background thread, so
+    requests never wait on disk; the log rotates to one ``.1`` file once it
+    exceeds ``max_log_mb``.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+        log_path: Optional[str] = None,
+        rules: Optional[Dict[str, Sequence[str]]] = None,
+        confidence_threshold: float = 0.6,
+        temperature: float = 0.05,
+        min_similarity: float = 0.3,
+        max_log_mb: float = 16.0,
+        flush_interval: float = 5.0,
+    ):
+        """
+        Initialize classifier
+
+        Args:
+            embed_fn: Returns an embedding for a query (rules only if None)
+            log_path: JSONL file for routing decisions and outcomes (None = no log)
+            rules: {intent: keywords}, defaults to KEYWORD_RULES
+            confidence_threshold: Confidence needed to route to one backend
+            temperature: Softmax temperature over centroid similarities
+            min_similarity: Queries less similar than this to every
+                centroid get no embedding vote
+            max_log_mb: Log size after which it is rotated (one old file kept)
+            flush_interval: Seconds between background writes of buffered records
+        """
+        self.embed_fn = embed_fn
+        self.log_path = Path(log_path) if log_path else None
+        self.rules = dict(rules or KEYWORD_RULES)
+        self.confidence_threshold = confidence_threshold
+        self.temperature = temperature
+        self.min_similarity = min_similarity
+        self.max_log_bytes = int(max_log_mb * 1024 * 1024)
+        self.flush_interval = flush_interval
+
+        self._matcher = compile_rules(self.rules)
+        self._group_intents = {f"g{i}": intent for i, intent in enumerate(self.rules)}
+        self._centroids: Optional[np.ndarray] = None
+        self._centroid_intents: List[str] = []
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._pending: List[str] = []
+        self._write_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _rule_scores(self, query: str) -> Counter:
+        hits: Counter = Counter()
+        for match in self._matcher.finditer(query):
+            hits[self._group_intents[match.lastgroup]] += 1
+        return hits
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> int:
+        """
+        Fit the embedding classifier: one normalized centroid per intent
+
+        Returns:
+            Number of examples embedded
+        """
+        if self.embed_fn is None:
+            return 0
+        vectors: Dict[str, List[np.ndarray]] = {}
+        for query, intent in examples:
+            try:
+                vector = np.asarray(self.embed_fn(query), dtype=np.float32)
+            except Exception:
+                return 0
+            vectors.setdefault(intent, []).append(vector / max(float(np.linalg.norm(vector)), 1e-12))
+        if len(vectors) < 2:
+            return 0
+
+        intents = [intent for intent in INTENTS if intent in vectors]
+        centroids = np.stack([np.mean(vectors[intent], axis=0) for intent in intents])
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        with self._lock:
+            self._centroids, self._centroid_intents = centroids, intents
+        return sum(len(v) for v in vectors.values())
+
+    def _embedding_scores(self, query: str) -> Optional[Dict[str, float]]:
+        centroids, intents = self._centroids, self._centroid_intents
+        if centroids is None:
+            return None
+        try:
+            vector = np.asarray(self.embed_fn(query), dtype=np.float32)
+        except Exception:
+            return None
+        similarities = centroids @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+        if similarities.max() < self.min_similarity:
+            return None
+        weights = np.exp((similarities - similarities.max()) / self.temperature)
+        return dict(zip(intents, (weights / weights.sum()).tolist()))
+
+    def classify(self, query: str) -> Dict[str, Any]:
+        """
+        Classify a query and decide where to route it
+
+        Returns:
+            Dict with intent, confidence (0-1), method ("rules",
+            "embedding", "rules+embedding" or "default") and route ("kg",
+            "vs" or "both"; "both" whenever confidence is below the threshold)
+        """
+        hits = self._rule_scores(query)
+        ranked = hits.most_common(2) + [(None, 0), (None, 0)]
+        (top_intent, top), (_, second) = ranked[0], ranked[1]
+        if top > second:
+            # 1 hit -> 0.5, 2 -> 0.75, 3 -> 0.875; conflicting hits scale it down
+            intent, confidence, method = top_intent, (1 - 0.5 ** (top - second)) * top / (top + second), "rules"
+        else:
+            intent, confidence, method = "hybrid", 0.0, "default"
+
+        if confidence < self.confidence_threshold:
+            scores = self._embedding_scores(query)
+            if scores is not None:
+                learned = max(scores, key=scores.get)
+                if learned == intent:
+                    confidence = 1 - (1 - confidence) * (1 - scores[learned])
+                    method = "rules+embedding"
+                else:
+                    intent, confidence, method = learned, scores[learned] * (1 - confidence), "embedding"
+
+        if confidence >= self.confidence_threshold and intent != "hybrid":
+            route = "kg" if intent == "kg_primary" else "vs"
+        else:
+            route = "both"
+        return {"intent": intent, "confidence": round(confidence, 3), "method": method, "route": route}
+
+    def record(self, query: str, decision: Dict[str, Any], result: Optional[Dict[str, Any]], fallback: bool = False):
+        """Log one routing decision with its outcome (buffered; see flush)"""
+        result = result or {}
+        entry = {
+            "ts": round(time.time(), 3),
+            "query": query,
+            **decision,
+            "fallback": fallback,
+            "kg_hits": len(result.get("kg_results") or []),
+            "vs_hits": len(result.get("vs_results") or []),
+            "total_time_ms": (result.get("retrieval_stats") or {}).get("total_time_ms"),
+        }
+        with self._lock:
+            self._counts["decisions"] += 1
+            self._counts[f"route_{decision['route']}"] += 1
+            self._counts["fallbacks"] += fallback
+            if self.log_path is None:
+                return
+            self._pending.append(json.dumps(entry) + "\n")
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_periodically, name="routing-log", daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"⚠️ Routing log write failed: {e}")
+
+    @property
+    def _rotated_path(self) -> Path:
+        return self.log_path.with_name(self.log_path.name + ".1")
+
+    def flush(self):
+        """Write buffered records to the log, rotating it when it grows past max_log_mb"""
+        if self.log_path is None:
+            return
+        with self._lock:
+            lines, self._pending = self._pending, []
+        if not lines:
+            return
+        with self._write_lock:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            if self.log_path.stat().st_size > self.max_log_bytes:
+                os.replace(self.log_path, self._rotated_path)
+
+    def _log_entries(self) -> Iterator[Dict[str, Any]]:
+        if self.log_path is None:
+            return
+        self.flush()
+        for path in (self._rotated_path, self.log_path):
+            if not path.exists():
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def logged_examples(self) -> List[Tuple[str, str]]:
+        """
+        Labelled queries recovered from the log
+
+        Only outcomes observed independently of the classifier are used: a
+        fanned-out query, or a single-backend route that had to fall back,
+        is labelled with the one backend that found anything. Confident
+        routes that did not fall back are left out, since labelling them
+        with the classifier's own decision would reinforce its mistakes.
+        """
+        examples = []
+        for entry in self._log_entries():
+            if entry["route"] != "both" and not entry["fallback"]:
+                continue
+            if bool(entry["kg_hits"]) != bool(entry["vs_hits"]):
+                examples.append((entry["query"], "kg_primary" if entry["kg_hits"] else "vs_primary"))
+        return examples
+
+    def routing_report(self) -> Dict[str, Any]:
+        """
+        Routing accuracy measured from the log
+
+        Returns:
+            decisions, fanout_rate, single_backend routes, fallbacks and
+            accuracy (share of single-backend routes that needed no fallback)
+        """
+        counts: Counter = Counter()
+        for entry in self._log_entries():
+            counts["decisions"] += 1
+            if entry["route"] == "both":
+                counts["fanouts"] += 1
+            else:
+                counts["single_backend"] += 1
+                counts["fallbacks"] += bool(entry["fallback"])
+        single = counts["single_backend"]
+        return {
+            "decisions": counts["decisions"],
+            "fanout_rate": round(counts["fanouts"] / counts["decisions"], 3) if counts["decisions"] else None,
+            "single_backend": single,
+            "fallbacks": counts["fallbacks"],
+            "accuracy": round(1 - counts["fallbacks"] / single, 3) if single else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "fitted": self._centroids is not None,
+                "confidence_threshold": self.confidence_threshold,
+                **dict(self._counts),
+            }
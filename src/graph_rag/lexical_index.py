@@ -0,0 +1,199 @@
+"""
+Lexical Index
+On-disk BM25 inverted index over chunk text, and reciprocal rank fusion
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .entity_linker import STOPWORDS
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(text: str, max_terms: int = 32) -> Optional[str]:
+    """
+    Turn free text into an FTS5 OR-query of quoted terms
+
+    Each term is quoted so punctuation in scientific names ("CDKN1a/p21",
+    "Bion-M 1") cannot be parsed as query syntax; the tokenizer splits the
+    same way at index time, so every part still has to match.
+    """
+    terms = [t for t in _TERM.findall(text.lower()) if t not in STOPWORDS]
+    terms = list(dict.fromkeys(terms))[:max_terms]
+    if not terms:
+        return None
+    return " OR ".join(f'"{t}"' for t in terms)
+
+
+def result_key(result: Dict[str, Any]) -> Any:
+    """Identity of a retrieved chunk across backends"""
+    metadata = result.get("metadata") or {}
+    if metadata.get("doc_id") is not None and metadata.get("chunk_index") is not None:
+        return (metadata["doc_id"], metadata["chunk_index"])
+    return result.get("content", "")[:500]
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[List[Dict[str, Any]]], k: int = 60, limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with RRF: score = sum(1 / (k + rank))
+
+    Args:
+        result_lists: Ranked lists of vs_results-shaped dicts
+        k: RRF constant; larger values flatten the rank weighting
+        limit: Results returned
+
+    Returns:
+        Fused results, each with an rrf_score
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, 1):
+            key = result_key(result)
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = {**result, "rrf_score": 0.0}
+            entry["rrf_score"] += 1.0 / (k + rank)
+    ranked = sorted(fused.values(), key=lambda r: -r["rrf_score"])
+    for result in ranked:
+        result["rrf_score"] = round(result["rrf_score"], 6)
+    return ranked[:limit]
+
+
+class LexicalIndex:
+    """
+    BM25 index over chunk text, stored in SQLite FTS5 next to ChromaDB.
+
+    Chunks are keyed by the same deterministic chunk IDs as the vector
+    store, so re-ingesting a document replaces its rows, and a side table
+    maps doc_id to rows so deleting a document touches only its own
+    chunks. Text is tokenized with Porter stemming and diacritics removed;
+    titles are indexed as a separate, higher-weighted column.
+    """
+
+    def __init__(self, path: str, title_weight: float = 2.0, time_budget_ms: float = 250.0):
+        """
+        Initialize index
+
+        Args:
+            path: SQLite database file
+            title_weight: BM25 weight of the title column relative to content
+            time_budget_ms: Searches running longer than this are abandoned
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.title_weight = title_weight
+        self.time_budget_ms = time_budget_ms
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                title, content, metadata UNINDEXED,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            );
+            CREATE TABLE IF NOT EXISTS chunk_rows (
+                chunk_id TEXT PRIMARY KEY,
+                doc_id TEXT NOT NULL,
+                row INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunk_rows_doc_id ON chunk_rows (doc_id);
+            """
+        )
+        self._db.commit()
+
+    def _delete_rows(self, rows: List[int]):
+        self._db.executemany("DELETE FROM chunks WHERE rowid = ?", [(row,) for row in rows])
+
+    def upsert(self, chunk_ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> int:
+        """
+        Add or replace chunks
+
+        Returns:
+            Number of chunks written
+        """
+        with self._lock:
+            existing = []
+            for offset in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[offset:offset + 500]
+                existing += [row for (row,) in self._db.execute(
+                    f"SELECT row FROM chunk_rows WHERE chunk_id IN ({', '.join('?' * len(batch))})", batch
+                )]
+            self._delete_rows(existing)
+
+            for chunk_id_, text, metadata in zip(chunk_ids, texts, metadatas):
+                cursor = self._db.execute(
+                    "INSERT INTO chunks (title, content, metadata) VALUES (?, ?, ?)",
+                    (metadata.get("source_title") or "", text, json.dumps(metadata, default=str)),
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO chunk_rows (chunk_id, doc_id, row) VALUES (?, ?, ?)",
+                    (chunk_id_, metadata.get("doc_id") or "", cursor.lastrowid),
+                )
+            self._db.commit()
+        return len(chunk_ids)
+
+    def delete_documents(self, doc_ids: List[str]) -> int:
+        """
+        Remove every chunk of the given documents
+
+        Returns:
+            Number of chunks removed
+        """
+        removed = 0
+        with self._lock:
+            for doc_id in doc_ids:
+                rows = [row for (row,) in self._db.execute("SELECT row FROM chunk_rows WHERE doc_id = ?", (doc_id,))]
+                self._delete_rows(rows)
+                self._db.execute("DELETE FROM chunk_rows WHERE doc_id = ?", (doc_id,))
+                removed += len(rows)
+            self._db.commit()
+        return removed
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        BM25 search
+
+        Returns:
+            Up to k results in vs_results shape (content, metadata) plus
+            bm25_score (higher is better); empty if the time budget ran out
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        with self._lock:
+            # Queries made only of very common terms score every chunk; cut them off
+            self._db.set_progress_handler(lambda: time.perf_counter() > deadline, 10000)
+            try:
+                rows = self._db.execute(
+                    "SELECT content, metadata, bm25(chunks, ?, 1.0) AS score FROM chunks "
+                    "WHERE chunks MATCH ? ORDER BY score LIMIT ?",
+                    (self.title_weight, match, k),
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                if "interrupted" not in str(e):
+                    raise
+                rows = []
+            finally:
+                self._db.set_progress_handler(None, 0)
+        return [
+            {"content": content, "metadata": json.loads(metadata), "bm25_score": round(-score, 4)}
+            for content, metadata, score in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunk_rows").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
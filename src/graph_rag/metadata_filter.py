@@ -0,0 +1,100 @@
+"""
+Metadata Filter
+Chunk metadata filter expressions and the index entries that serve them
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Fields indexed for pre-filtering; multi-valued fields hold "; "-joined lists
+INDEXED_FIELDS = ("doc_id", "source_title", "year", "authors", "keywords")
+MULTI_VALUED_FIELDS = frozenset({"authors", "keywords"})
+
+RANGE_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def field_values(field: str, value: Any) -> List[str]:
+    """Normalized index values of one metadata field"""
+    if value is None:
+        return []
+    parts = value if isinstance(value, (list, tuple)) else [value]
+    if field in MULTI_VALUED_FIELDS:
+        parts = [p for part in parts for p in str(part).split(";")]
+    return [str(p).strip().lower() for p in parts if str(p).strip()]
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def index_entries(metadata: Dict[str, Any]) -> Iterator[Tuple[str, str, Optional[float]]]:
+    """(field, value, numeric value) entries for a chunk's indexed fields"""
+    for field in INDEXED_FIELDS:
+        for value in field_values(field, metadata.get(field)):
+            yield field, value, _number(value)
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Validate a filter expression and normalize it per field
+
+    Filters use ChromaDB-style operators and are ANDed across fields:
+    ``{"doc_id": "PMC_PMC3630201"}``, ``{"keywords": {"$in": ["microgravity",
+    "spaceflight"]}}``, ``{"year": {"$gte": 2015, "$lte": 2020}}``. A bare
+    list means $in; on multi-valued fields a value matches any element.
+
+    Returns:
+        {field: {"$in": [values]}} or {field: {range operator: number}}
+
+    Raises:
+        ValueError: Unknown field or operator, or a non-numeric range bound
+    """
+    normalized: Dict[str, Dict[str, Any]] = {}
+    for field, condition in (filters or {}).items():
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Cannot filter on '{field}'; indexed fields are {', '.join(INDEXED_FIELDS)}")
+        if not isinstance(condition, dict):
+            condition = {"$in": condition} if isinstance(condition, (list, tuple)) else {"$eq": condition}
+
+        clause: Dict[str, Any] = {}
+        for operator, operand in condition.items():
+            if operator in ("$eq", "$in"):
+                values = operand if isinstance(operand, (list, tuple)) else [operand]
+                clause.setdefault("$in", []).extend(v for value in values for v in field_values(field, value))
+            elif operator in RANGE_OPERATORS:
+                bound = _number(operand)
+                if bound is None:
+                    raise ValueError(f"Range bound for '{field}' must be a number, got {operand!r}")
+                clause[operator] = bound
+            else:
+                raise ValueError(f"Unsupported filter operator '{operator}'")
+        if clause:
+            normalized[field] = clause
+    return normalized
+
+
+def metadata_matches(metadata: Dict[str, Any], filters: Dict[str, Dict[str, Any]]) -> bool:
+    """Whether chunk metadata satisfies normalized filters (for post-filtering)"""
+    for field, clause in filters.items():
+        values = field_values(field, metadata.get(field))
+        if "$in" in clause and not set(values) & set(clause["$in"]):
+            return False
+        numbers = [n for n in (_number(v) for v in values) if n is not None]
+        for operator, bound in clause.items():
+            if operator == "$in":
+                continue
+            if not any(_compare(n, operator, bound) for n in numbers):
+                return False
+    return True
+
+
+def _compare(value: float, operator: str, bound: float) -> bool:
+    if operator == "$gt":
+        return value > bound
+    if operator == "$gte":
+        return value >= bound
+    if operator == "$lt":
+        return value < bound
+    return value <= bound
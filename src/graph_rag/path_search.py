@@ -0,0 +1,224 @@
+"""
+Path Search
+Bounded multi-hop path search between query entities over the graph replica
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# (neighbor, src, dst, rel): all edges between two entities with one relationship type
+GroupKey = Tuple[int, int, int, int]
+Step = Tuple[int, int, GroupKey]
+
+
+class _Frontier:
+    """BFS state for one side of the bidirectional search"""
+
+    def __init__(self, seeds: List[int], direction: str):
+        self.direction = direction
+        self.depth: Dict[int, int] = {node: 0 for node in seeds}
+        self.parents: Dict[int, List[Tuple[int, GroupKey]]] = {}
+        self.layer: List[int] = list(seeds)
+        self.level = 0
+
+
+class PathSearcher:
+    """
+    Finds explainable paths between entities for mechanism questions.
+
+    Runs a bidirectional BFS from the source and target entities, keeping
+    up to ``max_parents`` predecessors per node so several equally short
+    paths survive, and stops once ``k`` meeting points are found, the
+    combined depth reaches ``max_hops`` or the time budget runs out. Each
+    node expands at most ``max_fanout`` neighbor groups, strongest
+    evidence first, so hub entities cannot blow up the search.
+
+    Parallel edges between two entities with the same relationship type
+    (one per source document) are folded into a single step whose
+    evidence count ranks the paths.
+    """
+
+    def __init__(
+        self,
+        replica,
+        max_hops: int = 4,
+        max_fanout: int = 50,
+        max_parents: int = 8,
+        time_budget_ms: float = 100.0,
+    ):
+        """
+        Initialize path searcher
+
+        Args:
+            replica: GraphReplica to search
+            max_hops: Longest path returned
+            max_fanout: Neighbor groups expanded per node
+            max_parents: Predecessors kept per node
+            time_budget_ms: Wall-clock limit for one search
+        """
+        self.replica = replica
+        self.max_hops = max_hops
+        self.max_fanout = max_fanout
+        self.max_parents = max_parents
+        self.time_budget_ms = time_budget_ms
+
+    def _neighbor_groups(
+        self, node: int, direction: str, rel_codes: Optional[Set[int]]
+    ) -> Tuple[List[Tuple[GroupKey, List[tuple]]], bool]:
+        groups: Dict[GroupKey, List[tuple]] = {}
+        for edge in self.replica.edges_of(node, direction):
+            if rel_codes is not None and edge[2] not in rel_codes:
+                continue
+            other = edge[1] if edge[0] == node else edge[0]
+            if other == node:
+                continue
+            groups.setdefault((other, edge[0], edge[1], edge[2]), []).append(edge)
+        ranked = sorted(groups.items(), key=lambda item: -len(item[1]))
+        return ranked[:self.max_fanout], len(ranked) > self.max_fanout
+
+    def _chains(self, side: _Frontier, node: int, limit: int) -> List[List[Step]]:
+        """Step lists from a seed of ``side`` to ``node``"""
+        if side.depth.get(node) == 0:
+            return [[]]
+        chains: List[List[Step]] = []
+        for prev, key in side.parents.get(node, []):
+            for chain in self._chains(side, prev, limit):
+                chains.append(chain + [(prev, node, key)])
+                if len(chains) >= limit:
+                    return chains
+        return chains
+
+    def find_paths(
+        self,
+        sources: Iterable[str],
+        targets: Iterable[str],
+        k: int = 5,
+        relationships: Optional[Iterable[str]] = None,
+        directed: bool = False,
+        max_hops: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Find up to k paths from any source entity to any target entity
+
+        Args:
+            sources: Source entity names
+            targets: Target entity names
+            k: Paths to return
+            relationships: Only traverse these relationship types
+            directed: Follow edges subject -> object only
+            max_hops: Override the default hop limit
+
+        Returns:
+            Dict with paths (entities, hops, steps with evidence,
+            evidence_count, min_evidence, explanation) and search stats
+        """
+        start = time.perf_counter()
+        deadline = start + self.time_budget_ms / 1000
+        max_hops = max_hops or self.max_hops
+        stats = {"nodes_expanded": 0, "meetings": 0, "fanout_capped": False, "timed_out": False}
+
+        with self.replica.read_lock():
+            source_ids = self.replica.entity_ids(sources)
+            target_ids = [t for t in self.replica.entity_ids(targets) if t not in set(source_ids)]
+            rel_codes = self.replica.relationship_codes(relationships) if relationships is not None else None
+            if not source_ids or not target_ids:
+                stats["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                return {"paths": [], "stats": stats}
+
+            forward = _Frontier(source_ids, "out" if directed else "both")
+            backward = _Frontier(target_ids, "in" if directed else "both")
+            meetings: Dict[int, None] = {}
+
+            while forward.level + backward.level < max_hops and len(meetings) < k:
+                if not forward.layer and not backward.layer:
+                    break
+                # Expand the cheaper side
+                if backward.layer and (not forward.layer or len(backward.layer) < len(forward.layer)):
+                    side, other = backward, forward
+                else:
+                    side, other = forward, backward
+
+                next_layer: List[int] = []
+                for node in side.layer:
+                    if time.perf_counter() > deadline:
+                        stats["timed_out"] = True
+                        break
+                    stats["nodes_expanded"] += 1
+                    groups, capped = self._neighbor_groups(node, side.direction, rel_codes)
+                    stats["fanout_capped"] |= capped
+                    for key, _ in groups:
+                        neighbor = key[0]
+                        depth = side.depth.get(neighbor)
+                        if depth is None:
+                            side.depth[neighbor] = side.level + 1
+                            side.parents[neighbor] = [(node, key)]
+                            next_layer.append(neighbor)
+                        elif depth == side.level + 1 and len(side.parents[neighbor]) < self.max_parents:
+                            side.parents[neighbor].append((node, key))
+                        if neighbor in other.depth:
+                            meetings[neighbor] = None
+                side.layer = next_layer
+                side.level += 1
+                if stats["timed_out"]:
+                    break
+
+            stats["meetings"] = len(meetings)
+            paths = self._assemble(forward, backward, meetings, k, max_hops)
+
+        stats["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return {"paths": paths, "stats": stats}
+
+    def _assemble(
+        self, forward: _Frontier, backward: _Frontier, meetings: Dict[int, None], k: int, max_hops: int
+    ) -> List[Dict[str, Any]]:
+        candidates: Dict[tuple, List[Step]] = {}
+        limit = max(k * 4, 16)
+        for meeting in meetings:
+            for head in self._chains(forward, meeting, limit):
+                for tail in self._chains(backward, meeting, limit):
+                    steps = head + [(to, frm, key) for frm, to, key in reversed(tail)]
+                    if not steps or len(steps) > max_hops:
+                        continue
+                    nodes = [steps[0][0]] + [to for _, to, _ in steps]
+                    if len(set(nodes)) != len(nodes):
+                        continue
+                    candidates.setdefault(tuple(key[1:] for _, _, key in steps), steps)
+                    if len(candidates) >= limit:
+                        break
+
+        paths = [self._describe(steps) for steps in candidates.values()]
+        paths.sort(key=lambda p: (-p["min_evidence"], p["hops"], -p["evidence_count"]))
+        return paths[:k]
+
+    def _describe(self, steps: List[Step]) -> Dict[str, Any]:
+        replica = self.replica
+        described = []
+        explanation = replica.entity_name(steps[0][0])
+        for frm, to, key in steps:
+            _, src, dst, _ = key
+            edges = [
+                replica.edge_to_dict(edge)
+                for edge in replica.edges_of(frm, "out" if src == frm else "in")
+                if (edge[0], edge[1], edge[2]) == (src, dst, key[3])
+            ]
+            relationship = edges[0]["relationship"] if edges else ""
+            described.append({
+                "subject": replica.entity_name(src),
+                "relationship": relationship,
+                "object": replica.entity_name(dst),
+                "evidence_count": len(edges),
+                "evidence": [e["evidence"] for e in edges if e["evidence"]][:3],
+                "doc_ids": sorted({e["doc_id"] for e in edges if e["doc_id"]}),
+            })
+            arrow = f" --{relationship}--> " if src == frm else f" <--{relationship}-- "
+            explanation += arrow + replica.entity_name(to)
+
+        counts = [step["evidence_count"] for step in described]
+        return {
+            "entities": [replica.entity_name(steps[0][0])] + [replica.entity_name(to) for _, to, _ in steps],
+            "hops": len(steps),
+            "steps": described,
+            "evidence_count": sum(counts),
+            "min_evidence": min(counts),
+            "explanation": explanation,
+        }
@@ -0,0 +1,160 @@
+"""
+Cross-Encoder Re-ranker
+Re-scores first-stage retrieval candidates with a cross-encoder under a time budget
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Stats returned by rerank(); callers prefix them with the backend ("vs_", "kg_")
+RERANK_STATS = ("rerank_ms", "rerank_status", "rerank_candidates", "rerank_cache_hits")
+
+
+def document_text(result: Dict[str, Any]) -> str:
+    """Text of a vs_results entry, title first"""
+    title = (result.get("metadata") or {}).get("source_title") or ""
+    return f"{title}\n{result.get('content', '')}" if title else result.get("content", "")
+
+
+def relationship_text(result: Dict[str, Any]) -> str:
+    """Text of a kg_results entry: the triple followed by its evidence"""
+    triple = f"{result.get('subject', '')} {result.get('relationship', '')} {result.get('object', '')}"
+    evidence = result.get("evidence") or ""
+    return f"{triple}. {evidence}" if evidence else triple
+
+
+class CrossEncoderReranker:
+    """
+    Re-orders the head of a ranked list by cross-encoder relevance.
+
+    All uncached (query, text) pairs of one call are scored in a single
+    predict() call on a dedicated worker thread, so the forward passes
+    never compete with each other for the CPU. Scores are kept in an LRU
+    cache, so repeated and overlapping queries skip the model entirely.
+
+    If scoring does not finish within the time budget, the first-stage
+    order is returned unchanged; the late scores still land in the cache.
+    """
+
+    def __init__(
+        self,
+        model_loader: Callable[[], Any],
+        candidates: int = 50,
+        batch_size: int = 64,
+        time_budget_ms: float = 300.0,
+        max_chars: int = 2000,
+        cache_size: int = 20000,
+    ):
+        """
+        Initialize re-ranker
+
+        Args:
+            model_loader: Returns the (shared) CrossEncoder, or None if unavailable
+            candidates: Leading results re-scored per call
+            batch_size: Pairs per forward pass
+            time_budget_ms: Wall-clock limit for scoring one list
+            max_chars: Candidate text is truncated to this many characters
+            cache_size: Cached (query, text) scores
+        """
+        self.model_loader = model_loader
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.time_budget_ms = time_budget_ms
+        self.max_chars = max_chars
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bodhirag-rerank")
+
+    @staticmethod
+    def _key(query: str, text: str) -> bytes:
+        return hashlib.sha1(f"{query}\x00{text}".encode("utf-8")).digest()
+
+    def _score(self, query: str, texts: List[str], keys: List[bytes]) -> List[float]:
+        model = self.model_loader()
+        if model is None:
+            raise RuntimeError("Cross-encoder not available")
+        scores = model.predict([(query, text) for text in texts], batch_size=self.batch_size)
+        scores = [float(score) for score in scores]
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scores
+
+    def rerank(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        text_fn: Callable[[Dict[str, Any]], str] = document_text,
+        pinned: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Re-rank the leading candidates of a result list
+
+        Args:
+            query: User question
+            results: First-stage results, best first
+            text_fn: Text scored for one result
+            pinned: Leading results kept in place (e.g. KG path steps)
+
+        Returns:
+            (results, stats). Re-scored results carry rerank_score; on
+            timeout or error the input order is returned. Stats hold
+            rerank_ms, rerank_status ("ok", "cached", "timeout", "error",
+            "skipped"), rerank_candidates and rerank_cache_hits.
+        """
+        start = time.perf_counter()
+        head = results[pinned:pinned + self.candidates]
+        stats: Dict[str, Any] = {"rerank_candidates": len(head), "rerank_cache_hits": 0}
+        if len(head) < 2:
+            return results, {**stats, "rerank_ms": 0.0, "rerank_status": "skipped"}
+
+        texts = [text_fn(result)[:self.max_chars] for result in head]
+        keys = [self._key(query, text) for text in texts]
+        with self._lock:
+            scores: List[Optional[float]] = [self._cache.get(key) for key in keys]
+            for key, score in zip(keys, scores):
+                if score is not None:
+                    self._cache.move_to_end(key)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        stats["rerank_cache_hits"] = len(head) - len(missing)
+
+        status = "cached"
+        if missing:
+            future = self._executor.submit(self._score, query, [texts[i] for i in missing], [keys[i] for i in missing])
+            remaining = self.time_budget_ms / 1000 - (time.perf_counter() - start)
+            try:
+                for i, score in zip(missing, future.result(timeout=max(0.0, remaining))):
+                    scores[i] = score
+                status = "ok"
+            except FutureTimeout:
+                # Not started yet: drop it; running: let it finish and fill the cache
+                future.cancel()
+                status = "timeout"
+            except Exception:
+                status = "error"
+
+        stats["rerank_status"] = status
+        stats["rerank_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if status not in ("ok", "cached"):
+            return results, stats
+
+        order = sorted(range(len(head)), key=lambda i: -scores[i])
+        reranked = [{**head[i], "rerank_score": round(scores[i], 4)} for i in order]
+        return results[:pinned] + reranked + results[pinned + len(head):], stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"cached_scores": len(self._cache)}
+
+    def shutdown(self):
+        """Stop the scoring thread"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,237 @@
+"""
+Semantic Answer Cache
+Caches hybrid RAG answers by normalized query text and query embedding
+"""
+
+import copy
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+# Backends whose status a result reports in retrieval_stats when they were queried
+BACKEND_STATUSES = ("kg_status", "vs_status", "lexical_status")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", query.lower())).strip()
+
+
+def answer_complete(result: Dict[str, Any]) -> bool:
+    """
+    Whether every backend queried for a result answered
+
+    A result built around a timed-out or failed backend must not be cached,
+    or it would be served for similar queries for the whole TTL.
+    """
+    stats = result.get("retrieval_stats") or {}
+    return all(stats[key] == "ok" for key in BACKEND_STATUSES if key in stats)
+
+
+class SemanticAnswerCache:
+    """
+    LRU/TTL cache in front of route_query.
+
+    A lookup first tries the exact normalized query, then falls back to the
+    most similar cached query embedding above a threshold. Entries carry
+    the store generation they were computed against; bumping the generation
+    (after the pipeline writes new data) invalidates everything.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 1000,
+        max_mb: float = 32.0,
+        ttl_seconds: float = 3600.0,
+    ):
+        """
+        Initialize cache
+
+        Args:
+            embed_fn: Returns an embedding for a query (exact matching only if None)
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            max_entries: Maximum number of cached answers
+            max_mb: Approximate memory bound for cached answers
+            ttl_seconds: Entry lifetime
+        """
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+
+        self.generation = 0
+        self._entries: "OrderedDict[Tuple[str, bool, bool], Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits_exact = 0
+        self._hits_semantic = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        try:
+            vector = np.asarray(self.embed_fn(query), dtype=np.float32)
+        except Exception:
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return entry["generation"] != self.generation or now - entry["created"] > self.ttl_seconds
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+
+    def lookup(
+        self, query: str, use_kg: bool, use_vector: bool
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Look up a cached answer
+
+        Returns:
+            (cached result or None, query embedding to reuse on store)
+        """
+        key = (normalize_query(query), use_kg, use_vector)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry, now):
+                    self._drop(key)
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits_exact += 1
+                    return self._hit(entry, "exact"), entry["embedding"]
+
+        embedding = self._embed(query)
+        if embedding is None:
+            with self._lock:
+                self._misses += 1
+            return None, None
+
+        with self._lock:
+            candidates: List[Tuple[Tuple[str, bool, bool], np.ndarray]] = [
+                (k, e["embedding"]) for k, e in self._entries.items()
+                if k[1] == use_kg and k[2] == use_vector
+                and e["embedding"] is not None and not self._expired(e, now)
+            ]
+            if candidates:
+                scores = np.stack([vector for _, vector in candidates]) @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    best_key = candidates[best][0]
+                    self._entries.move_to_end(best_key)
+                    self._hits_semantic += 1
+                    return self._hit(self._entries[best_key], "semantic"), embedding
+
+            self._misses += 1
+            return None, embedding
+
+    @staticmethod
+    def _hit(entry: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        result = copy.deepcopy(entry["result"])
+        result.setdefault("retrieval_stats", {})["cache"] = kind
+        return result
+
+    def store(
+        self,
+        query: str,
+        use_kg: bool,
+        use_vector: bool,
+        result: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None,
+        generation: Optional[int] = None,
+    ):
+        """
+        Cache an answer
+
+        Args:
+            generation: Store generation the result was computed against;
+                results from an older generation are not cached
+        """
+        key = (normalize_query(query), use_kg, use_vector)
+        size = len(json.dumps(result, default=str)) + (embedding.nbytes if embedding is not None else 0)
+        if size > self.max_bytes:
+            return
+        entry_result = copy.deepcopy(result)
+
+        with self._lock:
+            # Checked under the lock, so a concurrent bump_generation cannot slip in before the insert
+            if generation is None:
+                generation = self.generation
+            elif generation != self.generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = {
+                "result": entry_result,
+                "embedding": embedding,
+                "generation": generation,
+                "created": time.monotonic(),
+                "size": size,
+            }
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def get_or_compute(
+        self,
+        query: str,
+        use_kg: bool,
+        use_vector: bool,
+        compute_fn: Callable[[], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Return a cached answer or compute and return a fresh one, caching it if every backend answered"""
+        cached, embedding = self.lookup(query, use_kg, use_vector)
+        if cached is not None:
+            return cached
+
+        generation = self.generation
+        result = compute_fn()
+        if answer_complete(result):
+            self.store(query, use_kg, use_vector, result, embedding, generation)
+        result.setdefault("retrieval_stats", {})["cache"] = "miss"
+        return result
+
+    def bump_generation(self) -> int:
+        """Invalidate every entry (call after the stores receive new data)"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+            return self.generation
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss statistics"""
+        with self._lock:
+            lookups = self._hits_exact + self._hits_semantic + self._misses
+            hits = self._hits_exact + self._hits_semantic
+            return {
+                "entries": len(self._entries),
+                "size_mb": self._bytes / (1024 * 1024),
+                "generation": self.generation,
+                "hits_exact": self._hits_exact,
+                "hits_semantic": self._hits_semantic,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "miss_rate": self._misses / lookups if lookups else 0.0,
+            }
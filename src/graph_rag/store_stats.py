@@ -0,0 +1,167 @@
+"""
+Store Statistics
+Incrementally maintained knowledge graph and vector store counters
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping
+
+# Full recount over the schema written by BulkGraphWriter
+ENTITY_TYPE_COUNT_QUERY = "MATCH (e:Entity) RETURN coalesce(e.type, 'Unknown') AS type, count(*) AS count"
+RELATIONSHIP_TYPE_COUNT_QUERY = (
+    "MATCH ()-[r:RELATES_TO]->() RETURN coalesce(r.relationship, 'Unknown') AS type, count(*) AS count"
+)
+
+
+def _as_type_counts(items: Any) -> Dict[str, int]:
+    """Normalize [{'type': ..., 'count': ...}] (export_graph_stats shape) to a dict"""
+    if isinstance(items, Mapping):
+        return {str(k): int(v) for k, v in items.items()}
+    counts: Dict[str, int] = {}
+    for item in items or []:
+        if isinstance(item, dict):
+            key = str(item.get("type") or "Unknown")
+            counts[key] = counts.get(key, 0) + int(item.get("count", 0))
+    return counts
+
+
+def _as_type_list(counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    return [{"type": k, "count": v} for k, v in sorted(counts.items(), key=lambda kv: -kv[1]) if v > 0]
+
+
+class StoreStatistics:
+    """
+    Materialized statistics for the Statistics tab and /health.
+
+    Write paths add and subtract deltas as they commit (entities and
+    relationships by type, chunk count, total content length), so reading
+    the figures is a dict copy instead of an aggregation over the stores.
+    A periodic full recount replaces the counters to correct any drift.
+    Counters are persisted as JSON next to the stores.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize statistics
+
+        Args:
+            path: JSON file backing the counters
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {
+            "entity_types": {},
+            "relationship_types": {},
+            "total_documents": 0,
+            "total_content_length": 0,
+            "metadata_fields": [],
+            "updated_at": None,
+            "recomputed_at": None,
+        }
+        if self.path.exists():
+            try:
+                self._data.update(json.loads(self.path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                pass
+
+    def _save(self):
+        self._data["updated_at"] = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._data), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _apply(counts: Dict[str, int], deltas: Mapping[str, int], sign: int):
+        for key, value in deltas.items():
+            counts[key] = max(0, counts.get(key, 0) + sign * int(value))
+            if counts[key] == 0:
+                del counts[key]
+
+    # Write paths
+
+    def record_graph_write(self, entity_types: Mapping[str, int], relationship_types: Mapping[str, int]):
+        """Add newly created entities and relationships, by type"""
+        with self._lock:
+            self._apply(self._data["entity_types"], entity_types, 1)
+            self._apply(self._data["relationship_types"], relationship_types, 1)
+            self._save()
+
+    def record_graph_delete(self, entity_types: Mapping[str, int], relationship_types: Mapping[str, int]):
+        """Subtract deleted entities and relationships, by type"""
+        with self._lock:
+            self._apply(self._data["entity_types"], entity_types, -1)
+            self._apply(self._data["relationship_types"], relationship_types, -1)
+            self._save()
+
+    def record_vectors_added(self, count: int, content_length: int, metadata_fields: Iterable[str] = ()):
+        """Add stored chunks and their total content length"""
+        with self._lock:
+            self._data["total_documents"] += count
+            self._data["total_content_length"] += content_length
+            self._data["metadata_fields"] = sorted(set(self._data["metadata_fields"]) | set(metadata_fields))
+            self._save()
+
+    def record_vectors_deleted(self, count: int, content_length: int):
+        """Subtract deleted chunks"""
+        with self._lock:
+            self._data["total_documents"] = max(0, self._data["total_documents"] - count)
+            self._data["total_content_length"] = max(0, self._data["total_content_length"] - content_length)
+            self._save()
+
+    # Full recount
+
+    def replace_graph(self, entity_types: Any, relationship_types: Any):
+        """Overwrite graph counters with a full recount"""
+        with self._lock:
+            self._data["entity_types"] = _as_type_counts(entity_types)
+            self._data["relationship_types"] = _as_type_counts(relationship_types)
+            self._data["recomputed_at"] = time.time()
+            self._save()
+
+    def replace_vectors(self, total_documents: int, average_content_length: float, metadata_fields: Iterable[str] = ()):
+        """Overwrite vector store counters with a full recount"""
+        with self._lock:
+            self._data["total_documents"] = int(total_documents)
+            self._data["total_content_length"] = int(round(average_content_length * total_documents))
+            self._data["metadata_fields"] = sorted(metadata_fields)
+            self._data["recomputed_at"] = time.time()
+            self._save()
+
+    # Read path
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current figures, in O(1)
+
+        Returns:
+            Dict with total_entities, total_relationships, entity_types and
+            relationship_types (export_graph_stats shape), total_documents,
+            average_content_length, metadata_fields, updated_at,
+            recomputed_at and their ages in seconds
+        """
+        with self._lock:
+            data = {
+                **self._data,
+                "entity_types": dict(self._data["entity_types"]),
+                "relationship_types": dict(self._data["relationship_types"]),
+            }
+        now = time.time()
+        total_documents = data["total_documents"]
+        return {
+            "total_entities": sum(data["entity_types"].values()),
+            "total_relationships": sum(data["relationship_types"].values()),
+            "entity_types": _as_type_list(data["entity_types"]),
+            "relationship_types": _as_type_list(data["relationship_types"]),
+            "total_documents": total_documents,
+            "average_content_length": data["total_content_length"] / total_documents if total_documents else 0.0,
+            "metadata_fields": list(data["metadata_fields"]),
+            "updated_at": data["updated_at"],
+            "recomputed_at": data["recomputed_at"],
+            "age_seconds": now - data["updated_at"] if data["updated_at"] else None,
+            "recomputed_age_seconds": now - data["recomputed_at"] if data["recomputed_at"] else None,
+        }
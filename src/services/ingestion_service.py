@@ -0,0 +1,342 @@
+"""
+Ingestion Service
+Shared document ingestion pipeline and background job queue
+"""
+
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.services.rag_service import (
+    DATA_DIR,
+    EMBEDDING_MODEL,
+    delete_documents,
+    ensure_kg_connected,
+    populate_graph,
+    populate_vector_store,
+)
+from src.services.job_runner import JobRunner
+from src.data_ingestion import extract_knowledge_from_chunk
+from src.data_ingestion.checkpoint_journal import PipelineJournal, job_fingerprint
+from src.data_ingestion.concurrent_loader import (
+    chunker_config,
+    doc_id_from_url,
+    iter_publication_documents,
+)
+from src.data_ingestion.fetcher import ConcurrentFetcher
+from src.data_ingestion.ingestion_manifest import IngestionManifest
+from src.data_ingestion.publication_cache import PublicationCache
+from src.data_ingestion.section_chunker import TokenCounter
+from src.data_ingestion.streaming_pipeline import StreamingIngestionPipeline
+
+EXTRACTOR_VERSION = os.getenv("EXTRACTOR_VERSION", "1")
+
+# Chunks are sized in embedding-model tokens so none is truncated at embed time
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "256"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+token_counter = TokenCounter(EMBEDDING_MODEL)
+
+# Fetched and parsed articles are cached on disk across runs
+publication_cache = PublicationCache(
+    os.path.join(DATA_DIR, "publication_cache"),
+    max_mb=float(os.getenv("PUBLICATION_CACHE_MAX_MB", "512")),
+    offline=os.getenv("PUBLICATION_CACHE_OFFLINE", "false").lower() in ("1", "true", "yes"),
+    max_age_hours=float(os.getenv("PUBLICATION_CACHE_MAX_AGE_HOURS", "24")),
+)
+
+# Record of ingested documents; re-runs only process new or changed ones
+manifest = IngestionManifest(
+    os.path.join(DATA_DIR, "ingestion_manifest.json"),
+    save_every=int(os.getenv("MANIFEST_SAVE_EVERY", "50")),
+)
+
+# Per-document checkpoints and dead letters; interrupted runs resume from here
+journal = PipelineJournal(os.path.join(DATA_DIR, "pipeline_journal.sqlite"))
+
+# Keep-alive HTTP sessions shared by every pipeline run
+fetcher = ConcurrentFetcher(
+    max_workers=int(os.getenv("FETCH_WORKERS", "8")),
+    per_host_limit=int(os.getenv("FETCH_PER_HOST_LIMIT", "4")),
+    validator_store=publication_cache,
+)
+
+# Ingestion runs in the background, one job at a time by default, so
+# uploads are processed in order and never hold up query handlers
+jobs = JobRunner(
+    max_workers=int(os.getenv("INGESTION_WORKERS", "1")),
+    max_queued=int(os.getenv("INGESTION_MAX_QUEUED", "8")),
+)
+
+
+def active_chunker() -> str:
+    """Chunker key of the current settings and tokenizer"""
+    return chunker_config(CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, token_counter.name)
+
+
+def format_pipeline_stages(snapshot: Dict[str, Any]) -> str:
+    """Render per-stage queue depth and throughput for the status box"""
+    lines = ["", "📊 Pipeline stages:"]
+    for name, stage in snapshot['stages'].items():
+        queue = f"queue {stage['queue_depth']}/{stage['queue_max']}" if stage['queue_max'] else "source"
+        lines.append(
+            f"   {name:<8} {stage['processed']:>7} {stage['unit']:<7} "
+            f"{stage['per_s']:>8.1f}/s   {queue}"
+        )
+    lines.append(
+        f"   Documents: {snapshot['documents_done']} committed, "
+        f"{snapshot['documents_in_flight']} in flight, {snapshot['documents_skipped']} unchanged"
+    )
+    return "\n".join(lines) + "\n"
+
+
+def run_ingestion(
+    publication_data: List[Tuple[str, str]],
+    max_docs: Optional[int],
+    cancel_event=None,
+    sync: bool = False,
+) -> Iterator[str]:
+    """
+    Ingest the publications listed in an uploaded CSV
+
+    Ingestion is additive: documents from earlier uploads are kept. With
+    sync, the CSV is treated as the full corpus and documents in the
+    manifest but not in the CSV are removed first.
+
+    Args:
+        publication_data: List of (title, url) tuples from the CSV
+        max_docs: Maximum number of documents to process
+        cancel_event: Optional threading.Event that stops the run
+        sync: Remove ingested documents that are not in this CSV
+
+    Yields:
+        Cumulative status text
+    """
+    status = "🚀 Starting pipeline...\n\n"
+    yield status
+
+    # Phase 1: Data Ingestion
+    status += "=" * 60 + "\n"
+    status += "PHASE 1: DATA INGESTION & CHUNKING\n"
+    status += "=" * 60 + "\n"
+    yield status
+
+    # Always use the HTML loader for HF Spaces (Docling not available)
+    status += "Using concurrent HTML loader (Docling not available in HF Spaces)...\n"
+    yield status
+
+    status += f"Found {len(publication_data)} publications in CSV\n"
+    yield status
+
+    # In sync mode, documents dropped from the CSV are removed before streaming starts
+    corpus_doc_ids = [doc_id_from_url(url) for _, url in publication_data] if sync else []
+    removed = manifest.diff({}, active_chunker(), EXTRACTOR_VERSION, corpus_doc_ids)['removed']
+    if removed:
+        deleted = delete_documents(removed)
+        for doc_id in removed:
+            manifest.forget(doc_id)
+        manifest.save()
+        status += f"🗑️ Removed {len(removed)} documents no longer in the CSV ({deleted['relationships_deleted']} relationships)\n"
+        yield status
+
+    yield from ingest_publications(publication_data, max_docs, status, cancel_event)
+
+
+def ingest_publications(
+    publication_data: List[Tuple[str, str]],
+    max_docs: Optional[int],
+    status: str = "",
+    cancel_event=None,
+) -> Iterator[str]:
+    """
+    Stream publications through the ingestion pipeline with checkpoints
+
+    Args:
+        publication_data: List of (title, url) tuples
+        max_docs: Maximum number of documents to process (None for all)
+        status: Status text to append to
+        cancel_event: Optional threading.Event; when set, no new documents are
+            started and the job is checkpointed as cancelled
+
+    Yields:
+        Cumulative status text
+
+    Raises:
+        Exception: Whatever stopped the pipeline, after a final status line
+    """
+    job_id = None
+    try:
+        fingerprint = job_fingerprint(publication_data, max_docs, active_chunker(), EXTRACTOR_VERSION)
+        job_id, resumed = journal.open_job(fingerprint)
+        status += f"♻️ Resuming checkpointed run {job_id}\n" if resumed else f"📒 Checkpointing as run {job_id}\n"
+        yield status
+
+        # Incremental ingestion: each document is checked against the manifest as it arrives
+        changes = {"added": 0, "updated": 0, "unchanged": 0}
+
+        def select_document(doc_id, chunks):
+            diff = manifest.diff({doc_id: chunks}, active_chunker(), EXTRACTOR_VERSION)
+            for kind in changes:
+                changes[kind] += len(diff[kind])
+            # A partly written document from an interrupted run is resumed, not deleted
+            if diff['updated'] and not journal.has_progress(doc_id, chunks):
+                delete_documents([doc_id])
+            return not diff['unchanged']
+
+        def commit_document(doc_id, chunks):
+            manifest.record(doc_id, chunks, active_chunker(), EXTRACTOR_VERSION)
+            manifest.checkpoint()
+
+        graph_sink = populate_graph if ensure_kg_connected() else None
+        if graph_sink is None:
+            status += "⚠️ Neo4j not configured - skipping Knowledge Graph\n"
+            status += "   To enable: Add NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD to Space settings\n"
+
+        # Phase 2: fetch → chunk → (extract ∥ embed) → graph / vector sinks
+        status += "\n" + "=" * 60 + "\n"
+        status += "PHASE 2: STREAMING EXTRACTION, EMBEDDING & STORAGE\n"
+        status += "=" * 60 + "\n"
+        yield status
+
+        pipeline = StreamingIngestionPipeline(
+            extract_knowledge_from_chunk,
+            vector_sink=populate_vector_store,
+            graph_sink=graph_sink,
+            document_filter=select_document,
+            on_document_done=commit_document,
+            extract_workers=int(os.getenv("EXTRACTION_WORKERS", "0")) or os.cpu_count() or 1,
+            executor=os.getenv("EXTRACTION_EXECUTOR", "thread"),
+            queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", "8")),
+            vector_batch_chunks=int(os.getenv("PIPELINE_VECTOR_BATCH", "256")),
+            graph_batch_triples=int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "1000")),
+            journal=journal,
+            job_id=job_id,
+        )
+        chunks = iter_publication_documents(
+            publication_data=publication_data,
+            max_docs=max_docs,
+            chunk_tokens=CHUNK_TOKENS,
+            chunk_overlap=CHUNK_OVERLAP_TOKENS,
+            progress_callback=pipeline.log,
+            fetcher=fetcher,
+            cache=publication_cache,
+            token_counter=token_counter,
+            failure_callback=pipeline.fail_source,
+        )
+
+        snapshot = {}
+        cancelled = False
+        for snapshot in pipeline.run(chunks):
+            status += "".join(snapshot['messages'])
+            if cancel_event is not None and cancel_event.is_set() and not cancelled:
+                cancelled = True
+                pipeline.stop()
+                status += "⏹️ Cancellation requested; finishing documents already in flight...\n"
+            yield status + format_pipeline_stages(snapshot)
+
+        status += format_pipeline_stages(snapshot) + "\n"
+
+        if snapshot['stages']['fetch']['processed'] == 0:
+            journal.finish_job(job_id, "failed" if snapshot['errors'] else "completed")
+            status += "❌ No documents processed. Exiting.\n"
+            yield status
+            return
+
+        # Summary
+        status += "=" * 60 + "\n"
+        status += "⏹️ PIPELINE STOPPED\n" if cancelled else "✅ PIPELINE COMPLETE!\n"
+        status += "=" * 60 + "\n"
+        status += f"Documents ingested: {snapshot['documents_done']}\n"
+        status += f"   - Added: {changes['added']}\n"
+        status += f"   - Updated: {changes['updated']}\n"
+        status += f"   - Skipped (unchanged): {changes['unchanged']}\n"
+        status += f"Total triples: {snapshot['triples']}\n"
+
+        if graph_sink is not None:
+            status += f"Entities: {snapshot['entities_created']}\n"
+            status += f"Relationships: {snapshot['relationships_created']}\n"
+            if snapshot['entities_merged']:
+                status += f"Duplicate entity names merged: {snapshot['entities_merged']}\n"
+        else:
+            status += "Entities: 0 (Neo4j not configured)\n"
+            status += "Relationships: 0 (Neo4j not configured)\n"
+
+        status += f"Vector Store Chunks: {snapshot['stages']['embed']['processed']}\n"
+        if snapshot['documents_resumed']:
+            status += f"Resumed from checkpoint: {snapshot['documents_resumed']}\n"
+        if snapshot['documents_failed']:
+            status += f"⚠️ {snapshot['documents_failed']} documents failed and were moved to the dead-letter list\n"
+            status += "   Use \"Retry Failed Documents\" to process them again\n"
+
+        if cancelled:
+            journal.finish_job(job_id, "cancelled")
+            status += f"\n⏹️ Cancelled. Run the pipeline again to resume run {job_id}\n"
+            yield status
+            return
+        journal.finish_job(job_id, "failed" if snapshot['errors'] else "completed")
+
+        if snapshot['documents_done'] == 0 and not snapshot['errors']:
+            status += "\n✅ Knowledge base is already up to date. Nothing to ingest.\n"
+        else:
+            status += "\n🎉 Your knowledge base is ready for querying!\n"
+        yield status
+
+    except Exception as e:
+        status += f"\n❌ Pipeline failed: {str(e)}\n"
+        if job_id is not None:
+            journal.finish_job(job_id, "failed")
+            status += f"💾 Progress is checkpointed; run the pipeline again to resume run {job_id}\n"
+        yield status
+        # Re-raise so the job runner records the run as failed, not completed
+        raise
+    finally:
+        manifest.save()
+
+
+def retry_failed_documents(cancel_event=None) -> Iterator[str]:
+    """Re-run ingestion for every document on the dead-letter list"""
+    status = "🔁 Retrying failed documents...\n\n"
+    failed = [entry for entry in journal.dead_letters() if entry['url']]
+    if not failed:
+        status += "✅ No failed documents to retry\n"
+        yield status
+        return
+
+    for entry in failed:
+        status += f"  - {entry['doc_id']} ({entry['stage']}, {entry['attempts']} attempts): {entry['error']}\n"
+    status += "\n"
+    yield status
+
+    publication_data = [(entry['title'] or entry['doc_id'], entry['url']) for entry in failed]
+    yield from ingest_publications(publication_data, None, status, cancel_event)
+
+
+def submit_ingestion(publication_data: List[Tuple[str, str]], max_docs: Optional[int] = None, sync: bool = False) -> str:
+    """
+    Queue an ingestion job
+
+    Args:
+        publication_data: List of (title, url) tuples
+        max_docs: Maximum number of documents to process
+        sync: Also remove ingested documents that are not in publication_data
+
+    Returns:
+        Job ID
+
+    Raises:
+        JobQueueFullError: If the job queue is full
+    """
+    count = min(len(publication_data), max_docs) if max_docs else len(publication_data)
+    label = f"Sync {count} publications" if sync else f"Ingest {count} publications"
+    return jobs.submit("ingest", run_ingestion, publication_data, max_docs, sync=sync, label=label)
+
+
+def submit_retry() -> str:
+    """
+    Queue a job that retries every dead-lettered document
+
+    Returns:
+        Job ID
+
+    Raises:
+        JobQueueFullError: If the job queue is full
+    """
+    return jobs.submit("retry", retry_failed_documents, label="Retry failed documents")
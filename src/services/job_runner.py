@@ -0,0 +1,276 @@
+"""
+Job Runner
+Bounded background worker pool for long-running ingestion jobs
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+TERMINAL_STATES = ("completed", "failed", "cancelled")
+
+
+def progress_delta(previous: str, current: str) -> Tuple[int, str]:
+    """
+    Change between two versions of a job's progress text
+
+    Progress is cumulative except for a trailing status block that is
+    rewritten, so the text is sent as the offset of the first changed
+    character plus everything after it; current == previous[:offset] + delta.
+
+    Returns:
+        (offset, delta)
+    """
+    limit = min(len(previous), len(current))
+    offset = 0
+    # Compare in blocks first; a character loop over the whole text would be slow
+    step = 4096
+    while offset < limit and previous[offset:offset + step] == current[offset:offset + step]:
+        offset += step
+    offset = min(offset, limit)
+    while offset < limit and previous[offset] == current[offset]:
+        offset += 1
+    return offset, current[offset:]
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the job queue is at its limit"""
+
+
+class Job:
+    """One submitted job and its latest progress"""
+
+    def __init__(self, kind: str, label: str, fn: Callable[..., Iterator[str]], args: tuple, kwargs: dict):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.label = label
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.status = "queued"
+        self.progress = ""
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.version = 0
+        self.cancel_event = threading.Event()
+
+    def to_dict(self, position: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "label": self.label,
+            "status": self.status,
+            "queue_position": position,
+            "progress": self.progress,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "version": self.version,
+        }
+
+
+class JobRunner:
+    """
+    Runs jobs on a small pool of daemon threads, in submission order.
+
+    A job is a generator function that yields progress text and accepts a
+    ``cancel_event`` keyword; setting the event asks it to stop at the next
+    safe point. A job that raises ends as "failed" with the error text (its
+    last progress is kept); one that returns ends as "completed". Jobs
+    outlive the request that submitted them, so a closed browser tab no
+    longer kills an ingestion run, and clients reattach by job ID to poll
+    or stream progress. ``max_workers`` bounds how many jobs run at once
+    and ``max_queued`` how many may wait.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queued: int = 8, max_history: int = 50):
+        """
+        Initialize runner
+
+        Args:
+            max_workers: Jobs allowed to run concurrently
+            max_queued: Jobs allowed to wait; further submissions are rejected
+            max_history: Finished jobs kept for status queries
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.max_queued = max(0, int(max_queued))
+        self.max_history = max_history
+
+        self._cond = threading.Condition()
+        self._queue: deque = deque()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+
+    def _ensure_workers(self):
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"job-worker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def submit(self, kind: str, fn: Callable[..., Iterator[str]], *args, label: str = "", **kwargs) -> str:
+        """
+        Queue a job
+
+        Args:
+            kind: Job type, e.g. "ingest"
+            fn: Generator function yielding progress text
+            label: Short human-readable description
+            *args, **kwargs: Passed to fn (plus cancel_event)
+
+        Returns:
+            Job ID
+
+        Raises:
+            JobQueueFullError: If max_queued jobs are already waiting
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Job runner is shut down")
+            if len(self._queue) >= self.max_queued:
+                raise JobQueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+            job = Job(kind, label, fn, args, kwargs)
+            self._jobs[job.job_id] = job
+            self._queue.append(job)
+            self._prune()
+            self._ensure_workers()
+            self._cond.notify_all()
+        return job.job_id
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in TERMINAL_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def _update(self, job: Job, **fields):
+        with self._cond:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.version += 1
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._queue.popleft()
+
+            self._update(job, status="running", started_at=time.time())
+            try:
+                for progress in job.fn(*job.args, cancel_event=job.cancel_event, **job.kwargs):
+                    self._update(job, progress=progress)
+                status = "cancelled" if job.cancel_event.is_set() else "completed"
+                self._update(job, status=status, finished_at=time.time())
+            except Exception as e:
+                self._update(job, status="failed", error=str(e), finished_at=time.time())
+            finally:
+                job.fn = job.args = job.kwargs = None
+
+    def _snapshot(self, job: Job) -> Dict[str, Any]:
+        position = None
+        if job.status == "queued":
+            position = next((i for i, queued in enumerate(self._queue) if queued is job), None)
+        return job.to_dict(position)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, or None if unknown"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """All known jobs, newest first (without progress text)"""
+        with self._cond:
+            jobs = [self._snapshot(job) for job in reversed(self._jobs.values())]
+        for job in jobs:
+            job.pop("progress")
+        return jobs
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job
+
+        A queued job is dropped immediately; a running job is asked to stop.
+
+        Returns:
+            False if the job is unknown or already finished
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in TERMINAL_STATES:
+                return False
+            job.cancel_event.set()
+            if job.status == "queued":
+                self._queue.remove(job)
+                job.status = "cancelled"
+                job.finished_at = time.time()
+            job.version += 1
+            self._cond.notify_all()
+        return True
+
+    def wait(self, job_id: str, version: int = -1, timeout: float = 30.0) -> Optional[Dict[str, Any]]:
+        """
+        Block until a job changes past ``version`` or finishes
+
+        Returns:
+            The job state (unchanged if the timeout expired), or None if unknown
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                remaining = deadline - time.monotonic()
+                if job.version > version or job.status in TERMINAL_STATES or remaining <= 0:
+                    return self._snapshot(job)
+                self._cond.wait(remaining)
+
+    def follow(self, job_id: str, heartbeat: float = 15.0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a job's state on every change until it finishes
+
+        Args:
+            heartbeat: Re-yield the unchanged state at least this often
+        """
+        version = -1
+        while True:
+            job = self.wait(job_id, version, timeout=heartbeat)
+            if job is None:
+                return
+            version = job["version"]
+            yield job
+            if job["status"] in TERMINAL_STATES:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue and worker counts"""
+        with self._cond:
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+            return {
+                "queued": len(self._queue),
+                "running": running,
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+            }
+
+    def shutdown(self, cancel_running: bool = True):
+        """Stop accepting jobs; optionally ask running jobs to stop"""
+        with self._cond:
+            self._closed = True
+            for job in self._jobs.values():
+                if job.status == "queued":
+                    job.status = "cancelled"
+                elif job.status == "running" and cancel_running:
+                    job.cancel_event.set()
+            self._queue.clear()
+            self._cond.notify_all()
@@ -0,0 +1,757 @@
+"""
+RAG Service
+Shared BodhiRAG runtime used by the Gradio app and the FastAPI backend
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.graph_rag.graph_connector import KnowledgeGraphConnector
+from src.graph_rag.vector_connector import VectorStoreConnector
+from src.graph_rag.agent_router import HybridRAGAgent
+from src.graph_rag.connection_pool import Neo4jSessionPool, PooledDriver
+from src.graph_rag.bulk_writer import BulkGraphWriter, triple_to_row
+from src.graph_rag.concurrent_retrieval import ConcurrentRetriever
+from src.graph_rag.semantic_cache import SemanticAnswerCache
+from src.graph_rag.embedding_engine import EmbeddingEngine
+from src.graph_rag.graph_replica import GraphReplica
+from src.graph_rag.path_search import PathSearcher
+from src.graph_rag.entity_linker import EntityLinker
+from src.graph_rag.entity_canonicalizer import EntityCanonicalizer
+from src.graph_rag.lexical_index import LexicalIndex
+from src.graph_rag.ann_index import QuantizedANNIndex
+from src.graph_rag.reranker import CrossEncoderReranker
+from src.graph_rag.intent_classifier import SEED_EXAMPLES, QueryIntentClassifier
+from src.graph_rag.store_stats import (
+    ENTITY_TYPE_COUNT_QUERY,
+    RELATIONSHIP_TYPE_COUNT_QUERY,
+    StoreStatistics,
+)
+from src.data_ingestion.ingestion_manifest import chunk_id
+
+try:
+    from sentence_transformers import CrossEncoder, SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# Local state (ChromaDB, caches, indexes) lives under one data directory
+DATA_DIR = os.getenv("BODHIRAG_DATA_DIR", "data")
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+
+# One driver per process; every request borrows a session from it
+kg_pool = Neo4jSessionPool(
+    uri=NEO4J_URI,
+    username=NEO4J_USERNAME,
+    password=NEO4J_PASSWORD,
+    max_size=int(os.getenv("NEO4J_POOL_SIZE", "10")),
+    acquire_timeout=float(os.getenv("NEO4J_POOL_ACQUIRE_TIMEOUT", "5")),
+    idle_check_after=float(os.getenv("NEO4J_POOL_IDLE_CHECK", "30")),
+)
+
+# Triples are written in batched UNWIND transactions
+graph_writer = BulkGraphWriter(
+    kg_pool,
+    batch_size=int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "1000")),
+    max_retries=int(os.getenv("NEO4J_WRITE_RETRIES", "3")),
+)
+
+kg_connector = KnowledgeGraphConnector(
+    uri=NEO4J_URI,
+    username=NEO4J_USERNAME,
+    password=NEO4J_PASSWORD
+)
+
+vs_connector = VectorStoreConnector()
+
+agent = HybridRAGAgent(kg_connector, vs_connector)
+
+# Read-mostly in-process copy of the graph for neighborhood lookups
+KG_REPLICA_ENABLED = os.getenv("KG_REPLICA_ENABLED", "true").lower() == "true"
+kg_replica = GraphReplica(compact_threshold=int(os.getenv("KG_REPLICA_COMPACT_THRESHOLD", "10000")))
+
+# Multi-hop paths between query entities, bounded so hub nodes stay cheap
+path_searcher = PathSearcher(
+    kg_replica,
+    max_hops=int(os.getenv("KG_PATH_MAX_HOPS", "4")),
+    max_fanout=int(os.getenv("KG_PATH_MAX_FANOUT", "50")),
+    time_budget_ms=float(os.getenv("KG_PATH_TIME_BUDGET_MS", "100")),
+)
+# Query mentions are resolved against every KG entity name
+entity_linker = EntityLinker(
+    fuzzy_threshold=float(os.getenv("ENTITY_FUZZY_THRESHOLD", "0.75")),
+    max_expansions=int(os.getenv("ENTITY_MAX_EXPANSIONS", "5")),
+)
+
+KG_PATH_RELATIONSHIPS = [r.strip() for r in os.getenv("KG_PATH_RELATIONSHIPS", "").split(",") if r.strip()]
+
+# BM25 index over chunk text, kept on disk next to ChromaDB
+LEXICAL_SEARCH_ENABLED = os.getenv("LEXICAL_SEARCH_ENABLED", "true").lower() == "true"
+lexical_index = LexicalIndex(
+    os.path.join(DATA_DIR, "lexical_index.sqlite"),
+    time_budget_ms=float(os.getenv("LEXICAL_TIME_BUDGET_MS", "250")),
+)
+
+# Dense retrieval uses ChromaDB, or the local memory-mapped quantized index
+# when VECTOR_BACKEND=ann (bounded memory, near-instant cold start)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+ann_index = QuantizedANNIndex(
+    os.path.join(DATA_DIR, "ann_index", EMBEDDING_MODEL.replace("/", "__")),
+    dim=int(os.getenv("EMBEDDING_DIM", "384")),
+    nlist=int(os.getenv("ANN_NLIST", "0")) or None,
+    nprobe=int(os.getenv("ANN_NPROBE", "16")),
+    rerank=int(os.getenv("ANN_RERANK", "100")),
+    train_size=int(os.getenv("ANN_TRAIN_SIZE", "4096")),
+    brute_force_limit=int(os.getenv("ANN_BRUTE_FORCE_LIMIT", "2048")),
+) if VECTOR_BACKEND == "ann" else None
+
+
+def _ann_search(query: str, k: int, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    return ann_index.search(embed_query(query), k, filters)
+
+
+# First-stage candidates are re-scored by a small CPU cross-encoder
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "true").lower() == "true"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "50"))
+_cross_encoder = None
+_cross_encoder_failed = False
+_cross_encoder_lock = threading.Lock()
+
+
+def get_cross_encoder():
+    """
+    Load the re-ranking cross-encoder once per process
+
+    Returns:
+        CrossEncoder instance, or None if it cannot be loaded
+    """
+    global _cross_encoder, _cross_encoder_failed
+
+    if _cross_encoder is not None or _cross_encoder_failed:
+        return _cross_encoder
+
+    with _cross_encoder_lock:
+        if _cross_encoder is None and not _cross_encoder_failed:
+            if not SENTENCE_TRANSFORMERS_AVAILABLE:
+                _cross_encoder_failed = True
+                return None
+            try:
+                _cross_encoder = CrossEncoder(RERANK_MODEL, device="cpu")
+            except Exception as e:
+                print(f"⚠️ Could not load re-ranking model {RERANK_MODEL}: {e}")
+                _cross_encoder_failed = True
+        return _cross_encoder
+
+
+reranker = CrossEncoderReranker(
+    get_cross_encoder,
+    candidates=RERANK_CANDIDATES,
+    batch_size=int(os.getenv("RERANK_BATCH_SIZE", "64")),
+    time_budget_ms=float(os.getenv("RERANK_TIME_BUDGET_MS", "300")),
+    cache_size=int(os.getenv("RERANK_CACHE_SIZE", "20000")),
+)
+# Re-ranking needs a wider first stage than the results finally shown
+FIRST_STAGE_K = RERANK_CANDIDATES if RERANK_ENABLED else 0
+
+def _intent_embedding(query: str) -> Tuple[float, ...]:
+    return embed_query(query)
+
+
+# Hybrid queries are routed by intent; low-confidence ones fan out to both backends
+INTENT_ROUTING = os.getenv("INTENT_ROUTING", "true").lower() == "true"
+intent_classifier = QueryIntentClassifier(
+    embed_fn=_intent_embedding,
+    log_path=os.path.join(DATA_DIR, "routing_log.jsonl"),
+    confidence_threshold=float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.6")),
+    max_log_mb=float(os.getenv("ROUTING_LOG_MAX_MB", "16")),
+)
+
+# Hybrid queries hit Neo4j and ChromaDB concurrently with per-backend timeouts
+retriever = ConcurrentRetriever(
+    agent,
+    kg_timeout=float(os.getenv("KG_TIMEOUT_SECONDS", "2")),
+    vs_timeout=float(os.getenv("VS_TIMEOUT_SECONDS", "2")),
+    max_workers=int(os.getenv("RETRIEVAL_WORKERS", "8")),
+    kg_replica=kg_replica if KG_REPLICA_ENABLED else None,
+    replica_hops=int(os.getenv("KG_REPLICA_HOPS", "2")),
+    replica_limit=int(os.getenv("KG_REPLICA_LIMIT", "50")),
+    path_searcher=path_searcher,
+    path_relationships=KG_PATH_RELATIONSHIPS or None,
+    entity_linker=entity_linker,
+    lexical_index=lexical_index if LEXICAL_SEARCH_ENABLED else None,
+    lexical_k=max(int(os.getenv("LEXICAL_TOP_K", "10")), FIRST_STAGE_K),
+    rrf_k=int(os.getenv("RRF_K", "60")),
+    dense_search=_ann_search if ann_index is not None else None,
+    dense_k=max(int(os.getenv("VECTOR_TOP_K", "10")), FIRST_STAGE_K),
+    reranker=reranker if RERANK_ENABLED else None,
+    intent_classifier=intent_classifier if INTENT_ROUTING else None,
+)
+
+# Statistics are maintained by the write paths and recounted periodically
+store_stats = StoreStatistics(os.path.join(DATA_DIR, "store_stats.json"))
+STATS_RECOMPUTE_INTERVAL = float(os.getenv("STATS_RECOMPUTE_INTERVAL", "3600"))
+_stats_stop = threading.Event()
+_stats_thread: Optional[threading.Thread] = None
+
+_embedder = None
+_embedder_failed = False
+_embedder_lock = threading.Lock()
+
+_kg_lock = threading.Lock()
+_kg_ready = False
+
+_vs_lock = threading.Lock()
+_vs_state: Dict[str, Any] = {
+    "warm": False,
+    "initialized_at": None,
+    "init_seconds": None,
+    "warmup_seconds": None,
+    "error": None,
+}
+
+
+def get_embedder():
+    """
+    Load the query embedding model once per process
+
+    Returns:
+        SentenceTransformer instance, or None if it cannot be loaded
+    """
+    global _embedder, _embedder_failed
+
+    if _embedder is not None or _embedder_failed:
+        return _embedder
+
+    with _embedder_lock:
+        if _embedder is None and not _embedder_failed:
+            if not SENTENCE_TRANSFORMERS_AVAILABLE:
+                _embedder_failed = True
+                return None
+            try:
+                _embedder = SentenceTransformer(EMBEDDING_MODEL)
+            except Exception as e:
+                print(f"⚠️ Could not load embedding model {EMBEDDING_MODEL}: {e}")
+                _embedder_failed = True
+        return _embedder
+
+
+@lru_cache(maxsize=1024)
+def embed_query(query: str) -> Tuple[float, ...]:
+    """
+    Embed a query with the shared model (memoized per query string)
+
+    Raises:
+        RuntimeError: If no embedding model is available
+    """
+    model = get_embedder()
+    if model is None:
+        raise RuntimeError("Embedding model not available")
+    return tuple(model.encode(query, normalize_embeddings=True).tolist())
+
+
+# Ingestion embeddings are batched and cached on disk per model
+embedding_engine = EmbeddingEngine(
+    get_embedder,
+    EMBEDDING_MODEL,
+    cache_dir=os.path.join(DATA_DIR, "embedding_cache", EMBEDDING_MODEL.replace("/", "__")),
+    dim=int(os.getenv("EMBEDDING_DIM", "384")),
+    batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+    dtype=os.getenv("EMBEDDING_CACHE_DTYPE", "float16"),
+    num_threads=int(os.getenv("EMBEDDING_THREADS", "0")) or None,
+)
+
+VECTOR_UPSERT_BATCH = int(os.getenv("VECTOR_UPSERT_BATCH", "2000"))
+
+# Entity names get their own embedding cache; the ingestion engine's
+# last_stats describe chunk embedding only
+entity_embedding_engine = EmbeddingEngine(
+    get_embedder,
+    EMBEDDING_MODEL,
+    cache_dir=os.path.join(DATA_DIR, "embedding_cache", EMBEDDING_MODEL.replace("/", "__") + "__entities"),
+    dim=int(os.getenv("EMBEDDING_DIM", "384")),
+    batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+    dtype=os.getenv("EMBEDDING_CACHE_DTYPE", "float16"),
+)
+
+
+def _embed_entity_names(names: List[str]):
+    if get_embedder() is None:
+        return None
+    return entity_embedding_engine.embed(names)
+
+
+# Near-duplicate entities are merged onto canonical names before writing
+ENTITY_CANONICALIZE = os.getenv("ENTITY_CANONICALIZE", "true").lower() == "true"
+canonicalizer = EntityCanonicalizer(
+    os.path.join(DATA_DIR, "entity_registry.jsonl"),
+    embed_fn=_embed_entity_names,
+    string_threshold=float(os.getenv("ENTITY_MERGE_STRING_THRESHOLD", "0.92")),
+    candidate_threshold=float(os.getenv("ENTITY_MERGE_CANDIDATE_THRESHOLD", "0.8")),
+    embedding_threshold=float(os.getenv("ENTITY_MERGE_EMBEDDING_THRESHOLD", "0.9")),
+)
+
+
+# Repeated and near-duplicate questions are answered from memory
+answer_cache = SemanticAnswerCache(
+    embed_fn=embed_query,
+    similarity_threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92")),
+    max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000")),
+    max_mb=float(os.getenv("ANSWER_CACHE_MAX_MB", "32")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+)
+
+
+def answer_query(
+    query: str, use_kg: bool = True, use_vector: bool = True, filters: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Answer a query through the semantic cache and the concurrent retriever
+
+    Filtered queries bypass the cache, whose entries are unfiltered.
+
+    Returns:
+        Result dict in the same shape as HybridRAGAgent.route_query
+
+    Raises:
+        ValueError: If the filter expression is invalid
+    """
+    if filters:
+        return retriever.route_query(query, use_kg, use_vector, filters)
+    return answer_cache.get_or_compute(
+        query, use_kg, use_vector,
+        lambda: retriever.route_query(query, use_kg, use_vector),
+    )
+
+
+def notify_store_updated() -> int:
+    """
+    Record that the knowledge graph or vector store received new data
+
+    Bumps the store generation, which invalidates cached answers.
+
+    Returns:
+        The new store generation
+    """
+    return answer_cache.bump_generation()
+
+
+def ensure_kg_connected() -> bool:
+    """
+    Connect the shared knowledge graph connector once per process
+
+    The connector is given a driver view of the pool instead of opening
+    its own, so every query borrows a pooled session (and picks up a
+    recreated driver), and no request can tear down another's connection.
+
+    Returns:
+        True if the knowledge graph is available
+    """
+    global _kg_ready
+
+    with _kg_lock:
+        if _kg_ready:
+            return True
+        if not kg_pool.connect():
+            return False
+        if hasattr(kg_connector, "driver"):
+            kg_connector.driver = PooledDriver(kg_pool)
+            _kg_ready = True
+        else:
+            _kg_ready = bool(kg_connector.connect())
+        return _kg_ready
+
+
+def ensure_vector_store():
+    """
+    Initialize the vector store once per process (idempotent)
+
+    The Chroma client, collection handle and embedding model stay resident
+    on the shared connector, so later calls return immediately. A failed
+    initialization is not memoized and is retried on the next call. With
+    the ANN backend there is no Chroma client to open.
+
+    Raises:
+        Exception: Whatever initialize_store raised on failure
+    """
+    if _vs_state["initialized_at"] is not None:
+        return
+
+    with _vs_lock:
+        if _vs_state["initialized_at"] is not None:
+            return
+
+        start = time.perf_counter()
+        try:
+            if ann_index is None and vs_connector.initialize_store() is False:
+                raise RuntimeError("Vector store initialization failed")
+        except Exception as e:
+            _vs_state["error"] = str(e)
+            raise
+
+        _vs_state["init_seconds"] = time.perf_counter() - start
+        _vs_state["initialized_at"] = datetime.now().isoformat(timespec="seconds")
+        _vs_state["error"] = None
+
+
+def load_graph_replica() -> Dict[str, Any]:
+    """
+    (Re)build the in-process graph replica from Neo4j
+
+    Returns:
+        Replica statistics
+    """
+    if not ensure_kg_connected():
+        raise ConnectionError("Neo4j is not reachable")
+    start = time.perf_counter()
+    edges = kg_replica.load_from_neo4j(kg_pool)
+    entity_linker.add_entities(kg_replica.entity_names())
+    for alias, canonical in canonicalizer.alias_map().items():
+        entity_linker.add_alias(alias, canonical)
+    print(f"🧭 Graph replica loaded: {edges} relationships in {time.perf_counter() - start:.1f}s")
+    return kg_replica.stats()
+
+
+def seed_entity_registry() -> int:
+    """
+    Register the graph's existing entity names as canonical
+
+    Only needed once, for a graph populated before canonicalization was
+    enabled; later batches are then merged onto those names.
+
+    Returns:
+        Number of names registered
+    """
+    if kg_replica.ready:
+        names = kg_replica.entity_names()
+    else:
+        with kg_pool.session() as session:
+            names = [record["name"] for record in session.run("MATCH (e:Entity) RETURN e.name AS name")]
+    return canonicalizer.seed(names)
+
+
+def warm_up():
+    """
+    Warm every backend before the first user query
+
+    Connects the knowledge graph, loads the graph replica (and seeds the
+    entity registry on first run), initializes the vector store, fits the
+    intent classifier, loads the re-ranking model and runs one throwaway
+    vector query so the embedding model is loaded and the collection is
+    paged in. Failures are recorded,
+    never raised.
+    """
+    if ensure_kg_connected() and KG_REPLICA_ENABLED:
+        try:
+            load_graph_replica()
+        except Exception as e:
+            print(f"⚠️ Graph replica load failed: {e}")
+    if ENTITY_CANONICALIZE and not canonicalizer.stats()["canonical_keys"] and ensure_kg_connected():
+        try:
+            seed_entity_registry()
+        except Exception as e:
+            print(f"⚠️ Entity registry seeding failed: {e}")
+
+    start = time.perf_counter()
+    try:
+        ensure_vector_store()
+        if LEXICAL_SEARCH_ENABLED and lexical_index.count() == 0:
+            rebuild_lexical_index()
+        get_embedder()
+        if INTENT_ROUTING:
+            intent_classifier.fit(list(SEED_EXAMPLES) + intent_classifier.logged_examples())
+        if RERANK_ENABLED:
+            get_cross_encoder()
+        if ann_index is not None:
+            _ann_search("space biology", 1)
+        else:
+            agent.route_query("space biology", False, True)
+    except Exception as e:
+        _vs_state["error"] = str(e)
+        print(f"⚠️ Vector store warm-up failed: {e}")
+        return
+
+    _vs_state["warmup_seconds"] = time.perf_counter() - start
+    _vs_state["warm"] = True
+
+
+def start_warm_up() -> threading.Thread:
+    """
+    Run warm_up in a background thread so startup is not blocked
+
+    Also starts the periodic statistics recount.
+    """
+    thread = threading.Thread(target=warm_up, name="bodhirag-warmup", daemon=True)
+    thread.start()
+    start_stats_refresher()
+    return thread
+
+
+def vector_store_health() -> Dict[str, Any]:
+    """Report whether the vector store is initialized and warm"""
+    return dict(_vs_state)
+
+
+def populate_graph(triples: List[Any]) -> Dict[str, Any]:
+    """
+    Canonicalize extracted triples and bulk-write them to the knowledge graph
+
+    Only triples that were written reach the in-memory replica and the
+    entity linker; callers must check failed_batches / failed_triples.
+
+    Returns:
+        Write statistics (entities_created, relationships_created,
+        failed_batches, failed_triples, triples_per_s, ...) plus
+        canonicalization counts
+
+    Raises:
+        ConnectionError: If Neo4j is not reachable
+    """
+    if not ensure_kg_connected():
+        raise ConnectionError("Neo4j is not reachable")
+
+    canonical = None
+    if ENTITY_CANONICALIZE:
+        triples, canonical = canonicalizer.canonicalize(triples)
+        for alias, name in canonical.pop("new_aliases").items():
+            entity_linker.add_alias(alias, name)
+
+    result = graph_writer.write_triples(triples)
+    if canonical is not None:
+        result["canonicalization"] = canonical
+    store_stats.record_graph_write(result["entity_types"], result["relationship_types"])
+    failed = {id(t) for t in result["failed_triples"]}
+    written = [t for t in triples if id(t) not in failed]
+    if kg_replica.ready:
+        kg_replica.add_triples(written)
+    rows = [triple_to_row(t) for t in written]
+    entity_linker.add_entities(name for row in rows for name in (row["subject"], row["object"]) if name)
+    notify_store_updated()
+    return result
+
+
+def _chroma_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the scalar metadata values ChromaDB accepts"""
+    return {k: v for k, v in metadata.items() if isinstance(v, (str, int, float, bool))}
+
+
+def populate_vector_store(documents: List[Any]) -> Dict[str, Any]:
+    """
+    Embed chunks in batches and upsert them into the vector store
+
+    Embeddings come from the shared embedding engine (cached on disk, so
+    re-ingesting unchanged text costs no model time) and are upserted with
+    deterministic chunk IDs. Falls back to the connector's own
+    populate_store when the collection or the model is not available.
+    With the ANN backend, the same embeddings are appended to the local
+    index instead. The same chunks are added to the BM25 index.
+
+    Returns:
+        Dict with documents_added, embedded, cache_hits and embeddings_per_s
+    """
+    ensure_vector_store()
+    collection = getattr(vs_connector, "collection", None)
+
+    ids = [
+        chunk_id(doc.metadata.get("doc_id", "unknown"), doc.metadata.get("chunk_index", i))
+        for i, doc in enumerate(documents)
+    ]
+    if ann_index is not None:
+        embeddings = embedding_engine.embed([doc.page_content for doc in documents])
+        ann_index.add(ids, embeddings, [doc.page_content for doc in documents], [dict(doc.metadata) for doc in documents])
+        result = {"documents_added": len(documents), **embedding_engine.last_stats}
+    elif collection is None or get_embedder() is None:
+        result = vs_connector.populate_store(documents)
+    else:
+        embeddings = embedding_engine.embed([doc.page_content for doc in documents])
+        for start in range(0, len(documents), VECTOR_UPSERT_BATCH):
+            end = start + VECTOR_UPSERT_BATCH
+            collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end].tolist(),
+                documents=[doc.page_content for doc in documents[start:end]],
+                metadatas=[_chroma_metadata(doc.metadata) for doc in documents[start:end]],
+            )
+        result = {"documents_added": len(documents), **embedding_engine.last_stats}
+
+    if LEXICAL_SEARCH_ENABLED:
+        lexical_index.upsert(
+            ids,
+            [doc.page_content for doc in documents],
+            [_chroma_metadata(doc.metadata) for doc in documents],
+        )
+
+    store_stats.record_vectors_added(
+        len(documents),
+        sum(len(doc.page_content) for doc in documents),
+        {key for doc in documents for key in doc.metadata},
+    )
+    notify_store_updated()
+    return result
+
+
+def delete_documents(doc_ids: List[str]) -> Dict[str, int]:
+    """
+    Remove every chunk and relationship that came from the given documents
+
+    Args:
+        doc_ids: Document IDs (PMC_<id>) to remove
+
+    Returns:
+        Dict with documents and relationships_deleted counts
+    """
+    result = {"documents": len(doc_ids), "relationships_deleted": 0}
+    if not doc_ids:
+        return result
+
+    ensure_vector_store()
+    collection = getattr(vs_connector, "collection", None)
+    chunks_deleted = content_deleted = 0
+    if collection is not None:
+        # Measure what is about to go so the statistics stay current
+        for doc_id in doc_ids:
+            existing = collection.get(where={"doc_id": doc_id}, include=["documents"])
+            chunks_deleted += len(existing["ids"])
+            content_deleted += sum(len(text or "") for text in existing.get("documents") or [])
+
+    if ann_index is not None:
+        chunks_deleted, content_deleted = ann_index.measure_documents(doc_ids)
+        ann_index.delete_documents(doc_ids)
+    elif hasattr(vs_connector, "delete_documents"):
+        vs_connector.delete_documents(doc_ids)
+    elif collection is not None:
+        for doc_id in doc_ids:
+            collection.delete(where={"doc_id": doc_id})
+    store_stats.record_vectors_deleted(chunks_deleted, content_deleted)
+    lexical_index.delete_documents(doc_ids)
+
+    if ensure_kg_connected():
+        with kg_pool.session() as session:
+            relationship_types = {
+                record["type"]: record["deleted"]
+                for record in session.run(
+                    "MATCH ()-[r:RELATES_TO]->() WHERE r.doc_id IN $doc_ids "
+                    "WITH r, coalesce(r.relationship, 'Unknown') AS type "
+                    "DELETE r RETURN type, count(*) AS deleted",
+                    doc_ids=doc_ids,
+                )
+            }
+            entity_types = {
+                record["type"]: record["deleted"]
+                for record in session.run(
+                    "MATCH (e:Entity) WHERE NOT (e)--() "
+                    "WITH e, coalesce(e.type, 'Unknown') AS type "
+                    "DELETE e RETURN type, count(*) AS deleted"
+                )
+            }
+        store_stats.record_graph_delete(entity_types, relationship_types)
+        kg_replica.remove_documents(doc_ids)
+        result["relationships_deleted"] = sum(relationship_types.values())
+
+    notify_store_updated()
+    return result
+
+
+def rebuild_lexical_index(page_size: int = 1000) -> int:
+    """
+    Index every chunk already in the vector store into the BM25 index
+
+    Used once for stores populated before lexical search existed.
+
+    Returns:
+        Number of chunks indexed
+    """
+    ensure_vector_store()
+    collection = getattr(vs_connector, "collection", None)
+    if collection is None:
+        return 0
+
+    start = time.perf_counter()
+    indexed = 0
+    while True:
+        page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=indexed)
+        if not page["ids"]:
+            break
+        lexical_index.upsert(
+            page["ids"],
+            [text or "" for text in page["documents"]],
+            [metadata or {} for metadata in page["metadatas"]],
+        )
+        indexed += len(page["ids"])
+    if indexed:
+        print(f"🔤 Lexical index rebuilt: {indexed} chunks in {time.perf_counter() - start:.1f}s")
+    return indexed
+
+
+def recompute_store_stats() -> Dict[str, Any]:
+    """
+    Recount statistics from the stores, correcting any counter drift
+
+    Each store is recounted only if it is reachable; the other keeps its
+    incremental counters.
+
+    Returns:
+        The refreshed statistics snapshot
+    """
+    if ensure_kg_connected():
+        with kg_pool.session() as session:
+            entity_types = [dict(record) for record in session.run(ENTITY_TYPE_COUNT_QUERY)]
+            relationship_types = [dict(record) for record in session.run(RELATIONSHIP_TYPE_COUNT_QUERY)]
+        store_stats.replace_graph(entity_types, relationship_types)
+
+    try:
+        ensure_vector_store()
+        vs_stats = ann_index.collection_stats() if ann_index is not None else vs_connector.get_collection_stats()
+        store_stats.replace_vectors(
+            vs_stats.get("total_documents", 0),
+            vs_stats.get("average_content_length", 0.0),
+            vs_stats.get("sample_metadata_fields", []),
+        )
+    except Exception as e:
+        print(f"⚠️ Vector store recount failed: {e}")
+
+    return store_stats.snapshot()
+
+
+def _refresh_stats_periodically():
+    while not _stats_stop.is_set():
+        age = store_stats.snapshot()["recomputed_age_seconds"]
+        if age is None or age >= STATS_RECOMPUTE_INTERVAL:
+            try:
+                recompute_store_stats()
+            except Exception as e:
+                print(f"⚠️ Statistics recount failed: {e}")
+            age = 0.0
+        _stats_stop.wait(max(1.0, STATS_RECOMPUTE_INTERVAL - age))
+
+
+def start_stats_refresher():
+    """Start the background statistics recount (idempotent)"""
+    global _stats_thread
+
+    if _stats_thread is None or not _stats_thread.is_alive():
+        _stats_stop.clear()
+        _stats_thread = threading.Thread(target=_refresh_stats_periodically, name="bodhirag-stats", daemon=True)
+        _stats_thread.start()
+
+
+def shutdown():
+    """Release shared resources at process exit"""
+    global _kg_ready
+
+    _stats_stop.set()
+    retriever.shutdown()
+    intent_classifier.flush()
+    reranker.shutdown()
+    with _kg_lock:
+        _kg_ready = False
+        kg_pool.close()